@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from api_gateway.app.routes import chat, upload, admin
+from api_gateway.core.channels import GrpcChannelManager
 
 from shared.providers.redis import RedisFactory
 from shared.config import setup_logging
@@ -15,8 +16,11 @@ logger = logging.getLogger("API-Gateway.Main")
 async def lifespan(app: FastAPI):
     logger.info("Starting up API Gateway...")
     RedisFactory.get_client()  # Initialize Redis connection pool
+    # Open warm, keepalive-configured gRPC channels shared by all requests
+    await GrpcChannelManager.get_instance().warm_up()
     yield
     logger.info("Shutting down API Gateway...")
+    await GrpcChannelManager.close()
     await RedisFactory.close()
 
 app = FastAPI(
@@ -15,6 +15,14 @@ logger = logging.getLogger("API-Gateway.Routes.Chat")
 router = APIRouter()
 
 
+def _triples(chunk) -> list[dict]:
+    """Structured graph relations of a context chunk (empty for vector chunks)."""
+    return [
+        {"source": t.source, "relation": t.relation, "target": t.target}
+        for t in chunk.triples
+    ]
+
+
 @router.post("/chat", response_model=ChatResponse, tags=["Chat"])
 async def chat_endpoint(
     request: ChatRequest, chat_client: ChatServiceClient = Depends(get_chat_client)
@@ -34,6 +42,7 @@ async def chat_endpoint(
                 metadata={
                     "doc_id": chunk.doc_id,
                     "score": chunk.score,
+                    "triples": _triples(chunk),
                 },
             )
             for chunk in response.context_chunks
@@ -80,7 +89,7 @@ async def websocket_endpoint(
         async for response in chat_client.stream_audio_chat(request_generator()):
             logger.info(f"Sending event: {response.event_type}")
             contexts_data = [
-                {"text": c.text, "doc_id": c.doc_id, "score": c.score}
+                {"text": c.text, "doc_id": c.doc_id, "score": c.score, "triples": _triples(c)}
                 for c in response.context_chunks
             ]
             await websocket.send_json(
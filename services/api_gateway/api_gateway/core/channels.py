@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from shared.config import Config, config as global_config
+from shared.protos import service_pb2_grpc
+from shared.providers.grpc_channels import (
+    GrpcChannelPool,
+    build_channel_options,
+    resolve_target,
+)
+
+logger = logging.getLogger("API-Gateway.Core.Channels")
+
+
+class GrpcChannelManager:
+    """
+    Gateway-wide owner of the warm gRPC channels to the backend services.
+    Created once in the FastAPI lifespan (Singleton) and closed on shutdown.
+    """
+
+    _instance: Optional["GrpcChannelManager"] = None
+
+    def __init__(self, settings: Config):
+        self.config = settings
+        options = build_channel_options(settings)
+
+        self.chat = GrpcChannelPool(
+            "chat",
+            self._targets(
+                settings.CHAT_SERVICE_ADDRESSES,
+                settings.CHAT_SERVICE_HOST,
+                settings.CHAT_SERVICE_PORT,
+            ),
+            service_pb2_grpc.ChatServiceStub,
+            options,
+        )
+        self.rag = GrpcChannelPool(
+            "rag",
+            self._targets(
+                settings.RAG_SERVICE_ADDRESSES,
+                settings.RAG_SERVICE_HOST,
+                settings.RAG_SERVICE_PORT,
+            ),
+            service_pb2_grpc.RAGServiceStub,
+            options,
+        )
+
+    @staticmethod
+    def _targets(addresses: List[str], host: str, port: int) -> List[str]:
+        if addresses:
+            return list(addresses)
+        return [resolve_target(host, port)]
+
+    @classmethod
+    def get_instance(cls, settings: Config = global_config) -> "GrpcChannelManager":
+        """
+        Returns the Singleton manager, creating the channels on first use.
+        """
+        if cls._instance is None:
+            cls._instance = cls(settings)
+        return cls._instance
+
+    async def warm_up(self):
+        """Connects all channels up-front (non-fatal if a backend is down)."""
+        timeout = self.config.GRPC_CHANNEL_READY_TIMEOUT
+        await asyncio.gather(
+            self.chat.wait_ready(timeout), self.rag.wait_ready(timeout)
+        )
+
+    @classmethod
+    async def close(cls):
+        """Closes all channels (if the manager exists)."""
+        if cls._instance is not None:
+            await asyncio.gather(cls._instance.chat.close(), cls._instance.rag.close())
+            cls._instance = None
@@ -4,6 +4,7 @@ from shared.providers.storage import LocalStorageProvider
 from shared.providers.redis import RedisFactory
 from shared.config import config
 
+from api_gateway.core.channels import GrpcChannelManager
 from api_gateway.services.chat_client import ChatServiceClient
 
 logger = logging.getLogger("API-Gateway.Core.Dependencies")
@@ -37,7 +38,15 @@ def get_storage_service() -> StorageProvider:
 
 def get_chat_client():
     """
-    Returns an instance of ChatServiceClient.
+    Returns an instance of ChatServiceClient bound to the pooled Chat channels.
     Usage: chat_client = Depends(get_chat_client)
     """
-    return ChatServiceClient(settings=config)
+    return ChatServiceClient(GrpcChannelManager.get_instance(config).chat)
+
+
+def get_rag_stub():
+    """
+    Returns a RAGServiceStub on one of the long-lived RAG channels (round-robin).
+    Usage: stub = Depends(get_rag_stub)
+    """
+    return GrpcChannelManager.get_instance(config).rag.get_stub()
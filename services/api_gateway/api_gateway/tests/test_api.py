@@ -3,19 +3,27 @@ from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, patch, AsyncMock # <--- Import AsyncMock
 
 from api_gateway.app.main import app
+from api_gateway.core.dependencies import get_chat_client, get_rag_stub
+from api_gateway.services.chat_client import ChatServiceClient
 from shared.protos import service_pb2
 
 client = TestClient(app)
 
 @pytest.fixture
 def mock_rag_stub():
-    with patch("api_gateway.app.routes.vectors.service_pb2_grpc.RAGServiceStub") as mock:
-        yield mock.return_value
+    stub = MagicMock()
+    app.dependency_overrides[get_rag_stub] = lambda: stub
+    yield stub
+    app.dependency_overrides.pop(get_rag_stub, None)
 
 @pytest.fixture
 def mock_chat_stub():
-    with patch("api_gateway.app.routes.chat.service_pb2_grpc.ChatServiceStub") as mock:
-        yield mock.return_value
+    stub = MagicMock()
+    channels = MagicMock()
+    channels.get_stub.return_value = stub
+    app.dependency_overrides[get_chat_client] = lambda: ChatServiceClient(channels)
+    yield stub
+    app.dependency_overrides.pop(get_chat_client, None)
 
 # ... (Root and Health tests remain the same) ...
 
@@ -35,7 +43,7 @@ def test_sync_endpoint(mock_rag_stub):
     mock_rag_stub.TriggerSync = AsyncMock(return_value=mock_response)
 
     payload = {"doc_id": "doc_1", "filename": "test.pdf"}
-    response = client.post("/api/v1/vectors/sync", json=payload)
+    response = client.post("/api/v1/admin/sync", json=payload)
 
     assert response.status_code == 200
     assert response.json()["job_id"] == "12345"
@@ -46,6 +54,8 @@ def test_chat_endpoint(mock_chat_stub):
     # Setup Mock Response
     mock_response = service_pb2.ChatResponse(text="Hello human") # type: ignore
     mock_response.context_chunks.add(text="Policy info...", doc_id="doc_1", score=0.9)
+    graph_chunk = mock_response.context_chunks.add(text="Ironclad -[SUED]-> Nebula", doc_id="graph_retrieval")
+    graph_chunk.triples.add(source="Ironclad", relation="SUED", target="Nebula")
     
     # FIX: Use AsyncMock so 'await stub.Interact()' works
     # This creates a coroutine that returns mock_response when awaited
@@ -56,4 +66,9 @@ def test_chat_endpoint(mock_chat_stub):
 
     assert response.status_code == 200
     assert response.json()["answer"] == "Hello human"
-    assert len(response.json()["contexts"]) == 1
\ No newline at end of file
+    contexts = response.json()["contexts"]
+    assert len(contexts) == 2
+    assert contexts[0]["metadata"]["triples"] == []
+    assert contexts[1]["metadata"]["triples"] == [
+        {"source": "Ironclad", "relation": "SUED", "target": "Nebula"}
+    ]
\ No newline at end of file
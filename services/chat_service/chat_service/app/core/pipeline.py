@@ -5,10 +5,12 @@ from chat_service.app.interfaces import ContextRetriever, AnswerGenerator
 
 logger = logging.getLogger("Chat-Service.Core.Pipeline")
 
+import inspect
 import logging
 from typing import List
 from shared.protos import service_pb2
 from chat_service.app.interfaces import PipelineStep
+from chat_service.app.core.steps import SyncStepAdapter
 
 logger = logging.getLogger("Chat-Service.Core.Pipeline")
 
@@ -16,12 +18,20 @@ class FlexiblePipeline:
     def __init__(self, steps: List[PipelineStep]):
         """
         :param steps: An ordered list of steps to execute.
+        Blocking (plain generator) steps are wrapped in SyncStepAdapter.
         """
-        self.steps = steps
+        self.steps = [self._ensure_async(step) for step in steps]
 
-    def run_stream(self, query_text: str):
+    @staticmethod
+    def _ensure_async(step) -> PipelineStep:
+        if inspect.isasyncgenfunction(step.execute):
+            return step
+        logger.info(f"Wrapping blocking step {type(step).__name__} in SyncStepAdapter")
+        return SyncStepAdapter(step)
+
+    async def run_stream(self, query_text: str):
         """
-        Executes the pipeline steps sequentially.
+        Executes the pipeline steps sequentially (async generator).
         """
         if not query_text:
             return
@@ -32,8 +42,13 @@ class FlexiblePipeline:
         try:
             for step in self.steps:
                 # Delegate execution to the step
-                yield from step.execute(context)
-                
+                async for event in step.execute(context):
+                    yield event
+
+                # A step may answer the request on its own (e.g. a cache hit)
+                if context.get("halt"):
+                    break
+
         except Exception as e:
             logger.error(f"Pipeline Stream Error: {e}")
             yield service_pb2.ChatStreamResponse( # type: ignore
@@ -41,20 +56,20 @@ class FlexiblePipeline:
                 event_type="error",
             )
 
-    def run_unary(self, query_text: str) -> service_pb2.ChatResponse: # type: ignore
+    async def run_unary(self, query_text: str) -> service_pb2.ChatResponse: # type: ignore
         """
         Non-streaming wrapper (consumes the stream to build a single response).
         Useful for endpoints that don't support streaming.
         """
         full_text = []
         chunks = []
-        
-        for event in self.run_stream(query_text):
+
+        async for event in self.run_stream(query_text):
             if event.event_type == "answer" and event.text_chunk:
                 full_text.append(event.text_chunk)
             elif event.event_type == "context" and event.context_chunks:
                 chunks.extend(event.context_chunks)
-        
+
         return service_pb2.ChatResponse( # type: ignore
             text="".join(full_text), 
             context_chunks=chunks
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from shared.config import Config
+
+logger = logging.getLogger("Chat-Service.Core.SemanticCache")
+
+# Pseudo doc_id the RAG Service uses for the graph context chunk
+GRAPH_DOC_ID = "graph_retrieval"
+# Invalidation listener reconnect backoff (seconds)
+LISTENER_BACKOFF_MAX_SECONDS = 30.0
+
+
+class _CacheEntry:
+    __slots__ = ("query", "chunks", "answer", "doc_ids", "created_at")
+
+    def __init__(self, query: str, chunks: List[Any], answer: str, doc_ids: set):
+        self.query = query
+        self.chunks = chunks
+        self.answer = answer
+        self.doc_ids = doc_ids
+        self.created_at = time.monotonic()
+
+
+class SemanticAnswerCache:
+    """
+    In-process vector index of previous (query -> context + answer) results.
+    Lookups are a single matrix-vector product over normalized embeddings;
+    entries expire after a TTL and are evicted LRU beyond `max_entries`.
+    """
+
+    def __init__(self, embeddings: Any, settings: Config):
+        """
+        :param embeddings: A LangChain Embeddings model (from EmbeddingFactory).
+        """
+        self.embeddings = embeddings
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD
+        self.ttl_seconds = settings.SEMANTIC_CACHE_TTL_SECONDS
+        self.max_entries = settings.SEMANTIC_CACHE_MAX_ENTRIES
+
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._next_id = 0
+        # Dense matrix of live vectors, rebuilt lazily after writes/evictions
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+
+        # Bumped by every invalidation: answers generated across one are not stored
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    async def embed(self, query: str) -> np.ndarray:
+        """Embeds and L2-normalizes the query (model runs in a worker thread)."""
+        vector = await asyncio.to_thread(self.embeddings.embed_query, query)
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(arr)
+        return arr / norm if norm else arr
+
+    def lookup(self, vector: np.ndarray) -> Optional[Tuple[List[Any], str]]:
+        """
+        Returns (chunks, answer) of the most similar live entry above the
+        threshold, or None.
+        """
+        self._expire()
+        matrix = self._get_matrix()
+        if matrix is None:
+            self.misses += 1
+            return None
+
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        entry_id = self._matrix_ids[best]
+        entry = self._entries[entry_id]
+        self._entries.move_to_end(entry_id)
+        self.hits += 1
+        logger.info(
+            f"Semantic cache hit (score={scores[best]:.3f}) for cached query: '{entry.query[:50]}'"
+        )
+        return entry.chunks, entry.answer
+
+    def store(
+        self, query: str, vector: np.ndarray, chunks: List[Any], answer: str,
+        generation: Optional[int] = None,
+    ):
+        """
+        :param generation: `self.generation` when the lookup missed; if a document
+            was invalidated since, the answer may cite stale context and is dropped.
+        """
+        if not answer or self.max_entries <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            logger.info(f"Semantic cache skipped storing '{query[:50]}': invalidated while generating")
+            return
+        doc_ids = {c.doc_id for c in chunks if getattr(c, "doc_id", None)}
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = _CacheEntry(query, list(chunks), answer, doc_ids)
+        self._vectors[entry_id] = vector
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._vectors.pop(evicted, None)
+        self._matrix = None
+
+    def invalidate_docs(self, doc_ids: Iterable[str]) -> int:
+        """
+        Drops every entry citing one of `doc_ids`. Graph-backed answers are
+        dropped too, since any (re-)sync or delete changes the graph.
+        """
+        self.generation += 1
+        targets = set(doc_ids) | {GRAPH_DOC_ID}
+        stale = [eid for eid, e in self._entries.items() if e.doc_ids & targets]
+        for eid in stale:
+            self._remove(eid)
+        if stale:
+            logger.info(f"Semantic cache invalidated {len(stale)} entries for {sorted(doc_ids)}")
+        return len(stale)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self._vectors.clear()
+        self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._entries),
+        }
+
+    def _remove(self, entry_id: int):
+        self._entries.pop(entry_id, None)
+        self._vectors.pop(entry_id, None)
+        self._matrix = None
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [
+            eid for eid, e in self._entries.items()
+            if now - e.created_at >= self.ttl_seconds
+        ]
+        for eid in expired:
+            self._remove(eid)
+
+    def _get_matrix(self) -> Optional[np.ndarray]:
+        if not self._entries:
+            return None
+        if self._matrix is None:
+            self._matrix_ids = list(self._entries.keys())
+            self._matrix = np.stack([self._vectors[eid] for eid in self._matrix_ids])
+        return self._matrix
+
+
+async def listen_for_invalidations(cache: SemanticAnswerCache, redis_client):
+    """
+    Subscribes to 'document_events' (published by the RAG worker on sync and
+    by the RAG Service on delete) and drops cached answers citing the document.
+    Reconnects with backoff; the cache is cleared on every (re)subscribe since
+    events published in between were missed.
+    """
+    backoff = 1.0
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe("document_events")
+                cache.clear()
+                backoff = 1.0
+                logger.info("Semantic cache listening for document events.")
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if not message:
+                        continue
+                    try:
+                        doc_id = json.loads(message["data"]).get("doc_id")
+                    except (ValueError, AttributeError) as e:
+                        # Cannot tell which answers are stale: drop everything
+                        logger.error(f"Malformed document event, clearing cache: {e}")
+                        cache.clear()
+                        continue
+                    if doc_id:
+                        cache.invalidate_docs([doc_id])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A missed event must never serve stale answers: drop everything
+            logger.error(f"Invalidation listener error, clearing cache (retry in {backoff:.0f}s): {e}")
+            cache.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, LISTENER_BACKOFF_MAX_SECONDS)
@@ -1,13 +1,17 @@
+import asyncio
 import logging
-from typing import Dict, Any, Generator
+from typing import Dict, Any, AsyncGenerator
 from shared.protos import service_pb2
-from chat_service.app.interfaces import PipelineStep, ContextRetriever, AnswerGenerator
+from chat_service.app.interfaces import PipelineStep, SyncPipelineStep, ContextRetriever, AnswerGenerator
+from chat_service.app.core.semantic_cache import SemanticAnswerCache
 
 logger = logging.getLogger("Chat-Service.Core.Steps")
 
+_EXHAUSTED = object()
+
 class ThinkingStep(PipelineStep):
     """Emits the initial 'thinking' event."""
-    def execute(self, context: Dict[str, Any]) -> Generator[service_pb2.ChatStreamResponse, None, None]: # type: ignore
+    async def execute(self, context: Dict[str, Any]) -> AsyncGenerator[service_pb2.ChatStreamResponse, None]: # type: ignore
         yield service_pb2.ChatStreamResponse(event_type="thinking") # type: ignore
 
 class RetrievalStep(PipelineStep):
@@ -15,19 +19,19 @@ class RetrievalStep(PipelineStep):
     def __init__(self, retriever: ContextRetriever):
         self.retriever = retriever
 
-    def execute(self, context: Dict[str, Any]) -> Generator[service_pb2.ChatStreamResponse, None, None]: # type: ignore
+    async def execute(self, context: Dict[str, Any]) -> AsyncGenerator[service_pb2.ChatStreamResponse, None]: # type: ignore
         query = context.get("query")
         if not query:
             logger.warning("RetrievalStep: No query found in context.")
             return
 
         # Perform Retrieval
-        chunks, context_str = self.retriever.retrieve(query)
-        
+        chunks, context_str = await self.retriever.retrieve(query)
+
         # Store results in shared context for future steps (e.g., Generation)
         context["chunks"] = chunks
         context["context_str"] = context_str
-        
+
         # Emit Context Event
         yield service_pb2.ChatStreamResponse( # type: ignore
             context_chunks=chunks, event_type="context"
@@ -38,17 +42,91 @@ class GenerationStep(PipelineStep):
     def __init__(self, generator: AnswerGenerator):
         self.generator = generator
 
-    def execute(self, context: Dict[str, Any]) -> Generator[service_pb2.ChatStreamResponse, None, None]: # type: ignore
+    async def execute(self, context: Dict[str, Any]) -> AsyncGenerator[service_pb2.ChatStreamResponse, None]: # type: ignore
         query = context.get("query")
         context_str = context.get("context_str", "")
-        
+
         if not query:
             return
 
         logger.info("Starting LLM streaming response")
-        
-        # Stream from LLM
-        for token in self.generator.stream_response(query, context_str):
+
+        # Stream from LLM (and keep the full answer for later steps, e.g. caching)
+        tokens = []
+        async for token in self.generator.stream_response(query, context_str):
+            tokens.append(token)
             yield service_pb2.ChatStreamResponse( # type: ignore
                 text_chunk=token, event_type="answer"
-            )
\ No newline at end of file
+            )
+        context["answer"] = "".join(tokens)
+
+class SemanticCacheStep(PipelineStep):
+    """
+    Serves near-identical questions from the semantic answer cache.
+    On a hit it replays the cached 'context' and 'answer' events and halts the
+    pipeline; on a miss it leaves the query embedding for SemanticCacheStoreStep.
+    """
+    def __init__(self, cache: SemanticAnswerCache):
+        self.cache = cache
+
+    async def execute(self, context: Dict[str, Any]) -> AsyncGenerator[service_pb2.ChatStreamResponse, None]: # type: ignore
+        query = context.get("query")
+        if not query:
+            return
+
+        try:
+            vector = await self.cache.embed(query)
+        except Exception as e:
+            logger.warning(f"SemanticCacheStep: embedding failed, bypassing cache: {e}")
+            return
+
+        generation = self.cache.generation
+        cached = self.cache.lookup(vector)
+        if cached is None:
+            context["query_embedding"] = vector
+            context["cache_generation"] = generation
+            return
+
+        chunks, answer = cached
+        context["chunks"] = chunks
+        context["answer"] = answer
+        context["halt"] = True
+
+        yield service_pb2.ChatStreamResponse( # type: ignore
+            context_chunks=chunks, event_type="context"
+        )
+        yield service_pb2.ChatStreamResponse( # type: ignore
+            text_chunk=answer, event_type="answer"
+        )
+
+class SemanticCacheStoreStep(PipelineStep):
+    """Records the freshly generated context + answer in the semantic cache."""
+    def __init__(self, cache: SemanticAnswerCache):
+        self.cache = cache
+
+    async def execute(self, context: Dict[str, Any]) -> AsyncGenerator[service_pb2.ChatStreamResponse, None]: # type: ignore
+        vector = context.get("query_embedding")
+        if vector is not None:
+            self.cache.store(
+                context["query"], vector, context.get("chunks", []), context.get("answer", ""),
+                generation=context.get("cache_generation"),
+            )
+        return
+        yield  # unreachable: makes this an async generator like every other step
+
+class SyncStepAdapter(PipelineStep):
+    """
+    Runs a blocking (plain generator) step without blocking the event loop.
+    Each `next()` is executed in a worker thread, so existing custom steps
+    keep working unchanged inside the async pipeline.
+    """
+    def __init__(self, step: SyncPipelineStep):
+        self.step = step
+
+    async def execute(self, context: Dict[str, Any]) -> AsyncGenerator[service_pb2.ChatStreamResponse, None]: # type: ignore
+        iterator = iter(self.step.execute(context))
+        while True:
+            event = await asyncio.to_thread(next, iterator, _EXHAUSTED)
+            if event is _EXHAUSTED:
+                break
+            yield event
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Iterable, Generator
+from typing import AsyncIterator, AsyncGenerator
 
 import io
 from shared.protos import service_pb2
@@ -21,13 +22,13 @@ class TranscriptionService:
         # 2. Load the Strategy (Factory Pattern)
         self.stt_strategy: STTStrategy = STTFactory.get_transcriber(self.config)
 
-    def process_stream(self, request_iterator) -> Generator[service_pb2.ChatStreamResponse, None, None]: # type: ignore
+    async def process_stream(self, request_iterator: AsyncIterator) -> AsyncGenerator[service_pb2.ChatStreamResponse, None]: # type: ignore
         logger.info("Starting Batch Transcription...")
 
         # 1. Accumulate all chunks from the gRPC stream
         buffer = io.BytesIO()
         try:
-            for request in request_iterator:
+            async for request in request_iterator:
                 if request.content:
                     buffer.write(request.content)
         except Exception as e:
@@ -44,11 +45,14 @@ class TranscriptionService:
 
         try:
             # 2. Convert WebM -> WAV (Batch)
-            wav_data = self.converter.convert_bytes(webm_data)
+            # FFmpeg and STT are blocking/CPU-bound: keep them off the event loop
+            wav_data = await asyncio.to_thread(self.converter.convert_bytes, webm_data)
             
             # 3. Transcribe Once
             logger.info("Transcribing...")
-            text = self.stt_strategy.transcribe(wav_data, self.config)
+            text = await asyncio.to_thread(
+                self.stt_strategy.transcribe, wav_data, self.config
+            )
 
             if text and text.strip():
                 logger.info(f"Final Transcription: {text}")
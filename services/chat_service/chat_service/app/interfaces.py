@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from shared.config import Config
-from typing import Dict, List, Tuple, Any, Generator, Iterator
+from typing import Dict, List, Tuple, Any, AsyncGenerator, Generator, Iterator
 
 from shared.protos import service_pb2
 
@@ -15,7 +15,7 @@ class STTStrategy(ABC):
 class ContextRetriever(ABC):
     """Abstracts the logic for retrieving relevant context chunks."""
     @abstractmethod
-    def retrieve(self, query: str) -> Tuple[List[Any], str]:
+    async def retrieve(self, query: str) -> Tuple[List[Any], str]:
         """
         Returns a tuple: (list_of_chunks, formatted_context_string)
         """
@@ -24,28 +24,38 @@ class ContextRetriever(ABC):
 class AnswerGenerator(ABC):
     """Abstracts the logic for generating answers from an LLM."""
     @abstractmethod
-    def generate_response(self, query: str, context: str) -> str:
+    async def generate_response(self, query: str, context: str) -> str:
         """Returns the full response text."""
         pass
 
     @abstractmethod
-    def stream_response(self, query: str, context: str) -> Generator[str, None, None]:
-        """Yields text tokens."""
+    def stream_response(self, query: str, context: str) -> AsyncGenerator[str, None]:
+        """Yields text tokens (async generator)."""
         pass
 
 class PipelineStep(ABC):
     """
     Represents a single step in the RAG processing chain.
+    Steps are async generators so a slow backend never pins a server thread.
     """
     @abstractmethod
-    def execute(self, context: Dict[str, Any]) -> Generator[service_pb2.ChatStreamResponse, None, None]: # type: ignore
+    def execute(self, context: Dict[str, Any]) -> AsyncGenerator[service_pb2.ChatStreamResponse, None]: # type: ignore
         """
-        Executes the step logic.
+        Executes the step logic (implement as `async def` + `yield`).
         :param context: A shared dictionary to pass data (like retrieved chunks) between steps.
         :yields: ChatStreamResponse events (thinking, context, answer, etc.)
         """
         pass
 
+class SyncPipelineStep(ABC):
+    """
+    Legacy blocking step (plain generator).
+    Still supported: the pipeline runs it through SyncStepAdapter in a worker thread.
+    """
+    @abstractmethod
+    def execute(self, context: Dict[str, Any]) -> Generator[service_pb2.ChatStreamResponse, None, None]: # type: ignore
+        pass
+
 class AudioStreamConverter(ABC):
     """
     Interface for converting audio (e.g., WebM -> WAV).
@@ -1,6 +1,6 @@
+import asyncio
 import grpc
 import logging
-from concurrent import futures
 from chat_service.app.core.pipeline import FlexiblePipeline
 from shared.config import setup_logging, config, Config
 from shared.protos import service_pb2, service_pb2_grpc
@@ -8,6 +8,8 @@ from shared.protos import service_pb2, service_pb2_grpc
 from chat_service.app.adapters.audio_converter import FFmpegAudioConverter
 from chat_service.app.core.transcriber import TranscriptionService
 from chat_service.app.providers.pipeline import PipelineFactory
+from chat_service.app.core.semantic_cache import listen_for_invalidations
+from shared.providers.redis import RedisFactory
 
 setup_logging()
 logger = logging.getLogger("Chat-Service.Main")
@@ -22,17 +24,17 @@ class ChatService(service_pb2_grpc.ChatServiceServicer):
         )
         self.pipeline = pipeline
 
-    def Interact(self, request, context):
+    async def Interact(self, request, context):
         """Standard Text Request"""
         logger.info(f"Text Query: {request.user_query}")
         try:
-            return self.pipeline.run_unary(request.user_query)
+            return await self.pipeline.run_unary(request.user_query)
         except Exception as e:
             logger.error(f"Interact Error: {e}")
             context.set_code(grpc.StatusCode.INTERNAL)
             return service_pb2.ChatResponse()  # type: ignore
 
-    def StreamAudioChat(self, request_iterator, context):
+    async def StreamAudioChat(self, request_iterator, context):
         """Voice Stream Request"""
         logger.info("Starting Audio Stream...")
 
@@ -41,12 +43,11 @@ class ChatService(service_pb2_grpc.ChatServiceServicer):
             # The 'process_stream' is a generator, so we iterate over it to send UI updates.
             # However, we need the RETURN value (final text) when it finishes.
 
-            # Use 'yield from' if we didn't need the return value.
-            # Since we do, we iterate manually.
+            # We iterate manually to capture the final transcription.
             transcription_gen = self.transcriber.process_stream(request_iterator)
 
             final_text = ""
-            for response in transcription_gen:
+            async for response in transcription_gen:
                 yield response
                 # Keep track of text updates to ensure we have the latest
                 if response.event_type == "transcription":
@@ -61,7 +62,8 @@ class ChatService(service_pb2_grpc.ChatServiceServicer):
                 return
 
             # 2. Handover to RAG Pipeline (Yields "thinking" and "answer" events)
-            yield from self.pipeline.run_stream(final_text)
+            async for event in self.pipeline.run_stream(final_text):
+                yield event
 
             # 3. Finish
             yield service_pb2.ChatStreamResponse(event_type="done")  # type: ignore
@@ -71,9 +73,21 @@ class ChatService(service_pb2_grpc.ChatServiceServicer):
             context.set_code(grpc.StatusCode.INTERNAL)
 
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    pipeline = PipelineFactory.create(config)
+async def serve():
+    # asyncio-native server: concurrency is bounded by open streams, not a thread pool
+    server = grpc.aio.server(
+        maximum_concurrent_rpcs=config.CHAT_MAX_CONCURRENT_RPCS or None
+    )
+    semantic_cache = PipelineFactory.create_semantic_cache(config)
+    pipeline = PipelineFactory.create(config, semantic_cache)
+
+    invalidation_task = None
+    if semantic_cache is not None:
+        # Drop cached answers as soon as their source documents change
+        invalidation_task = asyncio.create_task(
+            listen_for_invalidations(semantic_cache, RedisFactory.get_client(config))
+        )
+
     service_pb2_grpc.add_ChatServiceServicer_to_server(
         ChatService(pipeline, settings=config), server
     )
@@ -81,5 +95,9 @@ def serve():
     port = config.CHAT_SERVICE_PORT
     server.add_insecure_port(f"[::]:{port}")
     logger.info(f"Chat Service started on port {port}")
-    server.start()
-    server.wait_for_termination()
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        if invalidation_task is not None:
+            invalidation_task.cancel()
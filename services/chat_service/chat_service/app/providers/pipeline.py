@@ -1,11 +1,14 @@
 import logging
-import grpc
+from typing import Optional
 from chat_service.app.core.pipeline import FlexiblePipeline
+from chat_service.app.core.semantic_cache import SemanticAnswerCache
 
 from chat_service.app.core.steps import (
     ThinkingStep,
     RetrievalStep,
     GenerationStep,
+    SemanticCacheStep,
+    SemanticCacheStoreStep,
 )
 
 from chat_service.app.adapters.grpc_adapters import (
@@ -14,6 +17,11 @@ from chat_service.app.adapters.grpc_adapters import (
 )
 from shared.protos import service_pb2_grpc
 from shared.config import Config
+from shared.providers.grpc_channels import (
+    GrpcChannelPool,
+    build_channel_options,
+    resolve_target,
+)
 
 logger = logging.getLogger("Chat-Service.Providers.Pipeline")
 
@@ -24,26 +32,45 @@ class PipelineFactory:
     """
 
     @staticmethod
-    def create(settings: Config) -> FlexiblePipeline:
+    def create_semantic_cache(settings: Config) -> Optional[SemanticAnswerCache]:
+        """
+        Builds the semantic answer cache when SEMANTIC_CACHE_ENABLED is set,
+        reusing the shared embedding model configuration.
+        """
+        if not settings.SEMANTIC_CACHE_ENABLED:
+            return None
+
+        # Imported lazily: the embedding stack is only needed with the cache on
+        from shared.providers.embeddings import EmbeddingFactory
+
+        logger.info("Initializing Semantic Answer Cache...")
+        embeddings = EmbeddingFactory.get_embeddings(settings)
+        return SemanticAnswerCache(embeddings, settings)
+
+    @staticmethod
+    def create(
+        settings: Config, semantic_cache: Optional[SemanticAnswerCache] = None
+    ) -> FlexiblePipeline:
         config = settings
         logger.info("Initializing RAG Pipeline connections...")
 
-        # Helper to fix Docker networking issues (0.0.0.0 vs localhost)
-        def get_target(host, port):
-            if host == "0.0.0.0":
-                host = "localhost"
-            return f"{host}:{port}"
+        # Long-lived async channels (must be created inside the running event loop)
+        options = build_channel_options(config)
 
         # Create RAG Stub
-        rag_target = get_target(config.RAG_SERVICE_HOST, config.RAG_SERVICE_PORT)
-        rag_channel = grpc.insecure_channel(rag_target)
-        rag_stub = service_pb2_grpc.RAGServiceStub(rag_channel)
+        rag_target = resolve_target(config.RAG_SERVICE_HOST, config.RAG_SERVICE_PORT)
+        rag_channels = GrpcChannelPool(
+            "rag", [rag_target], service_pb2_grpc.RAGServiceStub, options
+        )
+        rag_stub = rag_channels.get_stub()
         logger.info(f"Connected to RAG Service at {rag_target}")
 
         # Create LLM Stub
-        llm_target = get_target(config.LLM_SERVICE_HOST, config.LLM_SERVICE_PORT)
-        llm_channel = grpc.insecure_channel(llm_target)
-        llm_stub = service_pb2_grpc.LLMServiceStub(llm_channel)
+        llm_target = resolve_target(config.LLM_SERVICE_HOST, config.LLM_SERVICE_PORT)
+        llm_channels = GrpcChannelPool(
+            "llm", [llm_target], service_pb2_grpc.LLMServiceStub, options
+        )
+        llm_stub = llm_channels.get_stub()
         logger.info(f"Connected to LLM Service at {llm_target}")
 
         # Create adapters
@@ -57,6 +84,10 @@ class PipelineFactory:
             GenerationStep(generator_adapter),
         ]
 
+        if semantic_cache is not None:
+            steps.insert(1, SemanticCacheStep(semantic_cache))
+            steps.append(SemanticCacheStoreStep(semantic_cache))
+
         # steps=[
         #     ThinkingStep(),
         #     SafetyCheckStep(), # New step injected easily
@@ -1,4 +1,5 @@
 import sys
+import asyncio
 
 from chat_service.app.main import serve
 
@@ -14,7 +15,7 @@ def run():
     logger.info(f"Starting Chat Service...")
 
     try:
-        serve()
+        asyncio.run(serve())
     except KeyboardInterrupt:
         logger.info("Chat Service stopped manually.")
         sys.exit(0)
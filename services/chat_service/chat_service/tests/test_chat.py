@@ -1,56 +1,63 @@
+import asyncio
 import pytest
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import AsyncMock, MagicMock, patch
+from fakeredis import FakeServer, aioredis as fake_aioredis
 from chat_service.app.main import ChatService
 from chat_service.app.core.transcriber import TranscriptionService
-from chat_service.app.core.pipeline import RAGPipeline
+from chat_service.app.core.pipeline import FlexiblePipeline
+from chat_service.app.core.steps import (
+    ThinkingStep,
+    RetrievalStep,
+    GenerationStep,
+    SemanticCacheStep,
+    SemanticCacheStoreStep,
+    SyncStepAdapter,
+)
+from chat_service.app.core.semantic_cache import SemanticAnswerCache, listen_for_invalidations
+from chat_service.app.adapters.grpc_adapters import (
+    GrpcContextRetriever,
+    GrpcAnswerGenerator,
+)
+from chat_service.app.interfaces import SyncPipelineStep
+from shared.config import Config
 from shared.protos import service_pb2
 
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
 # ==========================================
 # 1. TEST TRANSCRIBER CORE
 # ==========================================
 
 
-@patch("chat_service.app.core.transcriber.STTProvider")
-@patch("chat_service.app.core.transcriber.time")
-def test_transcriber_process_stream(mock_time, mock_stt_provider):
+@pytest.mark.asyncio
+@patch("chat_service.app.core.transcriber.STTFactory")
+async def test_transcriber_process_stream(mock_stt_factory):
     """
-    Test that the transcriber accumulates buffer and yields events.
+    Test that the transcriber accumulates the async stream and yields one transcription.
     """
-    # Setup Mocks
-    mock_stt = mock_stt_provider.return_value
-    mock_stt.transcribe.side_effect = ["Hello", "Hello World", "Hello World"]  # Simulate growing text
-
-    # Simulate time progressing to trigger intermediate updates
-    mock_time.time.side_effect = [
-        100.0,
-        100.6,
-        101.2,
-    ]  # 0.6s intervals > 0.5s threshold
-
-    # Setup Input Iterator (2 chunks of audio)
-    chunk1 = MagicMock(content=b"audio1")
-    chunk2 = MagicMock(content=b"audio2")
-    request_iterator = iter([chunk1, chunk2])
-
-    # Initialize Service
-    service = TranscriptionService()
+    mock_stt = mock_stt_factory.get_transcriber.return_value
+    mock_stt.transcribe.return_value = "Hello World"
 
-    # Run
-    responses = list(service.process_stream(request_iterator))
+    converter = MagicMock()
+    converter.convert_bytes.return_value = b"wav"
 
-    # Assertions
-    # 1. Check if we got "listening" events for each chunk
-    listening_events = [r for r in responses if r.event_type == "listening"]
-    assert len(listening_events) == 2
+    chunk1 = MagicMock(content=b"audio1")
+    chunk2 = MagicMock(content=b"audio2")
 
-    # 2. Check if we got transcription updates
-    transcription_events = [r for r in responses if r.event_type == "transcription"]
-    assert len(transcription_events) >= 1
-    assert transcription_events[-1].text_chunk == "Hello World"
+    service = TranscriptionService(converter=converter, settings=Config())
+    responses = await _collect(service.process_stream(_aiter([chunk1, chunk2])))
 
-    # 3. Verify STT was called with growing buffer
-    # First call: b"audio1", Second call: b"audio1audio2"
-    mock_stt.transcribe.assert_has_calls([call(b"audio1"), call(b"audio1audio2")])
+    assert [r.event_type for r in responses] == ["transcription"]
+    assert responses[0].text_chunk == "Hello World"
+    converter.convert_bytes.assert_called_once_with(b"audio1audio2")
 
 
 # ==========================================
@@ -58,110 +65,206 @@ def test_transcriber_process_stream(mock_time, mock_stt_provider):
 # ==========================================
 
 
-@patch("chat_service.app.core.pipeline.service_pb2_grpc.LLMServiceStub")
-@patch("chat_service.app.core.pipeline.service_pb2_grpc.RAGServiceStub")
-@patch("chat_service.app.core.pipeline.grpc.insecure_channel")
-def test_pipeline_get_answer_unary(mock_channel, mock_rag_stub, mock_llm_stub):
-    """
-    Test the standard text-in text-out flow.
-    """
-    # Setup Mocks
-    rag_instance = mock_rag_stub.return_value
-    llm_instance = mock_llm_stub.return_value
-
-    # Mock RAG Return
+def _mock_stubs():
+    rag_stub = MagicMock()
     rag_resp = service_pb2.SearchResponse()  # type: ignore
     rag_resp.chunks.add(text="Context 1", doc_id="1")
-    rag_instance.RetrieveContext.return_value = rag_resp
+    rag_stub.RetrieveContext = AsyncMock(return_value=rag_resp)
 
-    # Mock LLM Return
-    llm_instance.GenerateResponse.return_value = service_pb2.LLMResponse(text="Final Answer")  # type: ignore
+    llm_stub = MagicMock()
+    llm_stub.StreamResponse.return_value = _aiter(
+        [service_pb2.LLMResponse(text="Final"), service_pb2.LLMResponse(text=" Answer")]  # type: ignore
+    )
+    return rag_stub, llm_stub
 
-    # Run
-    pipeline = RAGPipeline()
-    response = pipeline.get_answer_unary("Question")
 
-    # Assertions
+@pytest.mark.asyncio
+async def test_pipeline_run_unary():
+    """
+    Test the standard text-in text-out flow over async stubs.
+    """
+    rag_stub, llm_stub = _mock_stubs()
+    pipeline = FlexiblePipeline(
+        steps=[
+            ThinkingStep(),
+            RetrievalStep(GrpcContextRetriever(rag_stub, Config())),
+            GenerationStep(GrpcAnswerGenerator(llm_stub)),
+        ]
+    )
+
+    response = await pipeline.run_unary("Question")
+
     assert response.text == "Final Answer"
     assert len(response.context_chunks) == 1
+    assert rag_stub.RetrieveContext.call_args[0][0].query_text == "Question"
 
-    # Verify RAG called with question
-    rag_instance.RetrieveContext.assert_called_once()
-    assert rag_instance.RetrieveContext.call_args[0][0].query_text == "Question"
-
-    # Verify LLM called with Context + Question
-    llm_instance.GenerateResponse.assert_called_once()
-    llm_arg = llm_instance.GenerateResponse.call_args[0][0]
+    llm_arg = llm_stub.StreamResponse.call_args[0][0]
     assert "Context 1" in llm_arg.context
     assert llm_arg.user_query == "Question"
 
 
+@pytest.mark.asyncio
+async def test_pipeline_wraps_sync_steps():
+    """Legacy blocking steps still run, via SyncStepAdapter."""
+
+    class LegacyStep(SyncPipelineStep):
+        def execute(self, context):
+            context["seen"] = True
+            yield service_pb2.ChatStreamResponse(event_type="legacy")  # type: ignore
+
+    pipeline = FlexiblePipeline(steps=[ThinkingStep(), LegacyStep()])
+    assert isinstance(pipeline.steps[1], SyncStepAdapter)
+
+    events = await _collect(pipeline.run_stream("Hi"))
+    assert [e.event_type for e in events] == ["thinking", "legacy"]
+
+
 # ==========================================
 # 3. TEST SERVICE ORCHESTRATOR (MAIN)
 # ==========================================
 
 
 @pytest.fixture
-def mock_cores():
-    """Patches both the Transcriber and Pipeline used by main.py"""
-    with patch("chat_service.app.main.TranscriptionService") as mock_trans, patch(
-        "chat_service.app.main.RAGPipeline"
-    ) as mock_pipe:
-        yield (mock_trans.return_value, mock_pipe.return_value)
+def mock_transcriber():
+    with patch("chat_service.app.main.TranscriptionService") as mock_trans:
+        yield mock_trans.return_value
 
 
-def test_interact_endpoint(mock_cores):
+@pytest.mark.asyncio
+async def test_interact_endpoint(mock_transcriber):
     """Test /interact just delegates to pipeline"""
-    _, mock_pipeline = mock_cores
-    mock_pipeline.get_answer_unary.return_value = "Success"
-
-    service = ChatService()
-    request = MagicMock(user_query="Hi")
+    mock_pipeline = MagicMock()
+    mock_pipeline.run_unary = AsyncMock(return_value="Success")
 
-    result = service.Interact(request, MagicMock())
+    service = ChatService(mock_pipeline, settings=Config())
+    result = await service.Interact(MagicMock(user_query="Hi"), MagicMock())
 
     assert result == "Success"
-    mock_pipeline.get_answer_unary.assert_called_with("Hi")
+    mock_pipeline.run_unary.assert_awaited_with("Hi")
 
 
-def test_stream_audio_chat(mock_cores):
+@pytest.mark.asyncio
+async def test_stream_audio_chat(mock_transcriber):
     """Test the full audio flow: Transcribe -> Pipeline"""
-    mock_transcriber, mock_pipeline = mock_cores
-
-    # 1. Mock Transcriber Generator
-    # It yields a transcription event, then finishes
-    mock_transcriber.process_stream.return_value = iter(
-        [
-            service_pb2.ChatStreamResponse(  # type: ignore
-                event_type="transcription", text_chunk="Hello AI"
-            )
-        ]
+    mock_transcriber.process_stream.return_value = _aiter(
+        [service_pb2.ChatStreamResponse(event_type="transcription", text_chunk="Hello AI")]  # type: ignore
     )
-
-    # 2. Mock Pipeline Generator
-    # It yields an answer event
-    mock_pipeline.get_answer_stream.return_value = iter(
+    mock_pipeline = MagicMock()
+    mock_pipeline.run_stream.return_value = _aiter(
         [service_pb2.ChatStreamResponse(event_type="answer", text_chunk="Hello Human")]  # type: ignore
     )
 
-    service = ChatService()
-    request_iterator = MagicMock()  # Dummy iterator
+    service = ChatService(mock_pipeline, settings=Config())
+    responses = await _collect(service.StreamAudioChat(_aiter([]), MagicMock()))
 
-    # Run
-    responses = list(service.StreamAudioChat(request_iterator, MagicMock()))
+    assert responses[0].text_chunk == "Hello AI"
+    assert responses[1].text_chunk == "Hello Human"
+    assert responses[-1].event_type == "done"
+    mock_pipeline.run_stream.assert_called_with("Hello AI")
 
-    # Assertions
 
-    # Did we get the transcription?
-    assert responses[0].text_chunk == "Hello AI"
-    assert responses[0].event_type == "transcription"
+# ==========================================
+# 4. TEST SEMANTIC ANSWER CACHE
+# ==========================================
 
-    # Did we get the answer from the pipeline?
-    assert responses[1].text_chunk == "Hello Human"
-    assert responses[1].event_type == "answer"
 
-    # Did we get the 'done' signal?
-    assert responses[-1].event_type == "done"
+class _FakeEmbeddings:
+    """Maps known queries to fixed vectors."""
+
+    VECTORS = {
+        "What is the leave policy?": [1.0, 0.0, 0.0],
+        "what is the leave policy": [0.99, 0.05, 0.0],
+        "Who approves expenses?": [0.0, 1.0, 0.0],
+    }
+
+    def embed_query(self, text):
+        return self.VECTORS[text]
+
+
+def _cached_pipeline(cache, llm_stub, rag_stub):
+    return FlexiblePipeline(
+        steps=[
+            ThinkingStep(),
+            SemanticCacheStep(cache),
+            RetrievalStep(GrpcContextRetriever(rag_stub, Config())),
+            GenerationStep(GrpcAnswerGenerator(llm_stub)),
+            SemanticCacheStoreStep(cache),
+        ]
+    )
+
 
-    # Verify Data Handoff: Did the pipeline receive the text from the transcriber?
-    mock_pipeline.get_answer_stream.assert_called_with("Hello AI")
+@pytest.mark.asyncio
+async def test_semantic_cache_replays_similar_queries():
+    cache = SemanticAnswerCache(_FakeEmbeddings(), Config(SEMANTIC_CACHE_THRESHOLD=0.9))
+    rag_stub, llm_stub = _mock_stubs()
+    pipeline = _cached_pipeline(cache, llm_stub, rag_stub)
+
+    first = await pipeline.run_unary("What is the leave policy?")
+    second = await pipeline.run_unary("what is the leave policy")
+
+    assert second.text == first.text == "Final Answer"
+    assert [c.doc_id for c in second.context_chunks] == ["1"]
+    # Second query never reached the RAG / LLM services
+    assert rag_stub.RetrieveContext.await_count == 1
+    assert llm_stub.StreamResponse.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+    # Dissimilar query misses
+    rag_stub, llm_stub = _mock_stubs()
+    pipeline = _cached_pipeline(cache, llm_stub, rag_stub)
+    await pipeline.run_unary("Who approves expenses?")
+    assert rag_stub.RetrieveContext.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_invalidates_on_document_change():
+    cache = SemanticAnswerCache(_FakeEmbeddings(), Config(SEMANTIC_CACHE_THRESHOLD=0.9))
+    rag_stub, llm_stub = _mock_stubs()
+    await _cached_pipeline(cache, llm_stub, rag_stub).run_unary("What is the leave policy?")
+
+    assert cache.invalidate_docs(["other_doc"]) == 0
+    assert cache.invalidate_docs(["1"]) == 1
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_skips_answers_generated_across_an_invalidation():
+    cache = SemanticAnswerCache(_FakeEmbeddings(), Config(SEMANTIC_CACHE_THRESHOLD=0.9))
+    context = {"query": "What is the leave policy?"}
+    await _collect(SemanticCacheStep(cache).execute(context))
+
+    # The document changes while the answer is being generated
+    cache.invalidate_docs(["1"])
+    context.update(chunks=[service_pb2.ContextChunk(doc_id="1")], answer="Stale Answer")  # type: ignore
+    await _collect(SemanticCacheStoreStep(cache).execute(context))
+
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidation_listener_retries_until_redis_is_up():
+    server = FakeServer()
+    server.connected = False
+    redis_client = fake_aioredis.FakeRedis(server=server, decode_responses=True)
+    cache = SemanticAnswerCache(_FakeEmbeddings(), Config())
+    listener = asyncio.create_task(listen_for_invalidations(cache, redis_client))
+    try:
+        await asyncio.sleep(0.1)
+        assert not listener.done()
+
+        server.connected = True
+        for _ in range(50):
+            if (await redis_client.pubsub_numsub("document_events"))[0][1]:
+                break
+            await asyncio.sleep(0.1)
+        vector = await cache.embed("What is the leave policy?")
+        cache.store("What is the leave policy?", vector, [service_pb2.ContextChunk(doc_id="1")], "Answer")  # type: ignore
+
+        await redis_client.publish("document_events", '{"event": "deleted", "doc_id": "1"}')
+        for _ in range(20):
+            if not cache.stats()["size"]:
+                break
+            await asyncio.sleep(0.1)
+        assert cache.stats()["size"] == 0
+    finally:
+        listener.cancel()
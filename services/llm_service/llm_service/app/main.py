@@ -1,6 +1,6 @@
+import asyncio
 import grpc
 import logging
-from concurrent import futures
 
 from shared.protos import service_pb2, service_pb2_grpc
 from shared.config import config, setup_logging, Config
@@ -14,6 +14,8 @@ class LLMService(service_pb2_grpc.LLMServiceServicer):
     def __init__(self, chain_provider: ChainProvider, settings: Config):
         self.config = settings
         self.chain_provider = chain_provider
+        # Bounds concurrent generations; excess requests wait here (no thread pool cap)
+        self.in_flight = asyncio.Semaphore(self.config.LLM_MAX_IN_FLIGHT)
         logger.info("LLM Service initialized with dependencies")
 
     def _get_chain(self, request):
@@ -24,12 +26,16 @@ class LLMService(service_pb2_grpc.LLMServiceServicer):
         """
         strategy = getattr(request, "strategy", "policy_chat") or "policy_chat"
         
-        return self.chain_provider.create_chain(
+        chain = self.chain_provider.create_chain(
             system_prompt=request.system_prompt,
             strategy_type=strategy
         )
+        if logger.isEnabledFor(logging.DEBUG):
+            # Hot path: only collect cache stats when they are logged
+            logger.debug(f"Chain cache: {self.chain_provider.cache_info()}")
+        return chain
     
-    def GenerateResponse(self, request, context):
+    async def GenerateResponse(self, request, context):
         try:
             logger.info(f"Generating response for: {request.user_query[:20]}...")
 
@@ -39,9 +45,10 @@ class LLMService(service_pb2_grpc.LLMServiceServicer):
 
             # 2. Run the Chain
             # We map the gRPC request fields to the Prompt variables
-            result_text = chain.invoke(
-                {"context": request.context, "input": request.user_query}
-            )
+            async with self.in_flight:
+                result_text = await chain.ainvoke(
+                    {"context": request.context, "input": request.user_query}
+                )
             logger.info("Chain invoked successfully")
 
             return service_pb2.LLMResponse(text=result_text)  # type: ignore
@@ -53,7 +60,7 @@ class LLMService(service_pb2_grpc.LLMServiceServicer):
             context.set_details(str(e))
             return service_pb2.LLMResponse()  # type: ignore
 
-    def StreamResponse(self, request, context):
+    async def StreamResponse(self, request, context):
         try:
             logger.info(f"Streaming response for: {request.user_query[:20]}...")
 
@@ -63,10 +70,11 @@ class LLMService(service_pb2_grpc.LLMServiceServicer):
 
             # 2. Stream the Chain
             logger.info("Starting token streaming")
-            for token in chain.stream(
-                {"context": request.context, "input": request.user_query}
-            ):
-                yield service_pb2.LLMResponse(text=token)  # type: ignore
+            async with self.in_flight:
+                async for token in chain.astream(
+                    {"context": request.context, "input": request.user_query}
+                ):
+                    yield service_pb2.LLMResponse(text=token)  # type: ignore
 
         except Exception as e:
             logger.error(f"Stream Error: {e}")
@@ -74,11 +82,11 @@ class LLMService(service_pb2_grpc.LLMServiceServicer):
             context.set_code(grpc.StatusCode.INTERNAL)
 
 
-def serve():
+async def serve():
     logger.info("Initializing dependencies...")
     chain_provider = ChainProvider(config)
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.aio.server()
 
     service = LLMService(chain_provider=chain_provider, settings=config)
 
@@ -86,11 +94,13 @@ def serve():
 
     port = config.LLM_SERVICE_PORT
     server.add_insecure_port(f"[::]:{port}")
-    logger.info(f"LLM Service started on port {port}")
+    logger.info(
+        f"LLM Service started on port {port} (max in-flight: {config.LLM_MAX_IN_FLIGHT})"
+    )
 
-    server.start()
-    server.wait_for_termination()
+    await server.start()
+    await server.wait_for_termination()
 
 
 if __name__ == "__main__":
-    serve()
+    asyncio.run(serve())
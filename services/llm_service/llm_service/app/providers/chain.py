@@ -1,6 +1,9 @@
+import hashlib
 import logging
+from typing import Any, Dict
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import Runnable
+from shared.cache import LRUCache
 from shared.config import Config
 from shared.providers.llm import LLMFactory
 from llm_service.app.providers.chain_strategies import ChainBuilderFactory
@@ -11,6 +14,8 @@ logger = logging.getLogger("LLM-Service.Providers.Chain")
 class ChainProvider:
     """
     Manages the creation of generation chains using the Strategy Pattern.
+    Built chains are pure functions of (strategy, system prompt), so they are
+    compiled once and served from an LRU cache on the hot path.
     """
 
     def __init__(self, settings: Config):
@@ -18,17 +23,26 @@ class ChainProvider:
         # Initialize Infrastructure (LLM & Parser)
         self.llm = LLMFactory.get_llm(self.config)
         self.output_parser = StrOutputParser()
+        self._chain_cache = LRUCache(maxsize=self.config.LLM_CHAIN_CACHE_SIZE)
 
     def create_chain(
         self, system_prompt: str = "", strategy_type: str = "policy_chat"
     ) -> Runnable:
         """
-        Builds the LCEL chain using a selected strategy.
+        Returns the LCEL chain for a selected strategy (cached).
 
         :param system_prompt: Optional override for system prompt.
         :param strategy_type: The key for the strategy (e.g., 'policy_chat', 'summarization').
         Defaults to 'policy_chat'.
         """
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        key = (strategy_type.lower(), prompt_hash)
+
+        return self._chain_cache.get_or_create(
+            key, lambda: self._build_chain(system_prompt, strategy_type)
+        )
+
+    def _build_chain(self, system_prompt: str, strategy_type: str) -> Runnable:
         builder = ChainBuilderFactory.get_builder(strategy_type)
 
         chain = builder.build(
@@ -37,3 +51,7 @@ class ChainProvider:
 
         logger.info(f"Created chain using strategy: {strategy_type}")
         return chain
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the compiled chain cache."""
+        return self._chain_cache.stats()
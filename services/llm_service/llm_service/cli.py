@@ -1,4 +1,5 @@
 import sys
+import asyncio
 import logging
 
 logger = logging.getLogger("LLM-Service-CLI")
@@ -10,7 +11,7 @@ def run():
     logger.info(f"Starting LLM Service...")
 
     try:
-        serve()
+        asyncio.run(serve())
     except KeyboardInterrupt:
         logger.info("LLM Service stopped manually.")
         sys.exit(0)
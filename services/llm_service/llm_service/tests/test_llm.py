@@ -1,81 +1,85 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from llm_service.app.main import LLMService
-from services.llm_service.llm_service.app.providers.chain_strategies import ChainProvider
+from llm_service.app.providers.chain import ChainProvider
+from shared.config import Config
 from shared.protos import service_pb2
 
 
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
 @pytest.fixture
 def mock_chain_provider():
-    """Patches the ChainProvider used by LLMService"""
-    with patch("llm_service.app.providers.chain.ChainProvider") as mock:
-        yield mock.return_value
+    """A stand-in for the ChainProvider used by LLMService"""
+    return MagicMock()
 
 
 @pytest.fixture
 def llm_service(mock_chain_provider):
     """Initializes Service with the mock provider"""
-    service = LLMService()
-    service.chain_provider = mock_chain_provider
-    return service
+    return LLMService(chain_provider=mock_chain_provider, settings=Config())
 
 
-def test_generate_response(llm_service, mock_chain_provider):
+@pytest.mark.asyncio
+async def test_generate_response(llm_service, mock_chain_provider):
     """Test standard unary generation"""
     # 1. Setup Mock Chain
     mock_chain = MagicMock()
-    mock_chain.invoke.return_value = "I am a helpful AI."
+    mock_chain.ainvoke = AsyncMock(return_value="I am a helpful AI.")
     mock_chain_provider.create_chain.return_value = mock_chain
 
     # 2. Create Request
-    request = service_pb2.LLMRequest(
+    request = service_pb2.LLMRequest(  # type: ignore
         user_query="Who are you?", context="Some context", system_prompt="Be cool."
     )
     context = MagicMock()
 
     # 3. Call Service
-    response = llm_service.GenerateResponse(request, context)
+    response = await llm_service.GenerateResponse(request, context)
 
     # 4. Assertions
     assert response.text == "I am a helpful AI."
 
-    mock_chain_provider.create_chain.assert_called_with("Be cool.")
+    mock_chain_provider.create_chain.assert_called_with(
+        system_prompt="Be cool.", strategy_type="policy_chat"
+    )
 
-    mock_chain.invoke.assert_called_once_with(
+    mock_chain.ainvoke.assert_awaited_once_with(
         {"context": "Some context", "input": "Who are you?"}
     )
 
 
-def test_stream_response(llm_service, mock_chain_provider):
+@pytest.mark.asyncio
+async def test_stream_response(llm_service, mock_chain_provider):
     """Test streaming generation"""
-    # 1. Setup Mock Chain to return an iterator
+    # 1. Setup Mock Chain to return an async iterator
     mock_chain = MagicMock()
     # Simulate token stream
-    mock_chain.stream.return_value = iter(["Hello", " ", "World"])
+    mock_chain.astream.return_value = _aiter(["Hello", " ", "World"])
     mock_chain_provider.create_chain.return_value = mock_chain
 
-    request = service_pb2.LLMRequest(user_query="Hi")
+    request = service_pb2.LLMRequest(user_query="Hi")  # type: ignore
     context = MagicMock()
 
-    # 2. Call Service (Returns generator)
-    response_iterator = llm_service.StreamResponse(request, context)
+    # 2. Call Service (Returns async generator) and consume it
+    results = [res.text async for res in llm_service.StreamResponse(request, context)]
 
-    # 3. Consume Generator
-    results = [res.text for res in response_iterator]
-
-    # 4. Assertions
+    # 3. Assertions
     assert results == ["Hello", " ", "World"]
-    mock_chain.stream.assert_called_once()
+    mock_chain.astream.assert_called_once()
 
 
-@patch("llm_service.app.providers.chain.LLMProvider")
-def test_chain_provider_logic(mock_provider):
+@patch("llm_service.app.providers.chain.LLMFactory")
+def test_chain_provider_logic(mock_factory):
     """Test that ChainProvider constructs a Runnable chain"""
     # Setup Mock LLM
     mock_llm = MagicMock()
-    mock_provider.return_value.get_llm.return_value = mock_llm
+    mock_factory.get_llm.return_value = mock_llm
 
-    provider = ChainProvider()
+    provider = ChainProvider(Config())
 
     # Create a chain
     chain = provider.create_chain(system_prompt="You are a bot")
@@ -84,5 +88,25 @@ def test_chain_provider_logic(mock_provider):
     assert provider.llm == mock_llm
     # In LCEL, the resulting object is a RunnableSequence
     # We just verify it's not None and is "runnable-like"
-    assert hasattr(chain, "invoke")
-    assert hasattr(chain, "stream")
+    assert hasattr(chain, "ainvoke")
+    assert hasattr(chain, "astream")
+
+
+@patch("llm_service.app.providers.chain.LLMFactory")
+def test_chain_provider_caches_built_chains(mock_factory):
+    """Same (strategy, system prompt) reuses the compiled chain"""
+    mock_factory.get_llm.return_value = MagicMock()
+    provider = ChainProvider(Config(LLM_CHAIN_CACHE_SIZE=2))
+
+    first = provider.create_chain(system_prompt="A")
+    assert provider.create_chain(system_prompt="A") is first
+    assert provider.create_chain(system_prompt="B") is not first
+
+    # Bounded: a third distinct key evicts the least recently used ("A")
+    provider.create_chain(system_prompt="C")
+    assert provider.create_chain(system_prompt="A") is not first
+
+    info = provider.cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 4
+    assert info["size"] == 2
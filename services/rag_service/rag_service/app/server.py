@@ -9,11 +9,16 @@ logger = logging.getLogger("RAG-Service.App.Server")
 
 async def serve():
     server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10))
-    service_pb2_grpc.add_RAGServiceServicer_to_server(RAGService(settings=config), server)
+    service = RAGService(settings=config)
+    service_pb2_grpc.add_RAGServiceServicer_to_server(service, server)
     
     port = config.RAG_SERVICE_PORT
     server.add_insecure_port(f"[::]:{port}")
     
     logger.info(f"RAG Service running on port {port}")
     await server.start()
-    await server.wait_for_termination()
\ No newline at end of file
+    await service.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await service.stop()
\ No newline at end of file
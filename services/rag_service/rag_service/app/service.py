@@ -1,18 +1,21 @@
-import time
 import json
 import logging
 import asyncio
 
 from shared.protos import service_pb2, service_pb2_grpc
 from shared.config import Config
+from shared.cache import LRUCache
 
-from rag_service.components.graph_retriever import GraphRetriever
+from rag_service.components.entity_matcher import EntityDictionary
+from rag_service.components.graph_retriever import GraphRetriever, listen_for_graph_updates
 from rag_service.components.search_engine import SearchEngine
 from rag_service.core.dependencies import get_vector_store
 
 from shared.providers.llm import LLMFactory
-from shared.providers.neo4j_client import Neo4jClient
+from shared.providers.lexical_index import LexicalIndexBuilder
+from shared.providers.neo4j_client import AsyncNeo4jClient
 from shared.providers.redis import RedisFactory
+from shared.providers.job_queue import JobQueueFactory
 
 logger = logging.getLogger("RAG-Service.App.Service")
 
@@ -23,23 +26,68 @@ class RAGService(service_pb2_grpc.RAGServiceServicer):
         logger.info("Initializing RAG Service components")
 
         self.redis = RedisFactory.get_client(self.config)
+        self.job_queue = JobQueueFactory.get_queue(self.redis, self.config)
 
         vector_store_adapter = get_vector_store()
         # Search Engine for Retrieval
         self.search_engine = SearchEngine(vector_store_adapter, self.config)
 
-        self.neo4j_client = Neo4jClient.get_instance()
+        self.neo4j_client = AsyncNeo4jClient.get_instance(self.config)
         self.llm = LLMFactory.get_llm(self.config)
-        self.graph_retriever = GraphRetriever(self.neo4j_client, self.llm)
+        self.entity_dictionary = (
+            EntityDictionary()
+            if self.config.GRAPH_ENTITY_EXTRACTOR.lower() == "dictionary"
+            else None
+        )
+        context_cache = (
+            LRUCache(
+                self.config.GRAPH_CONTEXT_CACHE_SIZE,
+                ttl_seconds=self.config.GRAPH_CONTEXT_CACHE_TTL_SECONDS or None,
+            )
+            if self.config.GRAPH_CONTEXT_CACHE_SIZE > 0
+            else None
+        )
+        self.graph_retriever = GraphRetriever(
+            self.neo4j_client,
+            self.llm,
+            entity_dictionary=self.entity_dictionary,
+            context_cache=context_cache,
+        )
+        # Deleting a document also drops its chunks from the BM25 index
+        self.lexical_index = (
+            LexicalIndexBuilder(self.config.LEXICAL_INDEX_DIR)
+            if self.config.LEXICAL_INDEX_ENABLED
+            else None
+        )
+        self._background_tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        """Keeps the graph retriever (entity dictionary, context cache) in sync with ingestion."""
+        # Subscribe before loading so ids written in between are not missed
+        self._background_tasks.append(
+            asyncio.create_task(listen_for_graph_updates(self.graph_retriever, self.redis))
+        )
+        if self.entity_dictionary is None:
+            return
+        try:
+            await self.entity_dictionary.load(self.neo4j_client)
+        except Exception as e:
+            # Queries still work: every lookup falls back to the LLM extractor
+            logger.error(f"Entity dictionary load failed: {e}")
+
+    async def stop(self):
+        for task in self._background_tasks:
+            task.cancel()
+        self._background_tasks.clear()
+        await AsyncNeo4jClient.close_instance()
 
     async def RetrieveContext(self, request, context):
         try:
             loop = asyncio.get_running_loop()
             
             # Prepare Parallel Tasks
-            # We use run_in_executor because search_engine and graph_retriever 
-            # likely use blocking I/O (Requests/Socket)
-            
+            # The search engine uses blocking I/O, so it runs in a thread;
+            # graph retrieval is natively async (Neo4j async driver, async LLM call)
             vector_task = loop.run_in_executor(
                 None, 
                 lambda: self.search_engine.search(
@@ -48,23 +96,22 @@ class RAGService(service_pb2_grpc.RAGServiceServicer):
                 )
             )
 
-            graph_task = loop.run_in_executor(
-                None,
-                lambda: self.graph_retriever.get_context(request.query_text)
-            )
+            graph_task = self.graph_retriever.retrieve(request.query_text)
 
             # Execute concurrently
-            vector_results, graph_context_str = await asyncio.gather(vector_task, graph_task)
+            vector_results, graph_context = await asyncio.gather(vector_task, graph_task)
+            graph_context_str = graph_context.text
 
             # Build Response
             response = service_pb2.SearchResponse()  # type: ignore
             
             # Add Vector Chunks
-            for doc in vector_results:
+            for doc, score in vector_results:
                 chunk = response.chunks.add()
                 chunk.text = doc.page_content
                 chunk.doc_id = doc.metadata.get("doc_id", "unknown")
-                chunk.score = 1.0 # Placeholder score
+                # Hybrid BM25-only hits carry no dense relevance
+                chunk.score = score if score is not None else 0.0
 
             # Add Graph Chunk (if content found)
             if graph_context_str:
@@ -72,9 +119,21 @@ class RAGService(service_pb2_grpc.RAGServiceServicer):
                 chunk.text = f"--- GRAPH KNOWLEDGE ---\n{graph_context_str}"
                 chunk.doc_id = "graph_retrieval"
                 chunk.score = 1.0
+                for relation in graph_context.relations:
+                    chunk.triples.add(
+                        source=relation["source"],
+                        relation=relation["rel"],
+                        target=relation["target"],
+                    )
 
             logger.info(
-                f"Retrieved {len(vector_results)} vector docs and graph context for: '{request.query_text}'"
+                f"Retrieved {len(vector_results)} vector docs and graph context "
+                f"({len(graph_context.relations)} relations, truncated: {graph_context.truncated}) "
+                f"for: '{request.query_text}'"
+            )
+            logger.debug(
+                f"Graph entity extraction: {self.graph_retriever.entity_extraction_info()}, "
+                f"context cache: {self.graph_retriever.cache_info()}"
             )
             return response
             
@@ -83,12 +142,9 @@ class RAGService(service_pb2_grpc.RAGServiceServicer):
             return service_pb2.SearchResponse()  # type: ignore
 
     async def TriggerSync(self, request, context):
-        job_payload = json.dumps(
-            {"doc_id": request.doc_id, "file_path": request.file_path}
-        )
+        job_payload = {"doc_id": request.doc_id, "file_path": request.file_path}
         try:
-            await self.redis.lpush("rag_jobs", job_payload) # type: ignore
-            job_id = f"job_{int(time.time())}"
+            job_id = await self.job_queue.enqueue(job_payload)
             logger.info(
                 f"Queued RAG job for doc_id: {request.doc_id}, job_id: {job_id}"
             )
@@ -126,6 +182,14 @@ class RAGService(service_pb2_grpc.RAGServiceServicer):
             if success:
                 logger.info(f"Vectors deleted for doc_id: {request.doc_id}")
                 await self.redis.hdel("rag_documents", request.doc_id) # type: ignore
+                # Forget the chunk manifest so a re-upload is ingested in full
+                await self.redis.delete(f"rag_manifest:{request.doc_id}")
+                if self.lexical_index is not None:
+                    await asyncio.to_thread(self.lexical_index.remove_document, request.doc_id)
+                await self.redis.publish(
+                    "document_events",
+                    json.dumps({"event": "deleted", "doc_id": request.doc_id}),
+                )
             logger.info(
                 f"Deleted vectors for doc_id: {request.doc_id}, success: {success}"
             )
@@ -0,0 +1,133 @@
+import logging
+import threading
+from collections import deque
+from typing import Dict, Iterable, List
+
+from shared.providers.neo4j_client import AsyncNeo4jClient
+
+logger = logging.getLogger("RAG-Service.Components.EntityMatcher")
+
+
+class EntityDictionary:
+    """
+    In-memory dictionary of graph node ids, matched against query text with an
+    Aho-Corasick automaton (one pass over the query, independent of dictionary size).
+
+    Matching is case-insensitive and only accepts whole-word hits; overlapping
+    hits resolve to the longest, leftmost name. New names are added to the trie
+    incrementally; failure links are rebuilt lazily on the next match.
+    """
+
+    # Shorter names ("AI", "HR") match too much ordinary text
+    MIN_NAME_LENGTH = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Length of the name ending at a state (0 = none), and the nearest terminal suffix state
+        self._terminal: List[int] = [0]
+        self._output: List[int] = [0]
+        # Normalized name -> node id
+        self._names: Dict[str, str] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    async def load(self, neo4j_client: AsyncNeo4jClient) -> int:
+        """Loads every node id from the graph. Returns the dictionary size."""
+        rows = await neo4j_client.execute_read("MATCH (n) WHERE n.id IS NOT NULL RETURN n.id AS id")
+        self.add(row["id"] for row in rows)
+        logger.info(f"Entity dictionary loaded: {len(self)} names")
+        return len(self)
+
+    def add(self, names: Iterable[str]) -> int:
+        """Adds node ids to the trie. Returns how many were new."""
+        added = 0
+        with self._lock:
+            for name in names:
+                if not isinstance(name, str):
+                    continue
+                key = self._normalize(name)
+                if len(key) < self.MIN_NAME_LENGTH or key in self._names:
+                    continue
+                self._names[key] = name
+                state = 0
+                for char in key:
+                    nxt = self._goto[state].get(char)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][char] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._terminal.append(0)
+                        self._output.append(0)
+                    state = nxt
+                self._terminal[state] = len(key)
+                added += 1
+            if added:
+                self._dirty = True
+        return added
+
+    def _build_links(self):
+        """Breadth-first pass computing failure and output links (caller holds the lock)."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._output[child] = 0
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                link = self._fail[child]
+                self._output[child] = link if self._terminal[link] else self._output[link]
+                queue.append(child)
+        self._dirty = False
+
+    def match(self, text: str) -> List[str]:
+        """Returns the node ids found in `text`, in order of appearance (unique)."""
+        query = self._normalize(text)
+        with self._lock:
+            if self._dirty:
+                self._build_links()
+            hits = []  # (start, length)
+            state = 0
+            for end, char in enumerate(query, start=1):
+                while state and char not in self._goto[state]:
+                    state = self._fail[state]
+                state = self._goto[state].get(char, 0)
+                node = state if self._terminal[state] else self._output[state]
+                while node:
+                    length = self._terminal[node]
+                    start = end - length
+                    if self._is_boundary(query, start - 1) and self._is_boundary(query, end):
+                        hits.append((start, length))
+                    node = self._output[node]
+            names = self._names
+
+        # Leftmost-longest, non-overlapping
+        found: List[str] = []
+        covered = 0
+        for start, length in sorted(hits, key=lambda h: (h[0], -h[1])):
+            if start < covered:
+                continue
+            node_id = names[query[start:start + length]]
+            if node_id not in found:
+                found.append(node_id)
+            covered = start + length
+        return found
+
+    @staticmethod
+    def _is_boundary(text: str, index: int) -> bool:
+        return index < 0 or index >= len(text) or not text[index].isalnum()
+
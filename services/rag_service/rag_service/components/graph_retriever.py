@@ -1,39 +1,143 @@
 import re
+import json
+import asyncio
 import logging
-from shared.providers.neo4j_client import Neo4jClient
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from shared.cache import LRUCache
+from shared.config import Config, config as global_config
+from shared.providers.neo4j_client import ENTITY_LABEL, AsyncNeo4jClient
+from rag_service.components.entity_matcher import EntityDictionary
+from rag_service.components.graph_serializer import render_relations
 from langchain_core.messages import HumanMessage
 from langchain_core.language_models.chat_models import BaseChatModel
 
 logger = logging.getLogger(__name__)
 
+# Characters with special meaning in Lucene query syntax
+_LUCENE_SPECIAL = re.compile(r'[+\-!(){}\[\]^"~*?:\\/&|]')
+
+# Published by the RAG worker after it writes relations
+GRAPH_UPDATES_CHANNEL = "graph_updates"
+GRAPH_VERSION_KEY = "graph_version"
+# Update listener reconnect backoff (seconds)
+LISTENER_BACKOFF_MAX_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class GraphContext:
+    """
+    Result of a graph retrieval.
+    :param text: Relations rendered as `A -[REL]-> B` lines for the prompt.
+    :param relations: The rendered {"source", "rel", "target"} dicts, in relationship direction.
+    :param truncated: A search budget (hops, fan-out, hubs, timeout, tokens) cut the results short.
+    """
+
+    text: str = ""
+    relations: List[Dict[str, Any]] = field(default_factory=list)
+    truncated: bool = False
+
+
 class GraphRetriever:
-    def __init__(self, neo4j_client: Neo4jClient, llm: BaseChatModel):
+    def __init__(
+        self,
+        neo4j_client: AsyncNeo4jClient,
+        llm: BaseChatModel,
+        entity_dictionary: Optional[EntityDictionary] = None,
+        context_cache: Optional[LRUCache] = None,
+        settings: Config = global_config,
+    ):
         self.graph = neo4j_client
         self.llm = llm
+        # When set, query entities are matched against known node ids first (no LLM call)
+        self.entity_dictionary = entity_dictionary
+        self.dictionary_hits = 0
+        self.llm_fallbacks = 0
+        # Path results keyed on (entity ids, graph version); a write bumps the version
+        self.context_cache = context_cache
+        self.graph_version = 0
+
+        # Path search budgets (predictable worst-case latency)
+        self.max_hops = max(1, int(settings.GRAPH_PATH_MAX_HOPS))
+        self.max_paths = max(1, settings.GRAPH_MAX_PATHS)
+        self.neighbor_limit = max(1, settings.GRAPH_NEIGHBOR_LIMIT)
+        self.hub_degree = max(1, settings.GRAPH_HUB_DEGREE)
+        self.query_timeout = settings.GRAPH_QUERY_TIMEOUT_SECONDS or None
+        # Max prompt tokens spent on rendered relations (0 = unlimited)
+        self.context_token_budget = settings.GRAPH_CONTEXT_TOKEN_BUDGET
 
-    def get_context(self, question: str) -> str:
+    async def get_context(self, question: str) -> str:
+        return (await self.retrieve(question)).text
+
+    async def retrieve(self, question: str) -> GraphContext:
         """
         Orchestrates the Graph RAG retrieval:
-        1. Extract Entities from Question.
-        2. Map to Graph Nodes (Fuzzy Search).
-        3. Retrieve Paths (Deep Search).
+        1. Match known Graph Nodes in the Question (entity dictionary), or
+           extract Entities with the LLM and map them to Graph Nodes (Batched Fuzzy Search).
+        2. Retrieve Paths (Bounded Search).
         """
-        entities = self._extract_query_entities(question)
-        if not entities:
-            return ""
+        valid_ids = self._match_dictionary(question)
+        if not valid_ids:
+            entities = await self._extract_query_entities(question)
+            if not entities:
+                return GraphContext()
 
-        valid_ids = []
-        for entity in entities:
-            node_id = self._fuzzy_search_node(entity)
-            if node_id:
-                valid_ids.append(node_id)
+            valid_ids = await self._resolve_entities(entities)
+            if not valid_ids:
+                return GraphContext()
 
-        if not valid_ids:
-            return ""
+        if self.context_cache is None:
+            return await self._retrieve_paths(valid_ids)
+        key = (tuple(valid_ids), self.graph_version)
+        context = self.context_cache.get(key)
+        if context is None:
+            context = await self._retrieve_paths(valid_ids)
+            # Aborted searches (e.g. timeouts) are retried next time
+            if context.relations or not context.truncated:
+                self.context_cache.put(key, context)
+        return context
+
+    def on_graph_update(self, event: Dict[str, Any]):
+        """Applies a 'graph_updates' event: new entity names and the new graph version."""
+        if self.entity_dictionary is not None:
+            self.entity_dictionary.add(event.get("entities") or [])
+        version = event.get("version")
+        if version is not None:
+            self.set_graph_version(int(version))
+
+    def set_graph_version(self, version: int):
+        if version > self.graph_version:
+            self.graph_version = version
+            if self.context_cache is not None:
+                # Entries of older versions can never be hit again
+                self.context_cache.clear()
 
-        return self._retrieve_paths(valid_ids)
+    def cache_info(self) -> Dict[str, Any]:
+        info = self.context_cache.stats() if self.context_cache is not None else {}
+        return {**info, "graph_version": self.graph_version}
+
+    def _match_dictionary(self, question: str) -> list[str]:
+        """Exact node ids mentioned in the question; empty when the LLM extractor is needed."""
+        if self.entity_dictionary is None:
+            return []
+        ids = self.entity_dictionary.match(question)
+        if ids:
+            self.dictionary_hits += 1
+        else:
+            self.llm_fallbacks += 1
+        return ids
 
-    def _extract_query_entities(self, question: str) -> list[str]:
+    def entity_extraction_info(self) -> Dict[str, Any]:
+        """How often queries were served by the entity dictionary vs. the LLM extractor."""
+        total = self.dictionary_hits + self.llm_fallbacks
+        return {
+            "dictionary_hits": self.dictionary_hits,
+            "llm_fallbacks": self.llm_fallbacks,
+            "hit_rate": round(self.dictionary_hits / total, 4) if total else 0.0,
+            "dictionary_size": len(self.entity_dictionary) if self.entity_dictionary is not None else 0,
+        }
+
+    async def _extract_query_entities(self, question: str) -> list[str]:
         prompt = f"""
         Task: Identify the key **Graph Nodes** (Proper Nouns) to search for in the database.
         
@@ -60,7 +164,7 @@ class GraphRetriever:
         Question: "{question}"
         Output (Pipe separated):
         """
-        content = self.llm.invoke([HumanMessage(content=prompt)]).content
+        content = (await self.llm.ainvoke([HumanMessage(content=prompt)])).content
         if isinstance(content, list):
             raw = "".join(str(x) for x in content).strip()
         else:
@@ -74,38 +178,176 @@ class GraphRetriever:
         blacklist = ["output", "question", "answer", "unknown", "a", "b"]
         return [p for p in parts if p.lower() not in blacklist]
 
-    def _fuzzy_search_node(self, text: str):
-        clean_text = text.replace(":", "").replace(" ", " AND ") + "~"
-        query = f"""
-        CALL db.index.fulltext.queryNodes("entity_index", '{clean_text}') YIELD node, score
-        RETURN node.id as id, score
-        ORDER BY score DESC LIMIT 1
+    async def _resolve_entities(self, entities: list[str]) -> list[str]:
+        """
+        Maps all entities to their best-matching graph node ids in a single
+        parameterized round trip (one fulltext lookup per entity, via UNWIND).
+        Returns unique node ids in entity order.
+        """
+        queries = [
+            {"entity": entity, "lucene": lucene}
+            for entity in entities
+            if (lucene := self._to_lucene_query(entity))
+        ]
+        if not queries:
+            return []
+
+        query = """
+        UNWIND $queries AS q
+        CALL {
+            WITH q
+            CALL db.index.fulltext.queryNodes("entity_index", q.lucene) YIELD node, score
+            RETURN node.id AS id, score
+            ORDER BY score DESC LIMIT 1
+        }
+        RETURN q.entity AS entity, id, score
+        """
+        result = await self.graph.execute_read(query, {"queries": queries})
+
+        best = {row["entity"]: row["id"] for row in result if row.get("id")}
+        resolved = []
+        for q in queries:
+            node_id = best.get(q["entity"])
+            if node_id and node_id not in resolved:
+                resolved.append(node_id)
+        return resolved
+
+    @staticmethod
+    def _to_lucene_query(text: str) -> str:
+        """
+        Builds a fuzzy AND query from free text. Lucene syntax characters are
+        escaped and bare operator words lowercased, so user text cannot alter the query.
         """
-        result = self.graph.execute_read(query)
-        if result:
-            return result[0]['id']
-        return None
+        terms = []
+        for term in text.split():
+            term = _LUCENE_SPECIAL.sub(r"\\\g<0>", term)
+            if term in ("AND", "OR", "NOT", "TO"):
+                term = term.lower()
+            terms.append(f"{term}~")
+        return " AND ".join(terms)
 
-    def _retrieve_paths(self, entity_ids: list[str]) -> str:
+    async def _retrieve_paths(self, entity_ids: list[str]) -> GraphContext:
+        """
+        Bounded search: the neighborhood of a single entity, or the shortest paths
+        linking consecutive entities. Hubs are never expanded through, every hop is
+        capped, and the server aborts the query after the timeout budget.
+        """
         if len(entity_ids) == 1:
-            # Neighborhood Search
-            target = entity_ids[0]
-            query = f"""
-            MATCH (n)-[*1..2]-(m) 
-            WHERE n.id = '{target}' 
-            RETURN distinct n.id as source, m.id as target LIMIT 50
-            """
-            result = self.graph.execute_read(query)
-            return str(result)
-        
+            search = self._neighborhood
         elif len(entity_ids) >= 2:
-            # Deep Path Search
-            start, end = entity_ids[0], entity_ids[1]
-            query = f"""
-            MATCH p=(a)-[*1..4]-(b) 
-            WHERE a.id = '{start}' AND b.id = '{end}' 
-            RETURN p LIMIT 5
-            """
-            result = self.graph.execute_read(query)
-            return str(result)
-        return ""
\ No newline at end of file
+            search = self._shortest_paths
+        else:
+            return GraphContext()
+
+        try:
+            relations, truncated = await search(entity_ids)
+        except Exception as e:
+            # Usually the transaction timeout: answer without graph context, but say so
+            logger.warning(f"Graph path search aborted for {entity_ids}: {e}")
+            return GraphContext(truncated=True)
+        text, kept, over_budget = render_relations(relations, self.context_token_budget)
+        return GraphContext(text=text, relations=kept, truncated=truncated or over_budget)
+
+    async def _neighborhood(self, entity_ids: list[str]) -> Tuple[list[dict], bool]:
+        # Least-connected neighbors first: they carry the most specific facts
+        query = f"""
+        MATCH (n:{ENTITY_LABEL} {{id: $id}})
+        CALL {{
+            WITH n
+            MATCH (n)-[r]-(m)
+            WITH r, m, COUNT {{ (m)--() }} AS degree
+            RETURN r, m, degree ORDER BY degree ASC LIMIT $limit
+        }}
+        CALL {{
+            WITH n, m, degree
+            MATCH (m)-[r2]-(x)
+            WHERE x <> n AND degree <= $max_degree
+            WITH r2 LIMIT $limit
+            RETURN collect(r2) AS next_hops
+        }}
+        RETURN COUNT {{ (n)--() }} AS root_degree,
+               degree,
+               {{source: startNode(r).id, rel: type(r), target: endNode(r).id}} AS hop,
+               [r2 IN next_hops | {{source: startNode(r2).id, rel: type(r2), target: endNode(r2).id}}] AS next_hops
+        """
+        rows = await self.graph.execute_read(
+            query,
+            {"id": entity_ids[0], "limit": self.neighbor_limit, "max_degree": self.hub_degree},
+            timeout=self.query_timeout,
+        )
+        relations: list[dict] = []
+        truncated = False
+        for row in rows:
+            relations.append(row["hop"])
+            relations.extend(row["next_hops"])
+            truncated = truncated or row["root_degree"] > self.neighbor_limit
+            # Hub neighbors are not expanded; others may have more than `limit` neighbors
+            truncated = truncated or row["degree"] > self.hub_degree or row["degree"] - 1 > self.neighbor_limit
+        return relations, truncated
+
+    async def _shortest_paths(self, entity_ids: list[str]) -> Tuple[list[dict], bool]:
+        # Consecutive entity pairs; shortestPath expands from both ends (bidirectional BFS)
+        pairs = [[a, b] for a, b in zip(entity_ids, entity_ids[1:])]
+        query = f"""
+        UNWIND $pairs AS pair
+        MATCH (a:{ENTITY_LABEL} {{id: pair[0]}})
+        MATCH (b:{ENTITY_LABEL} {{id: pair[1]}})
+        CALL {{
+            WITH a, b
+            MATCH p = allShortestPaths((a)-[*..{self.max_hops}]-(b))
+            // Property predicate on every inner node: checked during the BFS itself
+            // (a COUNT subquery here can make the planner enumerate all paths instead)
+            WHERE all(x IN nodes(p)[1..-1] WHERE x.degree <= $max_degree)
+            RETURN p LIMIT $max_paths
+        }}
+        RETURN pair,
+               [r IN relationships(p) | {{source: startNode(r).id, rel: type(r), target: endNode(r).id}}] AS path
+        """
+        rows = await self.graph.execute_read(
+            query,
+            {"pairs": pairs, "max_paths": self.max_paths, "max_degree": self.hub_degree},
+            timeout=self.query_timeout,
+        )
+        relations: list[dict] = []
+        paths_per_pair: Dict[tuple, int] = {}
+        for row in rows:
+            relations.extend(row["path"])
+            pair = tuple(row["pair"])
+            paths_per_pair[pair] = paths_per_pair.get(pair, 0) + 1
+        # Pairs that hit the path limit may have more paths
+        truncated = any(paths_per_pair.get(tuple(pair), 0) >= self.max_paths for pair in pairs)
+        return relations, truncated
+
+
+async def listen_for_graph_updates(retriever: GraphRetriever, redis_client):
+    """
+    Subscribes to 'graph_updates' (published by the RAG worker after writing
+    relations): adds the new node ids to the entity dictionary and moves the
+    context cache to the new graph version. Reconnects with backoff.
+    """
+    backoff = 1.0
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(GRAPH_UPDATES_CHANNEL)
+                logger.info("Graph retriever listening for graph updates.")
+                backoff = 1.0
+                # Writes that happened before the (re)subscription
+                current = await redis_client.get(GRAPH_VERSION_KEY)
+                if current is not None:
+                    retriever.set_graph_version(int(current))
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message:
+                        retriever.on_graph_update(json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A missed update could serve stale paths: drop them all
+            logger.error(f"Graph update listener error, clearing context cache (retry in {backoff:.0f}s): {e}")
+            if retriever.context_cache is not None:
+                retriever.context_cache.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, LISTENER_BACKOFF_MAX_SECONDS)
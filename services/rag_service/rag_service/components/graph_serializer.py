@@ -0,0 +1,35 @@
+from typing import Any, Dict, List, Tuple
+from shared.tokens import estimate_tokens
+
+
+def format_relation(relation: Dict[str, Any]) -> str:
+    return f"{relation['source']} -[{relation['rel']}]-> {relation['target']}"
+
+
+def render_relations(
+    relations: List[Dict[str, Any]], token_budget: int
+) -> Tuple[str, List[Dict[str, Any]], bool]:
+    """
+    Renders relations as deduplicated `A -[REL]-> B` lines, in search order
+    (closest relations first), until the token budget is spent.
+
+    :return: (text, relations kept, whether relations were dropped for the budget)
+    """
+    lines: List[str] = []
+    kept: List[Dict[str, Any]] = []
+    seen = set()
+    used = 0
+    for relation in relations:
+        if relation.get("source") is None or relation.get("target") is None:
+            continue
+        line = format_relation(relation)
+        if line in seen:
+            continue
+        cost = estimate_tokens(line)
+        if token_budget > 0 and used + cost > token_budget:
+            return "\n".join(lines), kept, True
+        seen.add(line)
+        lines.append(line)
+        kept.append(relation)
+        used += cost
+    return "\n".join(lines), kept, False
@@ -1,6 +1,8 @@
 import logging
+from typing import Any, List, Optional, Tuple
 from shared.config import Config
 from shared.interfaces import VectorStoreManager
+from rag_service.providers.retrieval import RetrievalFactory
 
 logger = logging.getLogger("RAG-Service.Components.SearchEngine")
 
@@ -13,22 +15,51 @@ class SearchEngine:
         """
         self.vector_store = vector_store
         self.config = settings
+        # Configured RETRIEVAL_STRATEGY (dense / mmr / ensemble / hybrid)
+        self.strategy = RetrievalFactory.get_strategy(settings)
+        if settings.RETRIEVAL_STRATEGY.lower() == "hybrid" and not settings.LEXICAL_INDEX_ENABLED:
+            # Without the worker building it, hybrid would silently be dense-only
+            raise ValueError("RETRIEVAL_STRATEGY 'hybrid' requires LEXICAL_INDEX_ENABLED=true")
+        # Relevance cut-offs (0 disables each)
+        self.min_score = settings.RAG_MIN_SCORE
+        self.adaptive_k_ratio = settings.RAG_ADAPTIVE_K_RATIO
 
-        logger.info("Search Engine initialized successfully.")
+        logger.info(
+            f"Search Engine initialized successfully (strategy: {settings.RETRIEVAL_STRATEGY})."
+        )
 
-    def search(self, query: str, top_k: int = None):  # type: ignore
+    def search(self, query: str, top_k: int = None) -> List[Tuple[Any, Optional[float]]]:  # type: ignore
         """
         Executes the search using the configured strategy.
         :param top_k: Optional override for number of results to return.
+        :return: (Document, relevance score) pairs, best first, after the score cut-offs.
+                 The score is None for hits without a dense score (hybrid BM25-only).
         """
 
         k = top_k if top_k else 4
         logger.info(f"Executing search for query: '{query}' with top_k={k}")
 
-        docs = self.vector_store.similarity_search(query, k=k)
-        if top_k:
-            return docs[:top_k]
-        return docs
+        results = self.strategy.search(self.vector_store, query, k, self.config)
+        kept = self.apply_cutoffs(results[:k])
+        if len(kept) < len(results[:k]):
+            logger.info(f"Score cut-off kept {len(kept)}/{len(results[:k])} results")
+        return kept
+
+    def apply_cutoffs(self, results: List[Tuple[Any, Optional[float]]]) -> List[Tuple[Any, Optional[float]]]:
+        """
+        Drops low-relevance hits: below RAG_MIN_SCORE, or (adaptive k) below
+        RAG_ADAPTIVE_K_RATIO x the best score, so only the leading cluster is kept.
+        Both thresholds are dense relevance: hits without a dense score (None) are
+        kept on the strategy's ranking alone.
+        """
+        # Filters only: the strategy's order (e.g. MMR, fusion) is preserved
+        if self.min_score > 0:
+            results = [r for r in results if r[1] is None or r[1] >= self.min_score]
+        dense_scores = [score for _, score in results if score is not None]
+        if self.adaptive_k_ratio > 0 and dense_scores:
+            floor = max(dense_scores) * self.adaptive_k_ratio
+            results = [r for r in results if r[1] is None or r[1] >= floor]
+        return results
 
     def delete_vector(self, doc_id: str) -> bool:
         """
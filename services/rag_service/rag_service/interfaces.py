@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from langchain_core.retrievers import BaseRetriever
 from shared.config import Config
-from typing import Any
+from typing import Any, List, Optional, Tuple
 
 class RetrievalStrategy(ABC):
     """
@@ -12,4 +12,13 @@ class RetrievalStrategy(ABC):
         """
         Constructs and returns a LangChain Retriever.
         """
+        pass
+
+    @abstractmethod
+    def search(self, vector_store: Any, query: str, k: int, settings: Config) -> List[Tuple[Any, Optional[float]]]:
+        """
+        Runs the strategy directly (used by SearchEngine).
+        Returns (Document, dense relevance score) pairs, in strategy order.
+        The score is None for a hit that has no dense score (e.g. BM25-only).
+        """
         pass
\ No newline at end of file
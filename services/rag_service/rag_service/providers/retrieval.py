@@ -1,15 +1,27 @@
 import logging
-from typing import Dict, Type, Any
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, Type, Any
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from langchain_classic.retrievers import EnsembleRetriever
 from shared.config import Config, config as global_config
 from rag_service.interfaces import RetrievalStrategy
-from shared.interfaces import VectorStoreManager
+from shared.interfaces import ScoredCandidate, VectorStoreManager
+from shared.providers.lexical_index import LexicalIndexReader
 
 logger = logging.getLogger("RAG-Service.Providers.Retrieval")
 
 _RETRIEVAL_REGISTRY: Dict[str, Type[RetrievalStrategy]] = {}
 
+# Candidates fetched per requested result for MMR / fusion
+FETCH_K_FACTOR = 4
+# MMR trade-off: 1 = pure relevance, 0 = pure diversity
+MMR_LAMBDA = 0.5
+# Reciprocal rank fusion constant (same as LangChain's EnsembleRetriever)
+RRF_K = 60
+
 def register_retrieval_strategy(name: str):
     """Decorator to register a retrieval strategy."""
     def decorator(cls):
@@ -18,6 +30,50 @@ def register_retrieval_strategy(name: str):
     return decorator
 
 
+def mmr_select(query_vector: Sequence[float], vectors: np.ndarray, k: int, lambda_mult: float = MMR_LAMBDA) -> List[int]:
+    """
+    Greedy maximal marginal relevance over cosine similarities.
+    Returns the indices of the selected rows of `vectors`, in selection order.
+    """
+    if k <= 0 or len(vectors) == 0:
+        return []
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1.0, norms)
+
+    relevance = unit @ query
+    similarity = unit @ unit.T  # fetch_k x fetch_k, small
+
+    selected = [int(np.argmax(relevance))]
+    redundancy = similarity[selected[0]].copy()
+    while len(selected) < min(k, len(unit)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        redundancy = np.maximum(redundancy, similarity[best])
+    return selected
+
+
+def rrf_fuse(rankings: Sequence[Sequence[Hashable]], weights: Sequence[float], c: int = RRF_K) -> List[Hashable]:
+    """Weighted reciprocal rank fusion; ties keep first-seen order."""
+    scores: Dict[Hashable, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] += weight / (c + rank)
+    return sorted(scores, key=lambda key: scores[key], reverse=True)
+
+
+def _fetch(vector_store: VectorStoreManager, query: str, k: int) -> Tuple[List[float], List[ScoredCandidate], np.ndarray]:
+    """One query embedding and one candidate fetch, shared by every ranking."""
+    embedding = vector_store.embed_query(query)
+    candidates = vector_store.fetch_candidates(embedding, k * FETCH_K_FACTOR)
+    candidates.sort(key=lambda c: c.score, reverse=True)
+    vectors = np.asarray([c.vector for c in candidates], dtype=np.float32)
+    return embedding, candidates, vectors
+
+
 @register_retrieval_strategy("dense")
 class DenseRetrievalStrategy(RetrievalStrategy):
     """
@@ -30,6 +86,9 @@ class DenseRetrievalStrategy(RetrievalStrategy):
             search_kwargs={"k": settings.RAG_TOP_K}
         )
 
+    def search(self, vector_store: VectorStoreManager, query: str, k: int, settings: Config) -> List[Tuple[Any, float]]:
+        return vector_store.similarity_search_with_scores(query, k=k)
+
 @register_retrieval_strategy("mmr")
 class MMRRetrievalStrategy(RetrievalStrategy):
     """
@@ -46,6 +105,13 @@ class MMRRetrievalStrategy(RetrievalStrategy):
             }
         )
 
+    def search(self, vector_store: VectorStoreManager, query: str, k: int, settings: Config) -> List[Tuple[Any, float]]:
+        embedding, candidates, vectors = _fetch(vector_store, query, k)
+        return [
+            (candidates[i].document, candidates[i].score)
+            for i in mmr_select(embedding, vectors, k)
+        ]
+
 @register_retrieval_strategy("ensemble")
 class EnsembleRetrievalStrategy(RetrievalStrategy):
     """
@@ -73,11 +139,89 @@ class EnsembleRetrievalStrategy(RetrievalStrategy):
             weights=weights
         )
 
+    def search(self, vector_store: VectorStoreManager, query: str, k: int, settings: Config) -> List[Tuple[Any, float]]:
+        """
+        Dense and MMR rankings computed locally over one candidate set,
+        then fused with weighted RRF (one embedding, one vector DB round trip).
+        """
+        embedding, candidates, vectors = _fetch(vector_store, query, k)
+        dense_ranking = list(range(min(k, len(candidates))))
+        mmr_ranking = mmr_select(embedding, vectors, k)
+        fused = rrf_fuse([dense_ranking, mmr_ranking], settings.RETRIEVAL_WEIGHTS)
+        return [(candidates[i].document, candidates[i].score) for i in fused[:k]]
+
+class LexicalRetriever(BaseRetriever):
+    """LangChain view of the BM25 index, for `get_retriever` callers."""
+    index: Any
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, _ in self.index.search(query, self.k)]
+
+@register_retrieval_strategy("hybrid")
+class HybridRetrievalStrategy(RetrievalStrategy):
+    """
+    Fuses BM25 over chunk text (exact terms: clause numbers, product codes, names)
+    with dense results using weighted rank fusion.
+    """
+    def __init__(self):
+        self._lexical: Optional[LexicalIndexReader] = None
+
+    def _index(self, settings: Config) -> LexicalIndexReader:
+        if self._lexical is None:
+            self._lexical = LexicalIndexReader(settings.LEXICAL_INDEX_DIR)
+        return self._lexical
+
+    def build_retriever(self, vector_store: VectorStoreManager, settings: Config) -> BaseRetriever:
+        weights = settings.HYBRID_WEIGHTS
+        logger.info(f"Building Hybrid Retriever. Weights: {weights}")
+
+        dense = vector_store.as_langchain_retriever(
+            search_type="similarity",
+            search_kwargs={"k": settings.RAG_TOP_K}
+        )
+        lexical = LexicalRetriever(index=self._index(settings), k=settings.RAG_TOP_K)
+
+        return EnsembleRetriever(
+            retrievers=[dense, lexical],
+            weights=weights
+        )
+
+    def search(self, vector_store: VectorStoreManager, query: str, k: int, settings: Config) -> List[Tuple[Any, float]]:
+        """
+        Reported scores are dense relevance only: a chunk found by BM25 alone has no
+        dense score and is reported with None, so score cut-offs never compare BM25
+        against dense relevance. Without a lexical index this is plain dense search.
+        """
+        fetch_k = k * FETCH_K_FACTOR
+        lexical = self._index(settings).search(query, fetch_k)
+        dense = vector_store.similarity_search_with_scores(query, k=fetch_k)
+
+        hits: Dict[Hashable, Tuple[Any, Optional[float]]] = {}
+        dense_ranking = []
+        for doc, score in dense:
+            key = _chunk_key(doc)
+            hits.setdefault(key, (doc, score))
+            dense_ranking.append(key)
+        lexical_ranking = []
+        for doc, _ in lexical:
+            key = _chunk_key(doc)
+            hits.setdefault(key, (doc, None))
+            lexical_ranking.append(key)
+
+        fused = rrf_fuse([dense_ranking, lexical_ranking], settings.HYBRID_WEIGHTS)
+        return [hits[key] for key in fused[:k]]
+
+def _chunk_key(doc: Any) -> Hashable:
+    """Worker-assigned chunk id, so the same chunk from both rankings is fused."""
+    return doc.metadata.get("chunk_id") or doc.page_content
+
 class RetrievalFactory:
     """
+    Resolves the configured RETRIEVAL_STRATEGY.
     """
     @staticmethod
-    def get_retriever(vector_store: VectorStoreManager, settings: Config = global_config) -> BaseRetriever:
+    def get_strategy(settings: Config = global_config) -> RetrievalStrategy:
         strategy_name = settings.RETRIEVAL_STRATEGY.lower()
         
         strategy_cls = _RETRIEVAL_REGISTRY.get(strategy_name)
@@ -85,5 +229,9 @@ class RetrievalFactory:
             valid_options = list(_RETRIEVAL_REGISTRY.keys())
             raise ValueError(f"Unknown Retrieval Strategy: '{strategy_name}'. Valid options: {valid_options}")
             
-        strategy = strategy_cls()
+        return strategy_cls()
+
+    @staticmethod
+    def get_retriever(vector_store: VectorStoreManager, settings: Config = global_config) -> BaseRetriever:
+        strategy = RetrievalFactory.get_strategy(settings)
         return strategy.build_retriever(vector_store, settings)
\ No newline at end of file
@@ -0,0 +1,68 @@
+from array import array
+from unittest.mock import MagicMock
+import fakeredis
+import redis
+from shared.config import Config
+from shared.providers import embeddings as embedding_providers
+from shared.providers.embeddings import CachedEmbeddings, EmbeddingFactory
+
+
+def _model(vector=(0.25, -1.5, 3.0)):
+    model = MagicMock()
+    model.embed_query.side_effect = lambda text: list(vector)
+    return model
+
+
+def test_lru_tier_serves_repeated_queries():
+    model = _model()
+    cached = CachedEmbeddings(model, namespace="emb:test", lru_size=2)
+
+    assert cached.embed_query("leave policy") == [0.25, -1.5, 3.0]
+    assert cached.embed_query("leave policy") == [0.25, -1.5, 3.0]
+    assert model.embed_query.call_count == 1
+
+    # Evicted by two newer queries: embedded again
+    cached.embed_query("a")
+    cached.embed_query("b")
+    cached.embed_query("leave policy")
+    assert model.embed_query.call_count == 4
+
+
+def test_redis_tier_stores_float32_and_is_shared_between_replicas():
+    server = fakeredis.FakeServer()
+    first = CachedEmbeddings(_model(), "emb:test", lru_size=16, redis_client=fakeredis.FakeRedis(server=server), ttl_seconds=60)
+    first.embed_query("leave policy")
+
+    client = fakeredis.FakeRedis(server=server)
+    key = first._key("leave policy")
+    assert client.get(key) == array("f", [0.25, -1.5, 3.0]).tobytes()
+    assert 0 < client.ttl(key) <= 60
+
+    other_model = _model()
+    second = CachedEmbeddings(other_model, "emb:test", lru_size=16, redis_client=client)
+    assert second.embed_query("leave policy") == [0.25, -1.5, 3.0]
+    other_model.embed_query.assert_not_called()
+
+
+def test_redis_timeouts_fall_back_to_the_model():
+    client = MagicMock()
+    client.get.side_effect = redis.exceptions.TimeoutError("Timeout reading from socket")
+    client.set.side_effect = redis.exceptions.TimeoutError("Timeout writing to socket")
+    model = _model()
+    cached = CachedEmbeddings(model, "emb:test", lru_size=16, redis_client=client)
+
+    assert cached.embed_query("leave policy") == [0.25, -1.5, 3.0]
+    # Still cached in process
+    assert cached.embed_query("leave policy") == [0.25, -1.5, 3.0]
+    assert model.embed_query.call_count == 1
+
+
+def test_namespace_names_the_model_that_embeds(monkeypatch):
+    monkeypatch.setattr(embedding_providers, "OpenAIEmbeddings", lambda **kwargs: MagicMock(model="text-embedding-3-small"))
+    monkeypatch.setattr(embedding_providers, "HuggingFaceEmbeddings", lambda model_name: MagicMock(spec=["model_name"], model_name=model_name))
+
+    openai = EmbeddingFactory.get_embeddings(Config(EMBEDDING_PROVIDER="openai", EMBEDDING_MODEL_NAME="all-MiniLM-L6-v2"))
+    local = EmbeddingFactory.get_embeddings(Config(EMBEDDING_PROVIDER="local", EMBEDDING_MODEL_NAME="all-MiniLM-L6-v2"))
+
+    assert openai.namespace == "emb:openai:text-embedding-3-small"
+    assert local.namespace == "emb:local:all-MiniLM-L6-v2"
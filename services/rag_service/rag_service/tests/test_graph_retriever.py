@@ -0,0 +1,159 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from rag_service.components.graph_retriever import GraphContext, GraphRetriever
+from rag_service.components.entity_matcher import EntityDictionary
+from rag_service.components.graph_serializer import render_relations
+from shared.cache import LRUCache
+from shared.config import Config
+
+
+@pytest.mark.asyncio
+async def test_entities_resolved_in_one_parameterized_query():
+    neo4j_client = MagicMock(execute_read=AsyncMock())
+    neo4j_client.execute_read.return_value = [
+        {"entity": "Nebula", "id": "Nebula Corp", "score": 2.1},
+        {"entity": "Ironclad", "id": "Ironclad Inc", "score": 3.4},
+        {"entity": "O'Brien", "id": None, "score": None},
+    ]
+    retriever = GraphRetriever(neo4j_client, MagicMock())
+
+    ids = await retriever._resolve_entities(["Ironclad", "Nebula", "O'Brien", "Ironclad"])
+
+    assert ids == ["Ironclad Inc", "Nebula Corp"]
+    neo4j_client.execute_read.assert_called_once()
+    query, params = neo4j_client.execute_read.call_args[0]
+    assert query.strip().startswith("UNWIND $queries")
+    assert "O'Brien" not in query
+    assert params["queries"][2] == {"entity": "O'Brien", "lucene": "O'Brien~"}
+
+
+def test_lucene_query_escapes_syntax():
+    assert GraphRetriever._to_lucene_query("K-900 chips") == "K\\-900~ AND chips~"
+    assert GraphRetriever._to_lucene_query("R&D: AND") == "R\\&D\\:~ AND and~"
+    assert GraphRetriever._to_lucene_query("   ") == ""
+
+
+def test_entity_dictionary_matches_whole_names_longest_first():
+    dictionary = EntityDictionary()
+    dictionary.add(["Apple", "Apple Inc", "Tim Cook", "K-900 chips", "AI", "Pineapple"])
+
+    assert dictionary.match("Did TIM COOK run apple inc. before the K-900 chips?") == [
+        "Tim Cook", "Apple Inc", "K-900 chips"
+    ]
+    # Partial words and too-short names never match
+    assert dictionary.match("pineapples and AI") == []
+
+    # Names added later are matched without a reload
+    dictionary.add(["Nebula"])
+    assert dictionary.match("Why is Apple suing Nebula?") == ["Apple", "Nebula"]
+
+
+@pytest.mark.asyncio
+async def test_dictionary_hit_skips_llm_and_fuzzy_lookup():
+    dictionary = EntityDictionary()
+    dictionary.add(["Ironclad", "Nebula"])
+    neo4j_client, llm = MagicMock(execute_read=AsyncMock()), MagicMock(ainvoke=AsyncMock())
+    neo4j_client.execute_read.return_value = []
+    retriever = GraphRetriever(neo4j_client, llm, entity_dictionary=dictionary)
+
+    await retriever.get_context("Why is Ironclad suing Nebula?")
+    llm.ainvoke.assert_not_awaited()
+    assert neo4j_client.execute_read.call_count == 1  # path search only
+
+    llm.ainvoke.return_value.content = ""
+    await retriever.get_context("Who is the CEO?")
+    llm.ainvoke.assert_awaited_once()
+
+    info = retriever.entity_extraction_info()
+    assert (info["dictionary_hits"], info["llm_fallbacks"], info["hit_rate"]) == (1, 1, 0.5)
+
+
+@pytest.mark.asyncio
+async def test_context_cache_is_invalidated_by_graph_version():
+    dictionary = EntityDictionary()
+    dictionary.add(["Ironclad"])
+    neo4j_client = MagicMock(execute_read=AsyncMock())
+    neo4j_client.execute_read.return_value = [
+        {"root_degree": 1, "degree": 1, "hop": {"source": "Ironclad", "rel": "SUED", "target": "Nebula"},
+         "next_hops": []}
+    ]
+    retriever = GraphRetriever(
+        neo4j_client, MagicMock(), entity_dictionary=dictionary, context_cache=LRUCache(16)
+    )
+
+    first = await retriever.get_context("Who sued Ironclad?")
+    assert await retriever.get_context("What does Ironclad make?") == first
+    assert neo4j_client.execute_read.call_count == 1
+
+    # The worker wrote relations: cached paths are stale
+    retriever.on_graph_update({"event": "relations_written", "version": 3, "entities": ["Chimera"]})
+    await retriever.get_context("Who sued Ironclad?")
+    assert neo4j_client.execute_read.call_count == 2
+    assert retriever.cache_info()["graph_version"] == 3
+    assert dictionary.match("Chimera") == ["Chimera"]
+
+
+def _retriever(neo4j_client, **settings):
+    return GraphRetriever(neo4j_client, MagicMock(), settings=Config(**settings))
+
+
+@pytest.mark.asyncio
+async def test_path_search_is_bounded_and_parameterized():
+    neo4j_client = MagicMock(execute_read=AsyncMock())
+    neo4j_client.execute_read.return_value = [
+        {"pair": ["Ironclad", "Nebula"], "path": [{"source": "Ironclad", "rel": "SUED", "target": "Nebula"}]},
+        {"pair": ["Nebula", "Chimera"], "path": [{"source": "Nebula", "rel": "OWNS", "target": "Chimera"}]},
+        {"pair": ["Nebula", "Chimera"], "path": [{"source": "Nebula", "rel": "OWNS", "target": "Chimera"}]},
+    ]
+    retriever = _retriever(neo4j_client, GRAPH_PATH_MAX_HOPS=3, GRAPH_MAX_PATHS=2, GRAPH_QUERY_TIMEOUT_SECONDS=1.5)
+
+    context = await retriever._retrieve_paths(["Ironclad", "Nebula", "Chimera"])
+
+    query, params = neo4j_client.execute_read.call_args[0]
+    assert "allShortestPaths((a)-[*..3]-(b))" in query
+    # Indexed lookups, and a hub filter on the precomputed property (no COUNT subquery in the BFS)
+    assert "MATCH (a:Entity {id: pair[0]})" in query
+    assert "WHERE all(x IN nodes(p)[1..-1] WHERE x.degree <= $max_degree)" in query
+    assert params["pairs"] == [["Ironclad", "Nebula"], ["Nebula", "Chimera"]]
+    assert neo4j_client.execute_read.call_args.kwargs["timeout"] == 1.5
+    assert len(context.relations) == 2
+    # (Nebula, Chimera) hit the path limit
+    assert context.truncated
+
+
+@pytest.mark.asyncio
+async def test_neighborhood_flags_pruned_hubs_and_timeouts():
+    neo4j_client = MagicMock(execute_read=AsyncMock())
+    neo4j_client.execute_read.return_value = [
+        {"root_degree": 2, "degree": 3, "hop": {"source": "Apple", "rel": "EMPLOYS", "target": "Tim Cook"},
+         "next_hops": [{"source": "Tim Cook", "rel": "LIVES_IN", "target": "Palo Alto"}]},
+        {"root_degree": 2, "degree": 5000, "hop": {"source": "Apple", "rel": "LOCATED_IN", "target": "USA"},
+         "next_hops": []},
+    ]
+    retriever = _retriever(neo4j_client, GRAPH_HUB_DEGREE=100)
+
+    context = await retriever._retrieve_paths(["Apple"])
+    assert len(context.relations) == 3
+    assert context.truncated
+
+    neo4j_client.execute_read.side_effect = RuntimeError("Transaction timed out")
+    context = await retriever._retrieve_paths(["Apple"])
+    assert context == GraphContext(truncated=True)
+
+
+def test_relations_render_as_compact_lines_within_budget():
+    relations = [
+        {"source": "Ironclad", "rel": "SUED", "target": "Nebula"},
+        {"source": "Ironclad", "rel": "SUED", "target": "Nebula"},
+        {"source": "Nebula", "rel": "OWNS", "target": None},
+        {"source": "Nebula", "rel": "OWNS", "target": "Chimera"},
+        {"source": "Chimera", "rel": "BUILT", "target": "K-900 chips"},
+    ]
+
+    text, kept, over_budget = render_relations(relations, token_budget=0)
+    assert text == "Ironclad -[SUED]-> Nebula\nNebula -[OWNS]-> Chimera\nChimera -[BUILT]-> K-900 chips"
+    assert len(kept) == 3 and not over_budget
+
+    text, kept, over_budget = render_relations(relations, token_budget=14)
+    assert text.splitlines() == ["Ironclad -[SUED]-> Nebula", "Nebula -[OWNS]-> Chimera"]
+    assert len(kept) == 2 and over_budget
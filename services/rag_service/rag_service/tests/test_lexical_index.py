@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import MagicMock
+from langchain_core.documents import Document
+from rag_service.components.search_engine import SearchEngine
+from rag_service.providers.retrieval import HybridRetrievalStrategy
+from shared.config import Config
+from shared.providers.lexical_index import LexicalIndexBuilder, LexicalIndexReader, tokenize
+
+
+def _index(path, docs):
+    builder = LexicalIndexBuilder(str(path))
+    for doc_id, chunks in docs.items():
+        segment = builder.segment_writer(doc_id)
+        for index, text in enumerate(chunks):
+            segment.add(f"{doc_id}:{index}", text, {"doc_id": doc_id, "chunk_index": index})
+        segment.commit()
+    builder.rebuild()
+    return builder
+
+
+def _reader(path):
+    reader = LexicalIndexReader(str(path))
+    reader.RELOAD_INTERVAL_SECONDS = 0
+    return reader
+
+
+def test_tokenizer_keeps_clause_numbers_and_codes():
+    assert tokenize("See Section 4.2.1 of the K-900 spec.") == ["see", "section", "4.2.1", "k-900", "k", "900", "spec"]
+
+
+def test_bm25_ranks_exact_terms_and_follows_rebuilds(tmp_path):
+    builder = _index(tmp_path, {
+        "policy": ["Clause 4.2.1: travel is reimbursed within 30 days.", "Clause 4.2: meals are capped."],
+        "specs": ["The K-900 chip runs at 3 GHz.", "Chips ship in trays of 50."],
+    })
+    reader = _reader(tmp_path)
+
+    hits = reader.search("what does clause 4.2.1 say", 5)
+    assert hits[0][0].page_content.startswith("Clause 4.2.1")
+    assert hits[0][0].metadata == {"doc_id": "policy", "chunk_index": 0, "chunk_id": "policy:0"}
+    assert [doc.metadata["chunk_id"] for doc, _ in reader.search("K-900", 5)] == ["specs:0"]
+    assert reader.search("unrelated words", 5) == []
+
+    # Deleting a document publishes a build without it
+    builder.remove_document("specs")
+    assert reader.search("K-900", 5) == []
+    assert len(reader.search("clause", 5)) == 2
+
+
+def test_missing_index_returns_nothing(tmp_path):
+    assert _reader(tmp_path / "absent").search("anything", 5) == []
+
+
+def test_hybrid_fuses_lexical_hits_with_dense_results(tmp_path):
+    _index(tmp_path, {"policy": ["Clause 4.2.1: travel is reimbursed.", "Remote work needs approval."]})
+    dense_doc = Document(page_content="Remote work needs approval.", metadata={"chunk_id": "policy:1"})
+    other_doc = Document(page_content="Offices open at 9.", metadata={"chunk_id": "hours:0"})
+    vector_store = MagicMock()
+    vector_store.similarity_search_with_scores.return_value = [(dense_doc, 0.8), (other_doc, 0.7)]
+    settings = Config(LEXICAL_INDEX_DIR=str(tmp_path), HYBRID_WEIGHTS=[0.5, 0.5])
+    strategy = HybridRetrievalStrategy()
+    strategy._index(settings).RELOAD_INTERVAL_SECONDS = 0
+
+    results = strategy.search(vector_store, "clause 4.2.1 remote work", 3, settings)
+
+    ids = [doc.metadata["chunk_id"] for doc, _ in results]
+    # Found by both rankings: fused once, keeps its dense relevance
+    assert ids[0] == "policy:1" and results[0][1] == 0.8
+    assert set(ids) == {"policy:0", "policy:1", "hours:0"}
+    # BM25-only hit: no dense relevance to report
+    assert dict((doc.metadata["chunk_id"], score) for doc, score in results)["policy:0"] is None
+    vector_store.similarity_search_with_scores.assert_called_once_with("clause 4.2.1 remote work", k=12)
+
+
+def test_hybrid_cutoffs_judge_dense_scores_only(tmp_path):
+    _index(tmp_path, {"policy": ["Clause 4.2.1: travel is reimbursed.", "Remote work needs approval."]})
+    vector_store = MagicMock()
+    vector_store.similarity_search_with_scores.return_value = [
+        (Document(page_content="Remote work needs approval.", metadata={"chunk_id": "policy:1"}), 0.6),
+        (Document(page_content="Offices open at 9.", metadata={"chunk_id": "hours:0"}), 0.2),
+    ]
+    settings = Config(
+        RETRIEVAL_STRATEGY="hybrid",
+        LEXICAL_INDEX_ENABLED=True,
+        LEXICAL_INDEX_DIR=str(tmp_path),
+        RAG_MIN_SCORE=0.3,
+        RAG_ADAPTIVE_K_RATIO=0.8,
+    )
+    engine = SearchEngine(vector_store, settings)
+    engine.strategy._index(settings).RELOAD_INTERVAL_SECONDS = 0
+
+    results = engine.search("clause 4.2.1 remote work", top_k=3)
+
+    # The weak dense hit is cut; the exact-term BM25 hit is not held to a dense floor
+    assert sorted(doc.metadata["chunk_id"] for doc, _ in results) == ["policy:0", "policy:1"]
+
+
+def test_hybrid_without_the_index_fails_at_startup():
+    with pytest.raises(ValueError, match="LEXICAL_INDEX_ENABLED"):
+        SearchEngine(MagicMock(), Config(RETRIEVAL_STRATEGY="hybrid", LEXICAL_INDEX_ENABLED=False))
@@ -1,53 +1,55 @@
 import pytest
-from unittest.mock import MagicMock, patch
-from rag_service.app.main import RAGService
+from unittest.mock import AsyncMock, MagicMock, patch
+from rag_service.app.service import RAGService
+from rag_service.components.graph_retriever import GraphContext
+from shared.config import Config
 from shared.protos import service_pb2
 
 
 @pytest.fixture
 def rag_service():
     """Initializes RAGService with mocked dependencies"""
-    with patch("rag_service.app.main.Redis") as mock_redis, patch(
-        "rag_service.app.main.VectorDatabase"
-    ) as mock_vdb, patch("rag_service.app.main.EmbeddingsProvider") as mock_emb:
-
-        service = RAGService()
-        service.redis = mock_redis.return_value
-        service.vector_db = mock_vdb.return_value.get_store.return_value
-        return service
-
-
-def test_trigger_sync(rag_service):
-    """Test that TriggerSync pushes to Redis"""
+    with patch("rag_service.app.service.RedisFactory"), patch(
+        "rag_service.app.service.get_vector_store"
+    ) as mock_store, patch("rag_service.app.service.AsyncNeo4jClient"), patch(
+        "rag_service.app.service.LLMFactory"
+    ), patch("rag_service.app.service.JobQueueFactory") as mock_queue_factory:
+        mock_queue_factory.get_queue.return_value.enqueue = AsyncMock(return_value="1700000000000-0")
+
+        service = RAGService(settings=Config(RETRIEVAL_STRATEGY="dense"))
+        service.vector_store = mock_store.return_value
+        service.graph_retriever = MagicMock()
+        yield service
+
+
+@pytest.mark.asyncio
+async def test_trigger_sync(rag_service):
+    """Test that TriggerSync enqueues the job and returns the queue's job id"""
     request = MagicMock(doc_id="doc_1", file_path="/data/doc.pdf")
-    context = MagicMock()
 
-    response = rag_service.TriggerSync(request, context)
+    response = await rag_service.TriggerSync(request, MagicMock())
 
     assert response.status == "Queued"
-    rag_service.redis.lpush.assert_called_once()
-    args, _ = rag_service.redis.lpush.call_args
+    assert response.job_id == "1700000000000-0"
+    rag_service.job_queue.enqueue.assert_awaited_once_with(
+        {"doc_id": "doc_1", "file_path": "/data/doc.pdf"}
+    )
 
-    # FIX: assert actual payload content
-    assert "rag_jobs" in args
-    assert "doc_1" in args[1]
-    assert "/data/doc.pdf" in args[1]
 
-
-def test_retrieve_context(rag_service):
-    """Test that RetrieveContext queries Vector DB"""
+@pytest.mark.asyncio
+async def test_retrieve_context(rag_service):
+    """Test that RetrieveContext queries the vector store and the graph"""
     mock_doc = MagicMock()
     mock_doc.page_content = "Policy Content"
     mock_doc.metadata = {"doc_id": "doc_1"}
-
-    rag_service.vector_db.similarity_search_with_score.return_value = [(mock_doc, 0.95)]
+    rag_service.vector_store.similarity_search_with_scores.return_value = [(mock_doc, 0.82)]
+    rag_service.graph_retriever.retrieve = AsyncMock(return_value=GraphContext())
 
     request = service_pb2.SearchRequest(query_text="policy", top_k=2)  # type: ignore
-    context = MagicMock()
 
-    response = rag_service.RetrieveContext(request, context)
+    response = await rag_service.RetrieveContext(request, MagicMock())
 
     assert len(response.chunks) == 1
     assert response.chunks[0].text == "Policy Content"
-    # FIX: Approximate comparison
-    assert response.chunks[0].score == pytest.approx(0.95, rel=1e-4)
+    assert response.chunks[0].doc_id == "doc_1"
+    assert response.chunks[0].score == pytest.approx(0.82)
@@ -0,0 +1,58 @@
+import numpy as np
+from unittest.mock import MagicMock
+from rag_service.components.search_engine import SearchEngine
+from rag_service.providers.retrieval import mmr_select, rrf_fuse
+from shared.interfaces import ScoredCandidate
+from shared.config import Config
+
+
+def _doc(name):
+    return MagicMock(page_content=name, metadata={"doc_id": name})
+
+
+def test_search_returns_scored_results_after_cutoffs():
+    vector_store = MagicMock()
+    vector_store.similarity_search_with_scores.return_value = [
+        (_doc("a"), 0.91), (_doc("b"), 0.86), (_doc("c"), 0.55), (_doc("d"), 0.30)
+    ]
+
+    engine = SearchEngine(vector_store, Config(RETRIEVAL_STRATEGY="dense", RAG_MIN_SCORE=0.0, RAG_ADAPTIVE_K_RATIO=0.0))
+    assert [score for _, score in engine.search("leave policy", top_k=4)] == [0.91, 0.86, 0.55, 0.30]
+
+    engine = SearchEngine(vector_store, Config(RETRIEVAL_STRATEGY="dense", RAG_MIN_SCORE=0.5, RAG_ADAPTIVE_K_RATIO=0.0))
+    assert [doc.page_content for doc, _ in engine.search("leave policy", top_k=4)] == ["a", "b", "c"]
+
+    # Adaptive k keeps only the leading cluster (>= 0.8 x 0.91)
+    engine = SearchEngine(vector_store, Config(RETRIEVAL_STRATEGY="dense", RAG_MIN_SCORE=0.5, RAG_ADAPTIVE_K_RATIO=0.8))
+    assert [doc.page_content for doc, _ in engine.search("leave policy", top_k=4)] == ["a", "b"]
+
+
+def test_mmr_prefers_diverse_candidates():
+    vectors = np.array([[1.0, 0.0], [0.98, -0.2], [0.7, 0.7]], dtype=np.float32)
+    # The near-duplicate of the best hit loses to the diverse one
+    assert mmr_select([1.0, 0.2], vectors, k=2) == [0, 2]
+    assert mmr_select([1.0, 0.2], vectors, k=2, lambda_mult=1.0) == [0, 1]
+
+
+def test_rrf_fuse_weights_rankings():
+    assert rrf_fuse([["a", "b", "c"], ["c", "b"]], [0.5, 0.5]) == ["c", "b", "a"]
+    assert rrf_fuse([["a", "b"], ["b", "a"]], [0.9, 0.1]) == ["a", "b"]
+
+
+def test_ensemble_uses_one_embedding_and_one_candidate_fetch():
+    vector_store = MagicMock()
+    vector_store.embed_query.return_value = [1.0, 0.2]
+    vector_store.fetch_candidates.return_value = [
+        ScoredCandidate(_doc("dup"), 0.97, [0.98, -0.2]),
+        ScoredCandidate(_doc("best"), 0.99, [1.0, 0.0]),
+        ScoredCandidate(_doc("other"), 0.80, [0.7, 0.7]),
+    ]
+    engine = SearchEngine(vector_store, Config(RETRIEVAL_STRATEGY="ensemble", RETRIEVAL_WEIGHTS=[0.6, 0.4]))
+
+    results = engine.search("leave policy", top_k=2)
+
+    vector_store.embed_query.assert_called_once_with("leave policy")
+    vector_store.fetch_candidates.assert_called_once_with([1.0, 0.2], 8)
+    vector_store.similarity_search_with_scores.assert_not_called()
+    # Dense ranks best, dup; MMR ranks best, other; reported scores are dense relevance
+    assert [(doc.page_content, score) for doc, score in results] == [("best", 0.99), ("dup", 0.97)]
@@ -0,0 +1,39 @@
+import numpy as np
+from unittest.mock import MagicMock
+from langchain_core.documents import Document
+from shared.providers.vector_database import FAISSAdapter, PineconeAdapter
+
+
+def test_pinecone_raw_calls_use_the_stores_text_key_and_namespace():
+    store = MagicMock()
+    store._select_relevance_score_fn.return_value = lambda score: (score + 1) / 2
+    store.index.query.return_value = {
+        "matches": [{"id": "c1", "score": 0.5, "values": [1.0, 0.0], "metadata": {"body": "Clause 4", "doc_id": "d"}}]
+    }
+    adapter = PineconeAdapter(store, text_key="body", namespace="tenant-a")
+
+    adapter.add_embeddings([Document(page_content="Clause 4", metadata={"doc_id": "d"})], [[1.0, 0.0]], ids=["c1"])
+    [candidate] = adapter.fetch_candidates([1.0, 0.0], 4)
+
+    store.index.upsert.assert_called_once_with(
+        vectors=[("c1", [1.0, 0.0], {"doc_id": "d", "body": "Clause 4"})], namespace="tenant-a"
+    )
+    assert store.index.query.call_args.kwargs["namespace"] == "tenant-a"
+    assert candidate.document.page_content == "Clause 4"
+    assert candidate.document.metadata == {"doc_id": "d"}
+    assert candidate.score == 0.75
+
+
+def test_faiss_candidates_normalize_the_query_like_the_store():
+    store = MagicMock(_normalize_L2=True)
+    store._select_relevance_score_fn.return_value = lambda distance: 1 - distance
+    store.index.search.return_value = (np.array([[0.0]]), np.array([[0]]))
+    store.index_to_docstore_id = {0: "c1"}
+    store.docstore.search.return_value = Document(page_content="Clause 4")
+    store.index.reconstruct.return_value = np.array([0.6, 0.8], dtype=np.float32)
+
+    [candidate] = FAISSAdapter(store).fetch_candidates([3.0, 4.0], 4)
+
+    query = store.index.search.call_args.args[0]
+    np.testing.assert_allclose(query, [[0.6, 0.8]])
+    assert candidate.score == 1.0
@@ -17,7 +17,7 @@ def run():
     logger.info(
         f"Embedding Provider: {config.EMBEDDING_PROVIDER}, Embedding Model: {config.EMBEDDING_MODEL_NAME}"
     )
-    logger.info(f"Listening to Queue: rag_jobs")
+    logger.info(f"Listening to Queue: {config.JOB_QUEUE_NAME} ({config.JOB_QUEUE_BACKEND})")
 
     try:
         asyncio.run(start_worker())
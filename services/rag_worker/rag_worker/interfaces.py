@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from shared.config import Config
 
@@ -9,6 +9,15 @@ class BaseFileProcessor(ABC):
         """Process the file and return extracted text or None if failed."""
         pass
 
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """
+        Yields the file's text page by page so downstream stages can start early.
+        Default: the whole file as a single page.
+        """
+        text = self.process(file_path)
+        if text:
+            yield text
+
 class SplitterStrategy(ABC):
     @abstractmethod
     def __init__(self, settings: Config):
@@ -17,11 +26,55 @@ class SplitterStrategy(ABC):
     def split_text(self, text: str) -> List[str]:
         pass
 
+    def split_stream(self, pages: Iterable[str], buffer_chars: int = 20000) -> Iterator[str]:
+        """
+        Splits a stream of page texts without materializing the whole document.
+        Text is buffered up to `buffer_chars`; the last chunk of each split is
+        carried into the next buffer so chunks can still span page boundaries.
+        """
+        buffer = ""
+        for page in pages:
+            buffer += page
+            if len(buffer) < buffer_chars:
+                continue
+            chunks = self.split_text(buffer)
+            yield from chunks[:-1]
+            buffer = chunks[-1] if chunks else ""
+        if buffer:
+            yield from self.split_text(buffer)
+
 class JobStatusReporter(ABC):
     @abstractmethod
-    async def report_success(self, doc_id: str, filename: str, chunk_count: int):
+    async def report_success(self, doc_id: str, filename: str, chunk_count: int, stats: Optional[Dict[str, Any]] = None):
+        """
+        :param stats: Optional per-job metrics (e.g. embedding throughput) stored with the document.
+        """
         pass
 
     @abstractmethod
     async def report_failure(self, doc_id: str, filename: str, error_message: str):
-        pass
\ No newline at end of file
+        pass
+
+class GraphEventPublisher(ABC):
+    """Notifies readers of the graph (e.g. the RAG Service) that relations were written."""
+
+    @abstractmethod
+    async def relations_written(self, entity_ids: List[str]):
+        """:param entity_ids: Node ids touched by the write (subjects and objects)."""
+        pass
+
+class ExtractionCache(ABC):
+    """
+    Persistent cache of raw graph-extraction output, keyed by a content hash
+    (chunk text + prompt version + model), so unchanged chunks skip the LLM.
+    Entries are dicts: {"output": <raw pipe-delimited text>, "llm_seconds": float}.
+    """
+
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Returns the cached entries found among `keys`."""
+        pass
+
+    @abstractmethod
+    async def put_many(self, entries: Dict[str, Dict[str, Any]]):
+        pass
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from shared.config import Config, config as global_config
+
+logger = logging.getLogger("RAG-Worker.Providers.Executors")
+
+
+class WorkerExecutors:
+    """
+    Dedicated pools for the worker's blocking and CPU-bound stages (Singleton),
+    so none of them runs on, or competes for, the event loop's default executor:
+
+    - parse:  drives page parsing + splitting (one thread per active job)
+    - pdf:    process pool for page-range PDF extraction (sidesteps the GIL)
+    - embed:  embedding batches (models release the GIL / wait on HTTP)
+    - io:     vector store upserts/deletes, lexical index builds
+    """
+
+    _instance: Optional["WorkerExecutors"] = None
+
+    def __init__(self, settings: Config = global_config):
+        parse_threads = settings.WORKER_PARSE_THREADS or max(1, settings.WORKER_CONCURRENCY)
+        self.parse = ThreadPoolExecutor(max_workers=parse_threads, thread_name_prefix="parse")
+        self.embed = ThreadPoolExecutor(
+            max_workers=max(1, settings.EMBEDDING_WORKERS), thread_name_prefix="embed"
+        )
+        self.io = ThreadPoolExecutor(
+            max_workers=max(1, settings.WORKER_IO_THREADS), thread_name_prefix="io"
+        )
+        self.pdf_workers = settings.PDF_EXTRACTION_WORKERS
+        self._pdf: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def get_instance(cls, settings: Config = global_config) -> "WorkerExecutors":
+        if cls._instance is None:
+            cls._instance = cls(settings)
+        return cls._instance
+
+    @property
+    def pdf(self) -> ProcessPoolExecutor:
+        """Created on first use; 'spawn' avoids forking a process that holds threads and models."""
+        if self._pdf is None:
+            self._pdf = ProcessPoolExecutor(
+                max_workers=max(1, self.pdf_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pdf
+
+    @staticmethod
+    async def run(executor: Executor, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Runs `func` on `executor`; cancelling the awaiting task drops it if it has not started."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        """Cancels queued work and releases the pools (running tasks finish in the background)."""
+        for pool in (self.parse, self.embed, self.io, self._pdf):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("Worker executors shut down.")
+
+    @classmethod
+    def reset(cls):
+        """Shuts down and forgets the instance (for testing purposes)."""
+        if cls._instance is not None:
+            cls._instance.shutdown()
+            cls._instance = None
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Type
+
+from shared.config import Config, config as global_config
+from rag_worker.interfaces import ExtractionCache
+from rag_worker.providers.executors import WorkerExecutors
+
+logger = logging.getLogger("RAG-Worker.Providers.ExtractionCache")
+
+_EXTRACTION_CACHE_REGISTRY: Dict[str, Type[ExtractionCache]] = {}
+
+
+def register_extraction_cache(name: str):
+    """Decorator to register an ExtractionCache backend."""
+
+    def decorator(cls):
+        _EXTRACTION_CACHE_REGISTRY[name] = cls
+        return cls
+
+    return decorator
+
+
+@register_extraction_cache("redis")
+class RedisExtractionCache(ExtractionCache):
+    """Shared by every worker replica; entries expire after the configured TTL."""
+
+    PREFIX = "graph_extract"
+
+    def __init__(self, settings: Config, redis_client: Any = None):
+        if redis_client is None:
+            raise ValueError("RedisExtractionCache requires a Redis client")
+        self.redis = redis_client
+        self.ttl_seconds = settings.GRAPH_EXTRACTION_CACHE_TTL_SECONDS or None
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not keys:
+            return {}
+        values = await self.redis.mget([f"{self.PREFIX}:{k}" for k in keys])
+        return {k: json.loads(v) for k, v in zip(keys, values) if v}
+
+    async def put_many(self, entries: Dict[str, Dict[str, Any]]):
+        if not entries:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, entry in entries.items():
+                pipe.set(f"{self.PREFIX}:{key}", json.dumps(entry), ex=self.ttl_seconds)
+            await pipe.execute()
+
+
+@register_extraction_cache("disk")
+class DiskExtractionCache(ExtractionCache):
+    """One JSON file per entry under GRAPH_EXTRACTION_CACHE_DIR (local / single-host setups)."""
+
+    def __init__(self, settings: Config, redis_client: Any = None):
+        self.root = settings.GRAPH_EXTRACTION_CACHE_DIR
+        os.makedirs(self.root, exist_ok=True)
+        # File reads/writes run on the worker's I/O pool, not the loop's default executor
+        self.executors = WorkerExecutors.get_instance(settings)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]):
+        for key, entry in entries.items():
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        def _read_all():
+            found = {}
+            for key in keys:
+                entry = self._read(key)
+                if entry is not None:
+                    found[key] = entry
+            return found
+
+        return await self.executors.run(self.executors.io, _read_all)
+
+    async def put_many(self, entries: Dict[str, Dict[str, Any]]):
+        if entries:
+            await self.executors.run(self.executors.io, self._write, entries)
+
+
+class ExtractionCacheFactory:
+    """
+    Factory to retrieve the graph extraction cache.
+    Returns None when caching is disabled ("none").
+    """
+
+    @staticmethod
+    def get_cache(settings: Config = global_config, redis_client: Any = None) -> Optional[ExtractionCache]:
+        backend = settings.GRAPH_EXTRACTION_CACHE.lower()
+        if backend == "none":
+            return None
+
+        cache_cls = _EXTRACTION_CACHE_REGISTRY.get(backend)
+        if not cache_cls:
+            valid_keys = list(_EXTRACTION_CACHE_REGISTRY.keys()) + ["none"]
+            raise ValueError(
+                f"Unknown Extraction Cache: {backend}. Available: {valid_keys}"
+            )
+
+        logger.info(f"Initializing Graph Extraction Cache: {backend}")
+        return cache_cls(settings, redis_client)
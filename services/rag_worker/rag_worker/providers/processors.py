@@ -1,7 +1,11 @@
 import os
 import logging
-from typing import Dict, Type, List
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Iterator, Type, List
+from shared.config import Config, config as global_config
 from rag_worker.interfaces import BaseFileProcessor
+from rag_worker.providers.executors import WorkerExecutors
 
 logger = logging.getLogger("RAG-Worker.Processors.Factory")
 
@@ -31,23 +35,78 @@ class ProcessorFactory:
             
         return processor_cls()
     
+def _extract_pdf_pages(file_path: str, start: int, end: int) -> List[str]:
+    """Extracts pages [start, end) of a PDF. Module-level so it can run in a worker process."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
 @register_processor([".pdf"])
 class PdfProcessor(BaseFileProcessor):
+    def __init__(self, settings: Config = global_config):
+        self.workers = settings.PDF_EXTRACTION_WORKERS
+        self.pages_per_task = max(1, settings.PDF_PAGES_PER_TASK)
+
     def process(self, file_path: str) -> str | None:
-        from pypdf import PdfReader
         try:
-            reader = PdfReader(file_path)
-            return "".join([page.extract_text() or "" for page in reader.pages])
+            return "".join(self.iter_pages(file_path))
         except Exception as e:
             logger.error(f"Failed to process PDF {file_path}: {e}")
             return None
 
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """
+        Yields page text in order. With PDF_EXTRACTION_WORKERS > 0, page ranges
+        are extracted in the worker's process pool with at most 2 ranges per
+        process in flight, so memory is bounded by that window rather than the
+        document size, and parsing never holds the worker's GIL.
+        """
+        from pypdf import PdfReader
+
+        reader = PdfReader(file_path)
+        page_count = len(reader.pages)
+
+        if self.workers <= 0 or page_count <= self.pages_per_task:
+            for page in reader.pages:
+                yield page.extract_text() or ""
+            return
+        del reader
+
+        pool = WorkerExecutors.get_instance().pdf
+        ranges = [
+            (start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        window: "deque[Future]" = deque()
+        next_range = 0
+        try:
+            while window or next_range < len(ranges):
+                while next_range < len(ranges) and len(window) < self.workers * 2:
+                    start, end = ranges[next_range]
+                    window.append(pool.submit(_extract_pdf_pages, file_path, start, end))
+                    next_range += 1
+                yield from window.popleft().result()
+        finally:
+            # Consumer stopped early (error / cancellation): drop queued ranges
+            for future in window:
+                future.cancel()
+
 @register_processor([".txt", ".md", ".json", ".csv"])
 class TextProcessor(BaseFileProcessor):
+    BLOCK_CHARS = 65536
+
     def process(self, file_path: str) -> str | None:
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 return f.read()
         except Exception as e:
             logger.error(f"Failed to process text file {file_path}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        # Fixed-size blocks keep memory flat for very large text files
+        with open(file_path, "r", encoding="utf-8") as f:
+            while block := f.read(self.BLOCK_CHARS):
+                yield block
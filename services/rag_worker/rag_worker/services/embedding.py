@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from shared.config import Config
+from shared.interfaces import VectorStoreManager
+from rag_worker.providers.executors import WorkerExecutors
+
+logger = logging.getLogger("RAG-Worker.Services.Embedding")
+
+
+async def _abatched(items: AsyncIterable[Any], size: int) -> AsyncIterator[List[Any]]:
+    batch: List[Any] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BatchEmbedder:
+    """
+    Explicit embedding stage of ingestion.
+    Embeds chunks in fixed-size batches on a thread pool (the embedding models
+    release the GIL / wait on HTTP) and upserts each batch while the next
+    ones are still being embedded, so the event loop is never blocked.
+    """
+
+    def __init__(self, embeddings: Any, vector_store: VectorStoreManager, settings: Config):
+        self.embeddings = embeddings
+        self.vector_store = vector_store
+        self.batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+        self.max_in_flight = max(1, settings.EMBEDDING_WORKERS)
+        executors = WorkerExecutors.get_instance(settings)
+        self.executor = executors.embed
+        # Upserts of one document are chained (one in flight), which keeps writes ordered
+        self.upsert_executor = executors.io
+
+    async def embed_and_upsert(
+        self, documents: Iterable[Document], ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Embeds + upserts `documents` (consumed lazily) and returns throughput stats.
+        :param ids: Optional vector ids, aligned with `documents`.
+        """
+        items = zip(documents, ids) if ids is not None else ((d, None) for d in documents)
+
+        async def _pairs():
+            for item in items:
+                yield item
+
+        return await self.embed_and_upsert_stream(_pairs(), use_ids=ids is not None)
+
+    async def embed_and_upsert_stream(
+        self,
+        pairs: AsyncIterable[Tuple[Document, Optional[str]]],
+        use_ids: bool = True,
+        on_upserted: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Streaming variant: consumes (document, vector id) pairs as they are
+        produced upstream, so the first batches are searchable before the
+        rest of the document has been parsed.
+        :param on_upserted: Called with the batch size after each upsert lands.
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        in_flight: "deque[Tuple[List[Tuple[Document, Optional[str]]], asyncio.Future]]" = deque()
+        upsert: Optional[asyncio.Future] = None
+        chunk_count = 0
+        batch_count = 0
+
+        async def _flush_oldest():
+            nonlocal upsert, chunk_count, batch_count
+            batch, embed_future = in_flight.popleft()
+            vectors = await embed_future
+            if upsert is not None:
+                await upsert
+            docs = [doc for doc, _ in batch]
+            batch_ids = [vec_id for _, vec_id in batch]
+            upsert = loop.run_in_executor(
+                self.upsert_executor,
+                self.vector_store.add_embeddings,
+                docs,
+                vectors,
+                batch_ids if use_ids else None,
+            )
+            if on_upserted is not None:
+                size = len(batch)
+                upsert.add_done_callback(
+                    lambda f: on_upserted(size) if not f.cancelled() and f.exception() is None else None
+                )
+            chunk_count += len(batch)
+            batch_count += 1
+
+        try:
+            async for batch in _abatched(pairs, self.batch_size):
+                texts = [doc.page_content for doc, _ in batch]
+                future = loop.run_in_executor(
+                    self.executor, self.embeddings.embed_documents, texts
+                )
+                in_flight.append((batch, future))
+                if len(in_flight) >= self.max_in_flight:
+                    await _flush_oldest()
+
+            while in_flight:
+                await _flush_oldest()
+            if upsert is not None:
+                await upsert
+        except BaseException:
+            for _, future in in_flight:
+                future.cancel()
+            raise
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            "chunks": chunk_count,
+            "batches": batch_count,
+            "embed_seconds": round(elapsed, 3),
+            "chunks_per_second": round(chunk_count / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+        logger.info(
+            f"Embedded {chunk_count} chunks in {batch_count} batches "
+            f"({stats['chunks_per_second']} chunks/s)"
+        )
+        return stats
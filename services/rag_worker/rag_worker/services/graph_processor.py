@@ -1,93 +1,359 @@
 import asyncio
+import hashlib
 import re
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from langchain_core.messages import HumanMessage
 from langchain_core.language_models.chat_models import BaseChatModel
-from shared.providers.neo4j_client import Neo4jClient
+from shared.config import Config, config as global_config
+from shared.providers.neo4j_client import ENTITY_LABEL, AsyncNeo4jClient
+from shared.tokens import estimate_tokens
+from rag_worker.interfaces import ExtractionCache, GraphEventPublisher
 
 logger = logging.getLogger(__name__)
 
+EXTRACTION_INSTRUCTIONS = """
+You are an expert Knowledge Graph extractor. 
+Task: Convert the unstructured text below into a strict list of relationships.
+Format: Subject|SubjectType|RELATION|Object|ObjectType
+
+### 1. Examples (Follow these patterns closely)
+
+Input: "Apple CEO Tim Cook announced the iPhone 15 in California."
+Output:
+Tim Cook|Person|CEO_OF|Apple|Company
+Apple|Company|ANNOUNCED|iPhone 15|Product
+iPhone 15|Product|UNVEILED_AT|California|Location
+
+Input: "Obsidian Trust funneled $200 million to Zenith AI."
+Output:
+Obsidian Trust|Company|FUNDED_WITH|$200 million|Money
+Obsidian Trust|Company|SENT_MONEY_TO|Zenith AI|Company
+
+Input: "Sarah Vane is the VP of Global Horizon Bank."
+Output:
+Sarah Vane|Person|HAS_TITLE|VP|Role
+Sarah Vane|Person|WORKS_AT|Global Horizon Bank|Company
+
+### 2. Rules (Critical)
+1. **NO MARKDOWN**: Do not use code blocks (```), tables, or bold text. Just raw text lines.
+2. **RELATION Style**: MUST be UPPER_CASE_WITH_UNDERSCORES. No spaces. Max 25 chars.
+   - CORRECT: LOCATED_IN, FILED_LAWSUIT_AGAINST, HAS_SISTER
+   - WRONG: Located in, filed lawsuit, sister of
+3. **Entity Types**: Use PascalCase (e.g., Person, Company, Product, Project).
+4. **Granularity**: Extract hidden connections (family, financial flows, legal disputes).
+5. **One relationship per line**.
+"""
+
+SINGLE_TEXT_TEMPLATE = """
+### 3. Text to Process
+{text}
+"""
+
+BATCH_TEXT_TEMPLATE = """
+### 3. Texts to Process
+The input below is split into {count} numbered sections. Extract relationships from each section independently.
+Before each section's relationships, output its header line exactly as `=== SECTION <n> ===`.
+Output the header even when a section has no relationships.
+
+{sections}
+"""
+
+# Part of the extraction cache key: any prompt edit invalidates cached outputs
+PROMPT_VERSION = hashlib.sha256(
+    (EXTRACTION_INSTRUCTIONS + SINGLE_TEXT_TEMPLATE + BATCH_TEXT_TEMPLATE).encode("utf-8")
+).hexdigest()[:12]
+
+_SECTION_HEADER = re.compile(r"^\s*=+\s*SECTION\s+(\d+)\s*=+\s*$", re.MULTILINE | re.IGNORECASE)
+
+
+class Relation(NamedTuple):
+    subj: str
+    subj_type: str
+    rel: str
+    obj: str
+    obj_type: str
+
 
 class GraphProcessor:
-    def __init__(self, llm: BaseChatModel, neo4j_client: Neo4jClient):
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        neo4j_client: AsyncNeo4jClient,
+        settings: Config = global_config,
+        cache: Optional[ExtractionCache] = None,
+        events: Optional[GraphEventPublisher] = None,
+    ):
         self.llm = llm
         self.graph = neo4j_client
-        # Executor for blocking DB operations
-        self.executor = ThreadPoolExecutor(max_workers=5)
+        # Raw outputs of unchanged chunks are reused across re-syncs
+        self.cache = cache
+        # Announces written node ids so query-side entity dictionaries stay current
+        self.events = events
+        self.model_name = f"{settings.LLM_PROVIDER}:{settings.LLM_MODEL}"
+
+        # Chunks packed into one LLM call (1 = one call per chunk)
+        self.batch_size = max(1, settings.GRAPH_EXTRACTION_BATCH_SIZE)
+        self.token_budget = max(1, settings.GRAPH_EXTRACTION_TOKEN_BUDGET)
+        # Limits concurrent LLM calls to avoid rate limits (shared by all jobs)
+        self.semaphore = asyncio.Semaphore(max(1, settings.GRAPH_EXTRACTION_CONCURRENCY))
 
     async def process_chunk(self, text_chunk: str):
         """
         Asynchronously extracts relations and ingests them.
-        Uses native async LLM calls and threaded DB writes.
+        Uses native async LLM calls and async DB writes.
         """
         try:
-            # Non-blocking LLM Call (Native LangChain Async)
-            # This yields control to the event loop while waiting for OpenAI
-            relations_content = await self._extract_relations(text_chunk)
-
-            # Blocking DB Call (Offloaded to Thread)
-            # Neo4j driver is sync, so we run it in a thread to keep loop responsive
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(
-                self.executor, self._ingest_relations, relations_content
-            )
-
+            relations = await self.extract_chunk(text_chunk)
+            await self.write_relations(relations)
         except Exception as e:
             logger.error(f"Error processing graph chunk: {e}")
 
-    async def _extract_relations(self, text: str) -> str:
-        """
-        Uses LangChain's ainvoke for async generation.
-        """
-        prompt = f"""
-        You are an expert Knowledge Graph extractor. 
-        Task: Convert the unstructured text below into a strict list of relationships.
-        Format: Subject|SubjectType|RELATION|Object|ObjectType
-
-        ### 1. Examples (Follow these patterns closely)
-        
-        Input: "Apple CEO Tim Cook announced the iPhone 15 in California."
-        Output:
-        Tim Cook|Person|CEO_OF|Apple|Company
-        Apple|Company|ANNOUNCED|iPhone 15|Product
-        iPhone 15|Product|UNVEILED_AT|California|Location
-
-        Input: "Obsidian Trust funneled $200 million to Zenith AI."
-        Output:
-        Obsidian Trust|Company|FUNDED_WITH|$200 million|Money
-        Obsidian Trust|Company|SENT_MONEY_TO|Zenith AI|Company
-
-        Input: "Sarah Vane is the VP of Global Horizon Bank."
-        Output:
-        Sarah Vane|Person|HAS_TITLE|VP|Role
-        Sarah Vane|Person|WORKS_AT|Global Horizon Bank|Company
-
-        ### 2. Rules (Critical)
-        1. **NO MARKDOWN**: Do not use code blocks (```), tables, or bold text. Just raw text lines.
-        2. **RELATION Style**: MUST be UPPER_CASE_WITH_UNDERSCORES. No spaces. Max 25 chars.
-           - CORRECT: LOCATED_IN, FILED_LAWSUIT_AGAINST, HAS_SISTER
-           - WRONG: Located in, filed lawsuit, sister of
-        3. **Entity Types**: Use PascalCase (e.g., Person, Company, Product, Project).
-        4. **Granularity**: Extract hidden connections (family, financial flows, legal disputes).
-        5. **One relationship per line**.
-
-        ### 3. Text to Process
-        {text}
+    async def extract_chunk(self, text_chunk: str) -> List[Relation]:
+        """
+        Extracts relations from a chunk without writing them, so callers can
+        collect a whole document and write it in one transaction.
+        """
+        relations, _ = await self.extract_chunks([text_chunk])
+        return relations[0]
+
+    async def extract_chunks(self, chunks: List[str]) -> Tuple[List[List[Relation]], Dict[str, Any]]:
+        """
+        Extracts relations for many chunks, packing several chunks per LLM call
+        (up to the batch size / token budget) and running calls concurrently.
+        Chunks found in the extraction cache skip the LLM entirely.
+        Returns the relations per chunk (aligned with `chunks`) and extraction stats.
+        """
+        stats: Dict[str, Any] = {
+            "llm_calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "failed_batches": 0,
+            "llm_seconds": 0.0,
+        }
+        outputs: List[str] = [""] * len(chunks)
+
+        keys = [self.cache_key(chunk) for chunk in chunks] if self.cache else []
+        cached = await self._cache_get(keys)
+        pending: List[int] = []
+        seconds_saved = 0.0
+        for i in range(len(chunks)):
+            entry = cached.get(keys[i]) if keys else None
+            if entry is not None:
+                outputs[i] = entry.get("output", "")
+                seconds_saved += entry.get("llm_seconds", 0.0)
+            else:
+                pending.append(i)
+
+        new_entries: Dict[str, Dict[str, Any]] = {}
+
+        async def _run(indices: List[int]):
+            try:
+                results = await self._extract_batch([chunks[i] for i in indices], stats)
+            except Exception as e:
+                stats["failed_batches"] += 1
+                logger.error(f"Graph extraction failed for a batch of {len(indices)} chunks: {e}")
+                return
+            for i, result in zip(indices, results):
+                if result is None:
+                    # Never answered: leave it uncached so the next sync asks again
+                    continue
+                text, seconds = result
+                outputs[i] = text
+                if keys:
+                    new_entries[keys[i]] = {"output": text, "llm_seconds": round(seconds, 3)}
+
+        batches = self._pack([chunks[i] for i in pending])
+        await asyncio.gather(*(_run([pending[j] for j in batch]) for batch in batches))
+        await self._cache_put(new_entries)
+
+        hits = len(chunks) - len(pending)
+        stats["llm_seconds"] = round(stats["llm_seconds"], 3)
+        stats["cache_hits"] = hits
+        stats["cache_misses"] = len(pending)
+        stats["cache_hit_rate"] = round(hits / len(chunks), 3) if chunks else 0.0
+        stats["llm_seconds_saved"] = round(seconds_saved, 3)
+
+        relations = [self.parse_relations(output) for output in outputs]
+        relation_count = sum(len(r) for r in relations)
+        total_tokens = stats["input_tokens"] + stats["output_tokens"]
+        stats["relations"] = relation_count
+        stats["tokens_per_relation"] = (
+            round(total_tokens / relation_count, 1) if relation_count and total_tokens else None
+        )
+        return relations, stats
+
+    def cache_key(self, text: str) -> str:
+        payload = f"{PROMPT_VERSION}\x00{self.model_name}\x00{text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _cache_get(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not self.cache or not keys:
+            return {}
+        try:
+            return await self.cache.get_many(list(dict.fromkeys(keys)))
+        except Exception as e:
+            logger.warning(f"Extraction cache read failed: {e}")
+            return {}
+
+    async def _cache_put(self, entries: Dict[str, Dict[str, Any]]):
+        if not self.cache or not entries:
+            return
+        try:
+            await self.cache.put_many(entries)
+        except Exception as e:
+            logger.warning(f"Extraction cache write failed: {e}")
+
+    def _pack(self, chunks: List[str]) -> List[List[int]]:
+        """Greedily groups chunk indices by batch size and estimated token budget."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, chunk in enumerate(chunks):
+            tokens = estimate_tokens(chunk)
+            if current and (len(current) >= self.batch_size or current_tokens + tokens > self.token_budget):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _extract_batch(self, texts: List[str], stats: Dict[str, Any]) -> List[Optional[Tuple[str, float]]]:
+        """
+        Returns (raw pipe-delimited output, LLM seconds) for each text, or None
+        for a text whose single-chunk retry failed.
+        A batched call's time is attributed to its chunks by estimated tokens.
+        """
+        if len(texts) == 1:
+            return [await self._invoke(EXTRACTION_INSTRUCTIONS + SINGLE_TEXT_TEMPLATE.format(text=texts[0]), stats)]
+
+        sections = "\n\n".join(
+            f"=== SECTION {n} ===\n{text}" for n, text in enumerate(texts, start=1)
+        )
+        prompt = EXTRACTION_INSTRUCTIONS + BATCH_TEXT_TEMPLATE.format(count=len(texts), sections=sections)
+        raw_output, seconds = await self._invoke(prompt, stats)
+        outputs = self._split_sections(raw_output, len(texts))
+        if outputs is None:
+            # Model ignored the section format: fall back to one call per chunk
+            logger.warning(f"Batched extraction returned no section headers; retrying {len(texts)} chunks one by one")
+            return await self._extract_singly(texts, stats)
+
+        # The batched call's time goes to the sections it actually answered
+        present = [i for i, output in enumerate(outputs) if output is not None]
+        weights = {i: estimate_tokens(texts[i]) for i in present}
+        total = sum(weights.values())
+        results: List[Optional[Tuple[str, float]]] = [None] * len(texts)
+        for i in present:
+            results[i] = (outputs[i], seconds * weights[i] / total)
+
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if missing:
+            # Headers the model skipped are not "no relations": ask again per chunk
+            logger.warning(f"Batched extraction skipped {len(missing)} of {len(texts)} sections; retrying them one by one")
+            retried = await self._extract_singly([texts[i] for i in missing], stats)
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
+
+    async def _extract_singly(self, texts: List[str], stats: Dict[str, Any]) -> List[Optional[Tuple[str, float]]]:
+        """One call per text; a failed call yields None instead of failing its neighbours."""
+        results = await asyncio.gather(
+            *(self._extract_batch([text], stats) for text in texts), return_exceptions=True
+        )
+        outputs: List[Optional[Tuple[str, float]]] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                stats["failed_batches"] += 1
+                logger.error(f"Single-chunk graph extraction failed: {result}")
+                outputs.append(None)
+            else:
+                outputs.append(result[0])
+        return outputs
+
+    @staticmethod
+    def _split_sections(raw_output: str, count: int) -> Optional[List[Optional[str]]]:
+        """
+        Splits a batched response back into per-section outputs.
+        Returns None if unparseable; sections without a header are None.
+        """
+        matches = list(_SECTION_HEADER.finditer(raw_output))
+        if not matches:
+            return None
+        outputs: List[Optional[str]] = [None] * count
+        for match, next_match in zip(matches, matches[1:] + [None]):
+            n = int(match.group(1))
+            if 1 <= n <= count:
+                end = next_match.start() if next_match else len(raw_output)
+                outputs[n - 1] = (outputs[n - 1] or "") + raw_output[match.end():end]
+        return outputs
+
+    async def _invoke(self, prompt: str, stats: Dict[str, Any]) -> Tuple[str, float]:
+        """
+        Uses LangChain's ainvoke for async generation and records token usage.
+        Returns the response text and the seconds spent in the call.
         """
         # invoke/ainvoke expects a list of messages
         messages = [HumanMessage(content=prompt)]
 
-        # Native async call supported by ChatOpenAI
-        response = await self.llm.ainvoke(messages)
-        if isinstance(response, list):
-            return "".join(str(x) for x in response).strip()
-        return str(response).strip()
+        async with self.semaphore:
+            started = time.perf_counter()
+            response = await self.llm.ainvoke(messages)
+            elapsed = time.perf_counter() - started
+
+        stats["llm_calls"] += 1
+        stats["llm_seconds"] += elapsed
+        usage = getattr(response, "usage_metadata", None) or {}
+        stats["input_tokens"] += usage.get("input_tokens", 0)
+        stats["output_tokens"] += usage.get("output_tokens", 0)
+
+        content = getattr(response, "content", response)
+        if isinstance(content, list):
+            # Content blocks: keep the text parts
+            content = "".join(
+                block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+            )
+        return str(content).strip(), elapsed
+
+    async def write_relations(self, relations: Iterable[Relation]):
+        """
+        Writes relations as one UNWIND statement per (subject label, relation,
+        object label) group, all in a single transaction.
+        """
+        statements = self._build_statements(relations)
+        if not statements:
+            return
+        entity_ids = list(dict.fromkeys(
+            name for _, params in statements for row in params["rows"] for name in (row["subj"], row["obj"])
+        ))
+        # Same transaction: readers never see a new edge with a stale degree
+        await self.graph.execute_write_batch(statements + [self._degree_statement(entity_ids)])
+        logger.info(
+            f"Wrote {sum(len(p['rows']) for _, p in statements)} relations "
+            f"in {len(statements)} batched statements"
+        )
+        await self._publish_written(entity_ids)
+
+    async def _publish_written(self, entity_ids: List[str]):
+        if self.events is None:
+            return
+        try:
+            await self.events.relations_written(entity_ids)
+        except Exception as e:
+            # The graph is written; readers only miss an incremental refresh
+            logger.warning(f"Failed to publish graph update: {e}")
 
-    def _ingest_relations(self, raw_output: str):
+    @staticmethod
+    def parse_relations(raw_output: str) -> List[Relation]:
         """
-        Synchronous logic for DB insertion (run in thread).
+        Parses `Subject|SubjectType|RELATION|Object|ObjectType` lines.
+        Labels and relation types are sanitized (they cannot be parameters);
+        entity names are kept verbatim and passed as query parameters.
         """
+        relations = []
         for line in raw_output.split("\n"):
             if "|" not in line:
                 continue
@@ -97,19 +363,42 @@ class GraphProcessor:
 
             subj, subj_type, rel, obj, obj_type = parts[:5]
 
-            # Sanitize inputs
-            subj = subj.replace("'", "\\'")
-            obj = obj.replace("'", "\\'")
+            # Sanitize identifiers
             rel = re.sub(r"[^a-zA-Z0-9_]", "_", rel).upper().strip("_")
             subj_type = re.sub(r"[^a-zA-Z0-9]", "", subj_type).capitalize()
             obj_type = re.sub(r"[^a-zA-Z0-9]", "", obj_type).capitalize()
 
-            if not rel or not subj_type or not obj_type:
+            if not subj or not obj or not rel or not subj_type or not obj_type:
                 continue
 
+            relations.append(Relation(subj, subj_type, rel, obj, obj_type))
+        return relations
+
+    @staticmethod
+    def _build_statements(relations: Iterable[Relation]) -> List[Tuple[str, dict]]:
+        groups: Dict[Tuple[str, str, str], Dict[Tuple[str, str], None]] = defaultdict(dict)
+        for r in relations:
+            # dict keys de-duplicate rows while keeping order
+            groups[(r.subj_type, r.rel, r.obj_type)][(r.subj, r.obj)] = None
+
+        statements = []
+        for (subj_type, rel, obj_type), pairs in groups.items():
             cypher = (
-                f"MERGE (a:{subj_type} {{id: '{subj}'}}) "
-                f"MERGE (b:{obj_type} {{id: '{obj}'}}) "
-                f"MERGE (a)-[:{rel}]->(b)"
+                "UNWIND $rows AS row "
+                f"MERGE (a:`{subj_type}` {{id: row.subj}}) SET a:{ENTITY_LABEL} "
+                f"MERGE (b:`{obj_type}` {{id: row.obj}}) SET b:{ENTITY_LABEL} "
+                f"MERGE (a)-[:`{rel}`]->(b)"
             )
-            self.graph.execute_query(cypher)
+            rows = [{"subj": subj, "obj": obj} for subj, obj in pairs]
+            statements.append((cypher, {"rows": rows}))
+        return statements
+
+    @staticmethod
+    def _degree_statement(entity_ids: List[str]) -> Tuple[str, dict]:
+        """Refreshes the precomputed degree (hub filter) of the nodes just written."""
+        cypher = (
+            "UNWIND $ids AS id "
+            f"MATCH (n:{ENTITY_LABEL} {{id: id}}) "
+            "SET n.degree = COUNT { (n)--() }"
+        )
+        return cypher, {"ids": entity_ids}
@@ -1,77 +1,294 @@
 import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from langchain_core.documents import Document
-from rag_worker.interfaces import JobStatusReporter
+from typing import Any, Dict, Iterable, List, Optional, Set
+from rag_worker.interfaces import ExtractionCache, GraphEventPublisher, JobStatusReporter
 from shared.config import config
 from rag_worker.providers.splitter import TextSplitterFactory
+from rag_worker.providers.executors import WorkerExecutors
 
-from shared.providers.neo4j_client import Neo4jClient
+from shared.providers.lexical_index import LexicalIndexBuilder, SegmentWriter
+from shared.providers.neo4j_client import AsyncNeo4jClient
+from rag_worker.services.embedding import BatchEmbedder
 from rag_worker.services.graph_processor import GraphProcessor
+from rag_worker.services.manifest import ChunkIdAssigner, RedisChunkManifest
 
 logger = logging.getLogger("RAG-Worker.Services.Ingestion")
 
+# Marks the end of a pipeline queue
+_END = object()
+
+
+def _merge_graph_stats(total: Dict[str, Any], part: Dict[str, Any]):
+    """Sums per-flush graph stats and recomputes the derived ratios."""
+    for key in ("llm_calls", "input_tokens", "output_tokens", "failed_batches", "relations",
+                "cache_hits", "cache_misses", "llm_seconds", "llm_seconds_saved"):
+        total[key] = round(total.get(key, 0) + part.get(key, 0), 3)
+    tokens = total["input_tokens"] + total["output_tokens"]
+    lookups = total["cache_hits"] + total["cache_misses"]
+    total["tokens_per_relation"] = round(tokens / total["relations"], 1) if total["relations"] and tokens else None
+    total["cache_hit_rate"] = round(total["cache_hits"] / lookups, 3) if lookups else 0.0
+
 class IngestionService:
-    def __init__(self, vector_store, status_reporter: JobStatusReporter, llm):
+    def __init__(
+        self,
+        vector_store,
+        status_reporter: JobStatusReporter,
+        llm,
+        embeddings,
+        extraction_cache: Optional[ExtractionCache] = None,
+        manifest: Optional[RedisChunkManifest] = None,
+        graph_events: Optional[GraphEventPublisher] = None,
+        lexical_index: Optional[LexicalIndexBuilder] = None,
+    ):
         self.vector_store = vector_store
         self.reporter = status_reporter
         self.splitter = TextSplitterFactory.get_splitter(config)
+        # Explicit, batched embedding stage (off the event loop)
+        self.embedder = BatchEmbedder(embeddings, vector_store, config)
+        # Chunk manifest enables incremental re-syncs (None = always full ingest)
+        self.manifest = manifest
+        # BM25 index for hybrid retrieval (None = not maintained)
+        self.lexical_index = lexical_index
+        self.queue_size = max(1, config.INGEST_QUEUE_SIZE)
+        self.graph_queue_size = max(1, config.GRAPH_QUEUE_SIZE)
+        # Blocking stages never run on the event loop or its default executor
+        self.executors = WorkerExecutors.get_instance(config)
+        self.graph_flush_chunks = max(1, config.GRAPH_FLUSH_CHUNKS)
         
-        self.neo4j_client = Neo4jClient.get_instance()
-        self.graph_processor = GraphProcessor(llm, self.neo4j_client)
-        # Limit concurrent LLM calls to 5 to avoid Rate Limits
-        self.semaphore = asyncio.Semaphore(5)
+        self.neo4j_client = AsyncNeo4jClient.get_instance(config)
+        # Batches chunks per LLM call and bounds concurrent calls (GRAPH_EXTRACTION_*)
+        self.graph_processor = GraphProcessor(
+            llm, self.neo4j_client, config, extraction_cache, graph_events
+        )
 
     async def ingest(self, doc_id: str, raw_text: str, filename: str = "Unknown"):
         if not raw_text:
             logger.warning(f"No text extracted for document {doc_id}")
             await self.reporter.report_failure(doc_id, filename, "No text extracted from document.")
             return
-        try:
-            # Split Text
-            chunks = self.splitter.split_text(raw_text)
+        await self.ingest_pages(doc_id, [raw_text], filename=filename)
 
-            # Vector Store Ingestion
-            documents = [
-                Document(
-                    page_content=text, metadata={"doc_id": doc_id, "chunk_index": i}
-                )
-                for i, text in enumerate(chunks)
-            ]
-
-            if documents:
-                self.vector_store.add_documents(documents)
-                
-                # We await it here to ensure the job is fully done before reporting success.
-                # Since it uses asyncio.gather internally, it will be fast.
-                logger.info(f"Starting Graph Extraction for {len(chunks)} chunks...")
-                await self._process_graph_parallel(chunks)
-
-                await self.reporter.report_success(doc_id, filename, len(documents))
-            else:
-                await self.reporter.report_failure(doc_id, filename, "No chunks created from text.")
-                
+    async def ingest_pages(self, doc_id: str, pages: Iterable[str], filename: str = "Unknown"):
+        """
+        Streaming ingestion pipeline over bounded queues:
+
+            extract+split (thread) -> chunk queue -> embed -> upsert
+                                               +-> graph queue -> extract relations -> write
+
+        Every stage starts on the first pages while later pages are still being
+        parsed; full queues block the upstream stage (backpressure), so memory
+        stays flat regardless of file size.
+
+        Failures are raised, not reported: the job queue retries the job and the
+        worker reports the failure once it is dead-lettered.
+        """
+        try:
+            stats = await self._run_pipeline(doc_id, pages)
         except Exception as e:
             logger.error(f"Failed to ingest document: {doc_id}: {e}")
-            await self.reporter.report_failure(doc_id, filename, str(e))
+            raise
+        if not stats["chunks_total"]:
+            logger.warning(f"No text extracted for document {doc_id}")
+            await self.reporter.report_failure(doc_id, filename, "No text extracted from document.")
+            return
+        await self.reporter.report_success(doc_id, filename, stats["chunks_total"], stats)
+
+    async def _run_pipeline(self, doc_id: str, pages: Iterable[str]) -> Dict[str, Any]:
+        """Syncs the vector store and graph, then publishes the document's BM25 segment."""
+        segment = self.lexical_index.segment_writer(doc_id) if self.lexical_index else None
+        try:
+            stats = await self._sync_document(doc_id, pages, segment)
+        except BaseException:
+            if segment is not None:
+                segment.abort()
+            raise
+        if segment is not None:
+            await self._publish_segment(segment)
+        return stats
+
+    async def _publish_segment(self, segment: SegmentWriter):
+        """Lexical index failures are logged only: the document is already searchable by vector."""
+        try:
+            await self.executors.run(self.executors.io, self.lexical_index.publish, segment)
+        except Exception as e:
+            logger.error(f"Lexical index update for {segment.doc_id} failed: {e}")
+
+    async def _sync_document(
+        self, doc_id: str, pages: Iterable[str], segment: Optional[SegmentWriter]
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        first_searchable: Optional[float] = None
+
+        # Incremental mode: skip chunks already in the store
+        previous: Set[str] = set()
+        if self.manifest is not None:
+            manifest_ids = await self.manifest.get(doc_id)
+            if manifest_ids is None:
+                # First incremental sync: clear vectors written before manifests existed
+                await self.executors.run(self.executors.io, self.vector_store.delete_document, doc_id)
+            else:
+                previous = manifest_ids
 
-    async def _process_graph_parallel(self, chunks: list[str]):
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # Bounded too, so memory stays flat whatever the file size; fed after the embedding
+        # hand-off, so embedding only waits once it is GRAPH_QUEUE_SIZE chunks ahead
+        graph_queue: asyncio.Queue = asyncio.Queue(maxsize=self.graph_queue_size)
+        stop = threading.Event()
+
+        # Stage 1: parse + split in a thread, handing chunks to the loop
+        def _produce():
+            def _put(item) -> bool:
+                future = asyncio.run_coroutine_threadsafe(chunk_queue.put(item), loop)
+                while True:
+                    try:
+                        future.result(timeout=0.5)
+                        return True
+                    except FutureTimeoutError:
+                        if stop.is_set():
+                            future.cancel()
+                            return False
+
+            try:
+                for chunk in self.splitter.split_stream(pages):
+                    if stop.is_set() or not _put(chunk):
+                        return
+                _put(_END)
+            except BaseException as e:
+                _put(e)
+
+        # Stage 2: assign ids, drop unchanged chunks, fan out to embedding + graph
+        assign_id = ChunkIdAssigner(doc_id)
+        current_ids: List[str] = []
+        new_count = 0
+
+        async def _new_chunks():
+            nonlocal new_count
+            while True:
+                item = await chunk_queue.get()
+                if item is _END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                chunk_id = assign_id(item)
+                index = len(current_ids)
+                current_ids.append(chunk_id)
+                if segment is not None:
+                    # Every chunk, unchanged ones included: the segment replaces the previous one
+                    segment.add(chunk_id, item, {"doc_id": doc_id, "chunk_index": index})
+                if chunk_id in previous:
+                    continue
+                new_count += 1
+                yield (
+                    Document(
+                        page_content=item,
+                        # No positional chunk_index: it would go stale for unchanged chunks on re-syncs
+                        metadata={"doc_id": doc_id, "chunk_id": chunk_id},
+                    ),
+                    chunk_id,
+                )
+                await graph_queue.put(item)
+            await graph_queue.put(_END)
+
+        def _on_upserted(count: int):
+            nonlocal first_searchable
+            if first_searchable is None:
+                first_searchable = time.perf_counter() - started
+                logger.info(f"First chunks of {doc_id} searchable after {first_searchable:.2f}s")
+
+        producer = asyncio.ensure_future(self.executors.run(self.executors.parse, _produce))
+        graph_task = asyncio.create_task(self._consume_graph(graph_queue))
+        try:
+            # Stages 3+4: batched embedding with overlapping upserts
+            stats = await self.embedder.embed_and_upsert_stream(
+                _new_chunks(), on_upserted=_on_upserted
+            )
+            graph_stats = await graph_task
+            await producer
+        except BaseException:
+            stop.set()
+            graph_task.cancel()
+            raise
+
+        removed = sorted(previous - set(current_ids))
+        if removed:
+            deleted = await self.executors.run(self.executors.io, self.vector_store.delete_ids, removed)
+            if not deleted:
+                raise RuntimeError(f"Failed to delete {len(removed)} stale chunks")
+
+        if self.manifest is not None and current_ids:
+            # Only recorded once the store matches it, so a failed run is simply redone
+            await self.manifest.save(doc_id, current_ids)
+
+        stats.update(
+            {
+                "chunks_total": len(current_ids),
+                "chunks_new": new_count,
+                "chunks_unchanged": len(current_ids) - new_count,
+                "chunks_removed": len(removed),
+                "time_to_first_searchable_seconds": round(first_searchable, 3) if first_searchable else None,
+                "wall_seconds": round(time.perf_counter() - started, 3),
+            }
+        )
+        if graph_stats:
+            stats["graph"] = graph_stats
+        logger.info(
+            f"Ingested {doc_id}: {new_count} new, {stats['chunks_unchanged']} unchanged, "
+            f"{len(removed)} removed chunks in {stats['wall_seconds']}s "
+            f"(first searchable after {stats['time_to_first_searchable_seconds']}s)"
+        )
+        return stats
+
+    async def _consume_graph(self, graph_queue: asyncio.Queue) -> Dict[str, Any]:
         """
-        Helper method to process graph chunks in parallel with a semaphore.
+        Graph stage: extracts and writes relations every GRAPH_FLUSH_CHUNKS new
+        chunks, in parallel with embedding. Returns the merged extraction stats.
         """
-        tasks = []
-        for chunk in chunks:
-            tasks.append(self._bounded_graph_task(chunk))
-        
-        # Run all chunks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
+        merged: Dict[str, Any] = {}
+        group: List[str] = []
+        while True:
+            item = await graph_queue.get()
+            if item is not _END:
+                group.append(item)
+            if group and (item is _END or len(group) >= self.graph_flush_chunks):
+                logger.info(f"Starting Graph Extraction for {len(group)} chunks...")
+                try:
+                    _merge_graph_stats(merged, await self._process_graph_parallel(group))
+                except Exception as e:
+                    # Keep draining the queue: graph failures must not stall vector ingestion
+                    logger.error(f"Graph flush of {len(group)} chunks failed: {e}")
+                group = []
+            if item is _END:
+                return merged
+
+    async def _process_graph_parallel(self, chunks: list[str]) -> dict:
+        """
+        Extracts relations from all chunks (batched LLM calls, run in parallel),
+        then writes the whole document's graph in one batched transaction.
+        Returns the extraction stats.
+        """
+        relations_per_chunk, graph_stats = await self.graph_processor.extract_chunks(chunks)
+
         # Log any errors (optional: you could fail the job if graph fails, 
         # but usually we want to keep the vector data even if graph fails partially)
-        errors = [r for r in results if isinstance(r, Exception)]
-        if errors:
-            logger.error(f"Graph ingestion encountered {len(errors)} errors. First error: {errors[0]}")
-
-    async def _bounded_graph_task(self, chunk: str):
-        """Acquire semaphore -> Process -> Release"""
-        async with self.semaphore:
-            await self.graph_processor.process_chunk(chunk)
\ No newline at end of file
+        if graph_stats["failed_batches"]:
+            logger.error(f"Graph extraction failed for {graph_stats['failed_batches']} batches.")
+
+        relations = [rel for chunk_relations in relations_per_chunk for rel in chunk_relations]
+        try:
+            await self.graph_processor.write_relations(relations)
+        except Exception as e:
+            logger.error(f"Graph ingestion failed to write {len(relations)} relations: {e}")
+
+        logger.info(
+            f"Graph extraction: {graph_stats['relations']} relations from {len(chunks)} chunks "
+            f"in {graph_stats['llm_calls']} LLM calls "
+            f"(tokens/relation: {graph_stats['tokens_per_relation']}, "
+            f"cache hit rate: {graph_stats['cache_hit_rate']}, "
+            f"LLM seconds saved: {graph_stats['llm_seconds_saved']})"
+        )
+        return graph_stats
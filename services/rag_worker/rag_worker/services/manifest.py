@@ -0,0 +1,58 @@
+import hashlib
+import logging
+from collections import Counter
+from typing import List, Optional, Set
+
+logger = logging.getLogger("RAG-Worker.Services.Manifest")
+
+MANIFEST_KEY_PREFIX = "rag_manifest"
+
+
+class ChunkIdAssigner:
+    """
+    Deterministic vector ids: `{doc_id}:{content hash}:{occurrence}`.
+    The occurrence counter keeps repeated identical chunks distinct; call it
+    once per chunk, in document order (works on streamed chunks).
+    """
+
+    def __init__(self, doc_id: str):
+        self.doc_id = doc_id
+        self._seen: Counter = Counter()
+
+    def __call__(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        chunk_id = f"{self.doc_id}:{digest}:{self._seen[digest]}"
+        self._seen[digest] += 1
+        return chunk_id
+
+
+class RedisChunkManifest:
+    """
+    Per-document set of the chunk ids currently in the vector store
+    (Redis key `rag_manifest:{doc_id}`). Deleted by the RAG Service with the document.
+    """
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    @staticmethod
+    def key(doc_id: str) -> str:
+        return f"{MANIFEST_KEY_PREFIX}:{doc_id}"
+
+    async def get(self, doc_id: str) -> Optional[Set[str]]:
+        """Returns None when the document has never been ingested incrementally."""
+        key = self.key(doc_id)
+        if not await self.redis.exists(key):
+            return None
+        return set(await self.redis.smembers(key))
+
+    async def save(self, doc_id: str, ids: List[str]):
+        key = self.key(doc_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if ids:
+                pipe.sadd(key, *ids)
+            await pipe.execute()
+
+    async def delete(self, doc_id: str):
+        await self.redis.delete(self.key(doc_id))
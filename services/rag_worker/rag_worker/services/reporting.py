@@ -1,7 +1,8 @@
 import json
 import logging
 from datetime import datetime
-from rag_worker.interfaces import JobStatusReporter
+from typing import Any, Dict, List, Optional
+from rag_worker.interfaces import GraphEventPublisher, JobStatusReporter
 
 logger = logging.getLogger("RAG-Worker.Services.Reporting")
 
@@ -9,19 +10,25 @@ class RedisJobStatusReporter(JobStatusReporter):
     def __init__(self, redis_client):
         self.redis_client = redis_client
 
-    async def report_success(self, doc_id: str, filename: str, chunk_count: int):
+    async def report_success(self, doc_id: str, filename: str, chunk_count: int, stats: Optional[Dict[str, Any]] = None):
         # 1. Update Document Metadata
         metadata = {
             "doc_id": doc_id,
             "filename": filename,
             "status": "synced",
             "timestamp": datetime.now().isoformat(),
+            "chunk_count": chunk_count,
+            "stats": stats or {},
         }
         await self.redis_client.hset("rag_documents", doc_id, json.dumps(metadata))
         
-        # 2. Publish Event
+        # 2. Publish Events
         await self._publish_update(doc_id, "completed", "File synced successfully.")
-        logger.info(f"Reported success for {doc_id}: {chunk_count} chunks.")
+        # Lets downstream caches (e.g. the Chat semantic cache) drop stale answers
+        await self.redis_client.publish(
+            "document_events", json.dumps({"event": "synced", "doc_id": doc_id})
+        )
+        logger.info(f"Reported success for {doc_id}: {chunk_count} chunks. Stats: {stats}")
 
     async def report_failure(self, doc_id: str, filename: str, error_message: str):
         # 1. Update Document Metadata
@@ -41,4 +48,21 @@ class RedisJobStatusReporter(JobStatusReporter):
         payload = json.dumps(
             {"type": "job_update", "doc_id": doc_id, "status": status, "message": msg}
         )
-        await self.redis_client.publish("job_updates", payload)
\ No newline at end of file
+        await self.redis_client.publish("job_updates", payload)
+
+
+class RedisGraphEventPublisher(GraphEventPublisher):
+    """
+    Bumps the 'graph_version' counter and publishes the written node ids on
+    'graph_updates' (RAG Service entity dictionary and graph context cache).
+    """
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    async def relations_written(self, entity_ids: List[str]):
+        version = await self.redis_client.incr("graph_version")
+        payload = json.dumps(
+            {"event": "relations_written", "version": version, "entities": entity_ids}
+        )
+        await self.redis_client.publish("graph_updates", payload)
@@ -0,0 +1,29 @@
+import pytest
+from unittest.mock import MagicMock
+from langchain_core.documents import Document
+from rag_worker.services.embedding import BatchEmbedder
+from shared.config import Config
+
+
+@pytest.mark.asyncio
+async def test_batch_embedder_batches_and_upserts_in_order():
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    vector_store = MagicMock()
+
+    embedder = BatchEmbedder(
+        embeddings, vector_store, Config(EMBEDDING_BATCH_SIZE=2, EMBEDDING_WORKERS=2)
+    )
+    documents = (Document(page_content="x" * i, metadata={"chunk_index": i}) for i in range(5))
+
+    stats = await embedder.embed_and_upsert(documents, ids=[f"id{i}" for i in range(5)])
+
+    assert stats["chunks"] == 5
+    assert stats["batches"] == 3
+    assert [len(c.args[0]) for c in embeddings.embed_documents.call_args_list] == [2, 2, 1]
+
+    upserted_ids = [i for c in vector_store.add_embeddings.call_args_list for i in c.args[2]]
+    assert upserted_ids == ["id0", "id1", "id2", "id3", "id4"]
+    first_docs, first_vectors, _ = vector_store.add_embeddings.call_args_list[0].args
+    assert first_vectors == [[0.0], [1.0]]
+    assert first_docs[1].metadata["chunk_index"] == 1
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import pytest
+from rag_worker.providers.executors import WorkerExecutors
+from shared.config import Config
+
+
+@pytest.fixture
+def executors():
+    pools = WorkerExecutors(Config(WORKER_PARSE_THREADS=1, WORKER_IO_THREADS=1, PDF_EXTRACTION_WORKERS=1))
+    yield pools
+    pools.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stages_run_on_dedicated_threads_and_cancel_cleanly(executors):
+    name = await executors.run(executors.parse, lambda: threading.current_thread().name)
+    assert name.startswith("parse")
+
+    # A task queued behind a busy thread is dropped when its awaiter is cancelled
+    release = threading.Event()
+    ran = []
+    busy = asyncio.ensure_future(executors.run(executors.io, release.wait))
+    queued = asyncio.ensure_future(executors.run(executors.io, ran.append, 1))
+    await asyncio.sleep(0.05)
+    queued.cancel()
+    await asyncio.sleep(0.05)
+    release.set()
+    await busy
+    await asyncio.sleep(0.05)
+    assert ran == []
+
+
+@pytest.mark.asyncio
+async def test_pdf_pool_is_created_on_first_use(executors):
+    assert executors._pdf is None
+    assert await executors.run(executors.pdf, abs, -3) == 3
+    assert executors._pdf is not None
@@ -0,0 +1,203 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from rag_worker.services.graph_processor import GraphProcessor
+from shared.config import Config
+
+RAW_OUTPUT = """
+Tim Cook|Person|CEO_OF|Apple|Company
+O'Brien|Person|works at|Apple|Company
+Tim Cook|Person|CEO_OF|Apple|Company
+Apple|Company|ANNOUNCED|iPhone 15|Product
+not a relation
+"""
+
+
+def test_parse_relations_keeps_names_verbatim():
+    relations = GraphProcessor.parse_relations(RAW_OUTPUT)
+
+    assert len(relations) == 4
+    assert relations[1].subj == "O'Brien"
+    assert relations[1].rel == "WORKS_AT"
+
+
+@pytest.mark.asyncio
+async def test_write_relations_batches_by_label_and_type():
+    neo4j_client = MagicMock(execute_write_batch=AsyncMock())
+    processor = GraphProcessor(MagicMock(), neo4j_client)
+
+    await processor.write_relations(GraphProcessor.parse_relations(RAW_OUTPUT))
+
+    neo4j_client.execute_write_batch.assert_awaited_once()
+    statements = neo4j_client.execute_write_batch.call_args[0][0]
+    # (Person, CEO_OF, Company), (Person, WORKS_AT, Company), (Company, ANNOUNCED, Product), then degrees
+    assert len(statements) == 4
+
+    cypher, params = statements[0]
+    assert cypher.startswith("UNWIND $rows AS row")
+    assert "`CEO_OF`" in cypher
+    # Duplicate triple collapsed into one row
+    assert params["rows"] == [{"subj": "Tim Cook", "obj": "Apple"}]
+    # Entity names are parameters, never interpolated
+    assert all("O'Brien" not in c for c, _ in statements)
+    # Every node gets the indexed label; touched nodes get their hub-filter degree refreshed
+    assert "SET a:Entity" in cypher and "SET b:Entity" in cypher
+    degree_cypher, degree_params = statements[-1]
+    assert "SET n.degree = COUNT { (n)--() }" in degree_cypher
+    assert degree_params == {"ids": ["Tim Cook", "Apple", "O'Brien", "iPhone 15"]}
+
+
+class _FakeResponse:
+    def __init__(self, content, input_tokens=100, output_tokens=20):
+        self.content = content
+        self.usage_metadata = {"input_tokens": input_tokens, "output_tokens": output_tokens}
+
+
+@pytest.mark.asyncio
+async def test_extract_chunks_packs_sections_into_one_call():
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(
+        return_value=_FakeResponse(
+            "=== SECTION 1 ===\n"
+            "Tim Cook|Person|CEO_OF|Apple|Company\n"
+            "=== SECTION 2 ===\n"
+            "=== SECTION 3 ===\n"
+            "Apple|Company|ANNOUNCED|iPhone 15|Product\n"
+            "Apple|Company|LOCATED_IN|California|Location\n"
+        )
+    )
+    processor = GraphProcessor(llm, MagicMock(), Config(GRAPH_EXTRACTION_BATCH_SIZE=3))
+
+    relations, stats = await processor.extract_chunks(["a", "b", "c"])
+
+    assert llm.ainvoke.await_count == 1
+    assert [len(r) for r in relations] == [1, 0, 2]
+    assert stats["relations"] == 3
+    assert stats["tokens_per_relation"] == 40.0
+
+
+@pytest.mark.asyncio
+async def test_extract_chunks_respects_token_budget_and_falls_back():
+    llm = MagicMock()
+    # No section headers: the batch is retried chunk by chunk
+    llm.ainvoke = AsyncMock(return_value=_FakeResponse("Tim Cook|Person|CEO_OF|Apple|Company"))
+    processor = GraphProcessor(
+        llm, MagicMock(), Config(GRAPH_EXTRACTION_BATCH_SIZE=8, GRAPH_EXTRACTION_TOKEN_BUDGET=30)
+    )
+    chunks = ["x" * 80, "y" * 80, "z" * 200]  # ~21, 21, 51 tokens
+
+    assert processor._pack(chunks) == [[0], [1], [2]]
+
+    processor.token_budget = 50
+    assert processor._pack(chunks) == [[0, 1], [2]]
+
+    relations, stats = await processor.extract_chunks(chunks)
+    # 1 batched call + 2 single-chunk retries + 1 single call
+    assert stats["llm_calls"] == 4
+    assert all(len(r) == 1 for r in relations)
+
+
+@pytest.mark.asyncio
+async def test_sections_missing_from_the_reply_are_retried_alone():
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(
+        side_effect=[
+            # Section 2 has no header: it was skipped, not empty
+            _FakeResponse(
+                "=== SECTION 1 ===\n"
+                "Tim Cook|Person|CEO_OF|Apple|Company\n"
+                "=== SECTION 3 ===\n"
+            ),
+            _FakeResponse("Apple|Company|ANNOUNCED|iPhone 15|Product"),
+        ]
+    )
+    processor = GraphProcessor(llm, MagicMock(), Config(GRAPH_EXTRACTION_BATCH_SIZE=3))
+
+    relations, stats = await processor.extract_chunks(["a", "b", "c"])
+
+    assert stats["llm_calls"] == 2
+    assert "=== SECTION" not in llm.ainvoke.await_args_list[1][0][0][0].content
+    assert [len(r) for r in relations] == [1, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_extraction_cache_skips_unchanged_chunks(tmp_path):
+    from rag_worker.providers.extraction_cache import ExtractionCacheFactory
+
+    settings = Config(
+        GRAPH_EXTRACTION_BATCH_SIZE=1,
+        GRAPH_EXTRACTION_CACHE="disk",
+        GRAPH_EXTRACTION_CACHE_DIR=str(tmp_path),
+    )
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=_FakeResponse("Tim Cook|Person|CEO_OF|Apple|Company"))
+    processor = GraphProcessor(llm, MagicMock(), settings, ExtractionCacheFactory.get_cache(settings))
+
+    _, first = await processor.extract_chunks(["unchanged", "edited v1"])
+    relations, second = await processor.extract_chunks(["unchanged", "edited v2"])
+
+    assert first["cache_hits"] == 0
+    assert second["cache_hits"] == 1
+    assert second["cache_hit_rate"] == 0.5
+    assert second["llm_seconds_saved"] >= 0
+    assert llm.ainvoke.await_count == 3
+    assert [len(r) for r in relations] == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_only_answered_sections_are_cached(tmp_path):
+    from rag_worker.providers.extraction_cache import ExtractionCacheFactory
+
+    settings = Config(
+        GRAPH_EXTRACTION_BATCH_SIZE=2,
+        GRAPH_EXTRACTION_CACHE="disk",
+        GRAPH_EXTRACTION_CACHE_DIR=str(tmp_path),
+    )
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(
+        side_effect=[
+            _FakeResponse("=== SECTION 1 ===\nTim Cook|Person|CEO_OF|Apple|Company\n"),
+            RuntimeError("rate limited"),
+        ]
+    )
+    cache = ExtractionCacheFactory.get_cache(settings)
+    processor = GraphProcessor(llm, MagicMock(), settings, cache)
+
+    relations, stats = await processor.extract_chunks(["answered", "skipped"])
+
+    assert [len(r) for r in relations] == [1, 0]
+    assert stats["failed_batches"] == 1
+    cached = await cache.get_many([processor.cache_key("answered"), processor.cache_key("skipped")])
+    assert list(cached) == [processor.cache_key("answered")]
+
+
+@pytest.mark.asyncio
+async def test_write_relations_publishes_written_entities():
+    events = MagicMock(relations_written=AsyncMock())
+    processor = GraphProcessor(MagicMock(), MagicMock(execute_write_batch=AsyncMock()), events=events)
+
+    await processor.write_relations(GraphProcessor.parse_relations(RAW_OUTPUT))
+
+    events.relations_written.assert_awaited_once_with(["Tim Cook", "Apple", "O'Brien", "iPhone 15"])
+
+
+@pytest.mark.asyncio
+async def test_graph_events_bump_version_and_publish():
+    import json
+    from fakeredis import aioredis as fake_aioredis
+    from rag_worker.services.reporting import RedisGraphEventPublisher
+
+    redis = fake_aioredis.FakeRedis(decode_responses=True)
+    async with redis.pubsub() as pubsub:
+        await pubsub.subscribe("graph_updates")
+        publisher = RedisGraphEventPublisher(redis)
+
+        await publisher.relations_written(["Apple"])
+        await publisher.relations_written(["Tim Cook"])
+
+        assert await redis.get("graph_version") == "2"
+        messages = []
+        while len(messages) < 2:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message:
+                messages.append(json.loads(message["data"]))
+        assert [(m["version"], m["entities"]) for m in messages] == [(1, ["Apple"]), (2, ["Tim Cook"])]
@@ -0,0 +1,194 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fakeredis import aioredis as fake_aioredis
+from rag_worker.interfaces import SplitterStrategy
+from rag_worker.services.ingestion import IngestionService
+from rag_worker.services.manifest import ChunkIdAssigner, RedisChunkManifest
+from shared.providers.lexical_index import LexicalIndexBuilder, LexicalIndexReader
+
+
+class _FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[0.1, 0.2] for _ in texts]
+
+
+class _Splitter(SplitterStrategy):
+    """Splits on blank lines so tests control the chunks exactly."""
+
+    def __init__(self):
+        pass
+
+    def split_text(self, text):
+        return [part for part in text.split("\n\n") if part]
+
+
+@pytest.fixture
+def service():
+    with patch("rag_worker.services.ingestion.AsyncNeo4jClient"):
+        vector_store = MagicMock()
+        vector_store.delete_ids.return_value = True
+        reporter = MagicMock(report_success=AsyncMock(), report_failure=AsyncMock())
+        manifest = RedisChunkManifest(fake_aioredis.FakeRedis(decode_responses=True))
+
+        svc = IngestionService(vector_store, reporter, MagicMock(), _FakeEmbeddings(), manifest=manifest)
+        svc.splitter = _Splitter()
+        svc._process_graph_parallel = AsyncMock(return_value={})
+        yield svc
+
+
+def chunk_ids(doc_id, chunks):
+    assign = ChunkIdAssigner(doc_id)
+    return [assign(text) for text in chunks]
+
+
+def test_chunk_ids_are_stable_and_distinct():
+    ids = chunk_ids("doc", ["a", "b", "a"])
+    assert ids == chunk_ids("doc", ["a", "b", "a"])
+    assert len(set(ids)) == 3
+    assert ids[0].startswith("doc:")
+
+
+@pytest.mark.asyncio
+async def test_resync_only_embeds_new_and_deletes_removed_chunks(service):
+    await service.ingest("doc", "intro\n\nleave policy v1\n\nexpenses", filename="p.pdf")
+
+    # First incremental sync clears legacy vectors and adds everything
+    service.vector_store.delete_document.assert_called_once_with("doc")
+    first_upserts = service.vector_store.add_embeddings.call_args_list
+    assert sum(len(c.args[0]) for c in first_upserts) == 3
+
+    service.vector_store.add_embeddings.reset_mock()
+    await service.ingest("doc", "intro\n\nleave policy v2\n\nexpenses", filename="p.pdf")
+
+    added = [doc for c in service.vector_store.add_embeddings.call_args_list for doc in c.args[0]]
+    assert [d.page_content for d in added] == ["leave policy v2"]
+    assert added[0].metadata["chunk_id"] == chunk_ids("doc", ["leave policy v2"])[0]
+    service.vector_store.delete_ids.assert_called_once_with(chunk_ids("doc", ["leave policy v1"]))
+    service._process_graph_parallel.assert_awaited_with(["leave policy v2"])
+
+    stats = service.reporter.report_success.call_args.args[3]
+    assert (stats["chunks_new"], stats["chunks_unchanged"], stats["chunks_removed"]) == (1, 2, 1)
+    assert service.vector_store.delete_document.call_count == 1
+
+
+
+@pytest.mark.asyncio
+async def test_insert_at_the_front_touches_only_the_new_chunk(service):
+    await service.ingest("doc", "\n\n".join(f"clause {n}" for n in range(50)), filename="p.pdf")
+    service.vector_store.reset_mock()
+
+    await service.ingest("doc", "\n\n".join(["new preface"] + [f"clause {n}" for n in range(50)]), filename="p.pdf")
+
+    # The 50 shifted chunks are neither re-embedded nor updated one by one
+    assert [name for name, _, _ in service.vector_store.mock_calls] == ["add_embeddings"]
+    [added] = service.vector_store.add_embeddings.call_args.args[0]
+    assert added.page_content == "new preface"
+    assert "chunk_index" not in added.metadata
+
+
+@pytest.mark.asyncio
+async def test_slow_graph_stage_stays_bounded_behind_embedding(service):
+    service.queue_size = 1
+    service.graph_queue_size = 3
+    service.graph_flush_chunks = 1
+    service.embedder.batch_size = 1
+    release = asyncio.Event()
+    queues = []
+    consume_graph = service._consume_graph
+
+    async def _stalled_graph(chunks):
+        await release.wait()
+        return {}
+
+    async def _capture(graph_queue):
+        queues.append(graph_queue)
+        return await consume_graph(graph_queue)
+
+    def _upserted():
+        return sum(len(c.args[0]) for c in service.vector_store.add_embeddings.call_args_list)
+
+    service._process_graph_parallel = _stalled_graph
+    service._consume_graph = _capture
+    task = asyncio.create_task(
+        service.ingest("doc", "\n\n".join(f"chunk {n}" for n in range(20)), filename="p.pdf")
+    )
+
+    # Embedding runs ahead of the stuck graph stage, but only by the queue bound
+    depths = []
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if queues:
+            depths.append(queues[0].qsize())
+    assert max(depths) == 3
+    assert 3 <= _upserted() < 20
+    assert not task.done()
+
+    release.set()
+    await task
+    assert _upserted() == 20
+
+
+@pytest.mark.asyncio
+async def test_pipeline_streams_pages_and_flushes_graph_in_groups(service):
+    service.graph_flush_chunks = 2
+    service.embedder.batch_size = 1
+    pages = (f"page {n}\n\n" for n in range(5))
+
+    await service.ingest_pages("doc", pages, filename="p.pdf")
+
+    groups = [c.args[0] for c in service._process_graph_parallel.await_args_list]
+    assert groups == [["page 0", "page 1"], ["page 2", "page 3"], ["page 4"]]
+
+    stats = service.reporter.report_success.call_args.args[3]
+    assert stats["chunks_total"] == 5
+    assert stats["time_to_first_searchable_seconds"] is not None
+    assert stats["time_to_first_searchable_seconds"] <= stats["wall_seconds"]
+
+
+@pytest.mark.asyncio
+async def test_resync_replaces_the_documents_lexical_segment(service, tmp_path):
+    service.lexical_index = LexicalIndexBuilder(str(tmp_path))
+    reader = LexicalIndexReader(str(tmp_path))
+    reader.RELOAD_INTERVAL_SECONDS = 0
+
+    await service.ingest("doc", "intro\n\nclause 4.2.1 v1\n\nexpenses", filename="p.pdf")
+    await service.ingest("doc", "intro\n\nclause 4.2.1 v2\n\nexpenses", filename="p.pdf")
+
+    # Unchanged chunks are skipped for embedding but stay in the BM25 index
+    assert [doc.page_content for doc, _ in reader.search("intro", 5)] == ["intro"]
+    hits = reader.search("clause 4.2.1", 5)
+    assert [doc.page_content for doc, _ in hits] == ["clause 4.2.1 v2"]
+    assert hits[0][0].metadata == {
+        "doc_id": "doc", "chunk_index": 1, "chunk_id": chunk_ids("doc", ["clause 4.2.1 v2"])[0]
+    }
+
+
+@pytest.mark.asyncio
+async def test_lexical_rebuilds_are_batched_across_jobs(service, tmp_path):
+    service.lexical_index = LexicalIndexBuilder(str(tmp_path), rebuild_interval_seconds=30)
+    reader = LexicalIndexReader(str(tmp_path))
+    reader.RELOAD_INTERVAL_SECONDS = 0
+
+    await service.ingest("a", "clause 4.2.1", filename="a.pdf")
+    await service.ingest("b", "K-900 spec", filename="b.pdf")
+
+    # Committed, not yet merged: one rebuild publishes both documents
+    assert reader.search("clause", 5) == []
+    assert service.lexical_index.rebuild_if_stale() is not None
+    assert len(reader.search("clause 4.2.1 K-900", 5)) == 2
+    assert service.lexical_index.rebuild_if_stale() is None
+
+
+@pytest.mark.asyncio
+async def test_failed_ingest_leaves_the_lexical_index_untouched(service, tmp_path):
+    service.lexical_index = LexicalIndexBuilder(str(tmp_path))
+    service.vector_store.add_embeddings.side_effect = RuntimeError("store down")
+
+    with pytest.raises(RuntimeError, match="store down"):
+        await service.ingest("doc", "intro\n\nexpenses", filename="p.pdf")
+
+    # Left to the job queue: retried, reported once dead-lettered
+    service.reporter.report_failure.assert_not_awaited()
+    assert not (tmp_path / "CURRENT").exists()
+    assert list((tmp_path / "segments").iterdir()) == []
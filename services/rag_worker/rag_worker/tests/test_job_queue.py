@@ -0,0 +1,136 @@
+import pytest
+from fakeredis import aioredis as fake_aioredis
+from shared.config import Config
+from shared.providers.job_queue import JobQueueFactory, RedisListJobQueue, RedisStreamJobQueue
+
+SETTINGS = Config(JOB_QUEUE_MAX_ATTEMPTS=2, JOB_QUEUE_VISIBILITY_TIMEOUT_SECONDS=1)
+
+
+@pytest.fixture
+def redis_client():
+    return fake_aioredis.FakeRedis(decode_responses=True)
+
+
+def test_factory_selects_backend(redis_client):
+    assert isinstance(JobQueueFactory.get_queue(redis_client, SETTINGS), RedisStreamJobQueue)
+    assert isinstance(
+        JobQueueFactory.get_queue(redis_client, Config(JOB_QUEUE_BACKEND="list")), RedisListJobQueue
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_ack_removes_job(redis_client):
+    queue = RedisStreamJobQueue(redis_client, SETTINGS)
+    job_id = await queue.enqueue({"doc_id": "d1", "file_path": "a.pdf"})
+
+    job = await queue.dequeue("w1", timeout=0.1)
+    assert job.id == job_id
+    assert job.payload["doc_id"] == "d1"
+    assert job.attempts == 1
+
+    await queue.ack(job)
+    assert await queue.dequeue("w1", timeout=0.1) is None
+    assert (await redis_client.xpending(queue.stream, queue.GROUP))["pending"] == 0
+    # Deleted, not just acked: the stream does not grow with finished jobs
+    assert await redis_client.xlen(queue.stream) == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_then_dead_letters(redis_client):
+    queue = RedisStreamJobQueue(redis_client, SETTINGS)
+    await queue.enqueue({"doc_id": "d1"})
+
+    first = await queue.dequeue("w1", timeout=0.1)
+    assert await queue.fail(first, "boom") is False
+
+    second = await queue.dequeue("w1", timeout=0.1)
+    assert second.payload == {"doc_id": "d1"}
+    assert second.attempts == 2
+    assert await queue.fail(second, "boom again") is True
+
+    assert await queue.dequeue("w1", timeout=0.1) is None
+    dead = await redis_client.xrange(queue.dead_letter_stream)
+    assert len(dead) == 1
+    assert dead[0][1]["error"] == "boom again"
+    assert await redis_client.xlen(queue.stream) == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_release_keeps_the_attempt(redis_client):
+    queue = RedisStreamJobQueue(redis_client, SETTINGS)
+    await queue.enqueue({"doc_id": "d1"})
+    job = await queue.dequeue("w1", timeout=0.1)
+
+    await queue.release(job)
+
+    # Still pending, immediately reclaimable, and the cancelled delivery is not counted
+    reclaimed = await queue.dequeue("w2", timeout=0.1)
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_backends_use_separate_dead_letter_keys(redis_client):
+    stream = RedisStreamJobQueue(redis_client, SETTINGS)
+    legacy = RedisListJobQueue(redis_client, SETTINGS)
+    assert stream.dead_letter_stream != legacy.dead_letter_key
+
+    for queue in (stream, legacy):
+        await queue.enqueue({"doc_id": "d1"})
+        job = await queue.dequeue("w1", timeout=1)
+        job.attempts = SETTINGS.JOB_QUEUE_MAX_ATTEMPTS
+        assert await queue.fail(job, "boom") is True
+
+
+@pytest.mark.asyncio
+async def test_stream_reclaims_stalled_job(redis_client):
+    queue = RedisStreamJobQueue(redis_client, SETTINGS)
+    queue.visibility_ms = 0  # every pending job counts as stalled
+    await queue.enqueue({"doc_id": "d1"})
+
+    crashed = await queue.dequeue("dead-worker", timeout=0.1)
+    reclaimed = await queue.dequeue("w2", timeout=0.1)
+
+    assert reclaimed.id == crashed.id
+    assert reclaimed.consumer == "w2"
+    assert reclaimed.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_reclaim_resumes_from_the_returned_cursor(redis_client):
+    queue = RedisStreamJobQueue(redis_client, SETTINGS)
+    for doc_id in ("d1", "d2", "d3"):
+        await queue.enqueue({"doc_id": doc_id})
+    stalled = [await queue.dequeue("dead-worker", timeout=0.1) for _ in range(3)]
+    queue.visibility_ms = 0
+
+    starts = []
+    xautoclaim = redis_client.xautoclaim
+
+    async def _xautoclaim(*args, **kwargs):
+        starts.append(kwargs["start_id"])
+        return await xautoclaim(*args, **kwargs)
+
+    redis_client.xautoclaim = _xautoclaim
+    reclaimed = [await queue.dequeue("w2", timeout=0.1) for _ in range(3)]
+
+    assert [job.id for job in reclaimed] == [job.id for job in stalled]
+    assert starts == ["0-0", stalled[1].id, stalled[2].id]
+
+
+@pytest.mark.asyncio
+async def test_list_backend_round_trip(redis_client):
+    queue = RedisListJobQueue(redis_client, SETTINGS)
+    job_id = await queue.enqueue({"doc_id": "d1"})
+
+    job = await queue.dequeue("w1", timeout=1)
+    assert job.id == job_id
+    assert await queue.fail(job, "boom") is False
+
+    retry = await queue.dequeue("w1", timeout=1)
+    assert retry.attempts == 2
+    await queue.release(retry)
+    retry = await queue.dequeue("w1", timeout=1)
+    assert retry.attempts == 2
+    assert await queue.fail(retry, "boom") is True
+    assert await redis_client.llen(queue.dead_letter_key) == 1
@@ -0,0 +1,35 @@
+import pytest
+from pypdf import PdfWriter
+from rag_worker.providers.executors import WorkerExecutors
+from rag_worker.providers.processors import PdfProcessor
+from rag_worker.providers.splitter import RecursiveSplitterStrategy
+from shared.config import Config
+
+
+@pytest.fixture
+def worker_pools():
+    # The processor uses the shared instance: release its spawn pool after the test
+    yield
+    WorkerExecutors.reset()
+
+
+def test_split_stream_matches_whole_document_split():
+    splitter = RecursiveSplitterStrategy(Config(CHUNK_SIZE=200, CHUNK_OVERLAP=0))
+    pages = [f"Clause {n}. " + "policy text " * 30 + "\n\n" for n in range(20)]
+
+    streamed = list(splitter.split_stream(iter(pages), buffer_chars=1000))
+
+    assert "".join(streamed).replace(" ", "") == "".join(splitter.split_text("".join(pages))).replace(" ", "")
+    assert all(len(chunk) <= 200 for chunk in streamed)
+
+
+def test_pdf_pages_stream_through_process_pool(tmp_path, worker_pools):
+    path = tmp_path / "blank.pdf"
+    writer = PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=72, height=72)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    processor = PdfProcessor(Config(PDF_EXTRACTION_WORKERS=2, PDF_PAGES_PER_TASK=2))
+    assert list(processor.iter_pages(str(path))) == [""] * 5
@@ -1,56 +1,171 @@
+import asyncio
 import pytest
-import json
-from unittest.mock import MagicMock, patch
-from rag_worker.worker import main as worker_main
+from unittest.mock import AsyncMock, MagicMock, patch
+from fakeredis import aioredis as fake_aioredis
+from shared.config import Config
+from shared.interfaces import QueuedJob
+from shared.providers.job_queue import RedisStreamJobQueue
+from rag_worker.services.ingestion import IngestionService
+from rag_worker.worker import process_job, run_slot
 
 # --- Mock Data ---
-SAMPLE_JOB = json.dumps({"doc_id": "123", "file_path": "dummy.pdf"})
+SAMPLE_JOB = {"doc_id": "123", "file_path": "dummy.pdf"}
 
 
-@patch("rag_worker.worker.Redis")
-@patch("rag_worker.worker.PdfReader")
-@patch("rag_worker.worker.VectorDatabase")
-@patch("rag_worker.worker.EmbeddingsProvider")
-def test_worker_processing_flow(mock_emb, mock_vdb, mock_pdf, mock_redis):
+@pytest.mark.asyncio
+@patch("rag_worker.worker.ProcessorFactory")
+async def test_process_job_flow(mock_factory):
     """
-    Tests one full cycle: Pop Job -> Read PDF -> Embed -> Upsert
+    Tests one full cycle: Parse job -> Extract text -> Ingest
     """
-    # 1. Mock Redis
-    mock_redis_instance = mock_redis.from_url.return_value
+    pages = iter(["Page 1 text"])
+    mock_factory.get_processor.return_value.iter_pages.return_value = pages
+    ingestion = MagicMock(ingest_pages=AsyncMock())
+    reporter = MagicMock(report_failure=AsyncMock())
 
-    mock_redis_instance.brpop.side_effect = [
-        ("rag_jobs", SAMPLE_JOB),
-        KeyboardInterrupt("Stop Loop"),
+    await process_job(SAMPLE_JOB, ingestion, reporter, slot_id=0)
+
+    ingestion.ingest_pages.assert_awaited_once_with("123", pages, filename="dummy.pdf")
+    reporter.report_failure.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("rag_worker.worker.config")
+@patch("rag_worker.worker.ProcessorFactory")
+async def test_process_job_timeout_raises(mock_factory, mock_config):
+    mock_config.WORKER_JOB_TIMEOUT_SECONDS = 0.05
+
+    async def _slow_ingest(*args, **kwargs):
+        await asyncio.sleep(5)
+
+    ingestion = MagicMock(ingest_pages=_slow_ingest)
+    reporter = MagicMock(report_failure=AsyncMock())
+
+    with pytest.raises(TimeoutError, match="timed out"):
+        await process_job(SAMPLE_JOB, ingestion, reporter, slot_id=0)
+
+
+@pytest.mark.asyncio
+@patch("rag_worker.worker.ProcessorFactory")
+async def test_slots_process_jobs_concurrently_and_drain(mock_factory):
+    """Two slots run two slow jobs side by side, then exit once stop is requested."""
+    jobs = [
+        QueuedJob(id="1-0", payload={"doc_id": "a", "file_path": "a.pdf"}),
+        QueuedJob(id="2-0", payload={"doc_id": "b", "file_path": "b.pdf"}),
     ]
+    queue = MagicMock(ack=AsyncMock(), fail=AsyncMock())
+    queue.dequeue = AsyncMock(side_effect=lambda *a, **k: jobs.pop() if jobs else None)
+
+    stop_event = asyncio.Event()
+    running = 0
+    peak = 0
+
+    async def _ingest(doc_id, pages, filename):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        if not jobs:
+            stop_event.set()
+
+    ingestion = MagicMock(ingest_pages=_ingest)
+    reporter = MagicMock(report_failure=AsyncMock())
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            *(run_slot(i, queue, ingestion, reporter, stop_event) for i in range(2))
+        ),
+        timeout=2,
+    )
+
+    assert peak == 2
+    assert queue.ack.await_count == 2
+    queue.fail.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("rag_worker.worker.ProcessorFactory")
+async def test_slot_reports_dead_lettered_jobs(mock_factory):
+    mock_factory.get_processor.return_value.iter_pages.side_effect = RuntimeError("corrupt file")
+    jobs = [QueuedJob(id="1-0", payload=SAMPLE_JOB, attempts=3)]
+    stop_event = asyncio.Event()
+
+    async def _dequeue(*args, **kwargs):
+        if jobs:
+            return jobs.pop()
+        stop_event.set()
+
+    queue = MagicMock(ack=AsyncMock(), fail=AsyncMock(return_value=True), dequeue=_dequeue)
+    reporter = MagicMock(report_failure=AsyncMock())
+
+    await run_slot(0, queue, MagicMock(), reporter, stop_event)
+
+    queue.ack.assert_not_awaited()
+    queue.fail.assert_awaited_once()
+    reporter.report_failure.assert_awaited_once_with("123", "dummy.pdf", "corrupt file")
+
+
+class _FailingEmbeddings:
+    def embed_documents(self, texts):
+        raise RuntimeError("embedding backend down")
+
+
+@pytest.mark.asyncio
+@patch("rag_worker.worker.ProcessorFactory")
+async def test_ingestion_failure_is_retried_then_dead_lettered(mock_factory):
+    mock_factory.get_processor.return_value.iter_pages.side_effect = lambda path: iter(["Leave policy text"])
+    redis_client = fake_aioredis.FakeRedis(decode_responses=True)
+    queue = RedisStreamJobQueue(redis_client, Config(JOB_QUEUE_MAX_ATTEMPTS=2))
+    await queue.enqueue(SAMPLE_JOB)
+    queue.fail = AsyncMock(wraps=queue.fail)
+
+    reporter = MagicMock(report_success=AsyncMock(), report_failure=AsyncMock())
+    with patch("rag_worker.services.ingestion.AsyncNeo4jClient"):
+        service = IngestionService(MagicMock(), reporter, MagicMock(), _FailingEmbeddings())
+    service._process_graph_parallel = AsyncMock(return_value={})
+
+    stop_event = asyncio.Event()
+    dequeue = queue.dequeue
+
+    async def _dequeue(*args, **kwargs):
+        job = await dequeue(*args, **kwargs)
+        if job is None:
+            stop_event.set()
+        return job
 
-    # 2. Mock PDF Reading
-    # We mock the pages to return "Page 1 text" when extract_text() is called
-    mock_page = MagicMock()
-    mock_page.extract_text.return_value = "Page 1 text"
-    mock_pdf.return_value.pages = [mock_page]
+    queue.dequeue = _dequeue
+    await asyncio.wait_for(run_slot(0, queue, service, reporter, stop_event), timeout=5)
 
-    # 3. Mock Vector Store
-    mock_store = mock_vdb.return_value.get_store.return_value
+    # First failure re-queued, second one dead-lettered and reported
+    assert [c.args[0].attempts for c in queue.fail.await_args_list] == [1, 2]
+    reporter.report_success.assert_not_awaited()
+    reporter.report_failure.assert_awaited_once_with("123", "dummy.pdf", "embedding backend down")
+    assert len(await redis_client.xrange(queue.dead_letter_stream)) == 1
 
-    # 4. Run Worker
-    # We expect the KeyboardInterrupt to bubble up and stop the function
-    try:
-        worker_main()
-    except KeyboardInterrupt:
-        pass  # Expected behavior to exit the test cleanly
 
-    # 5. Verifications
+@pytest.mark.asyncio
+@patch("rag_worker.worker.ProcessorFactory")
+async def test_shutdown_releases_the_job_instead_of_failing_it(mock_factory):
+    started = asyncio.Event()
 
-    # Did it try to read the PDF?
-    mock_pdf.assert_called_with("dummy.pdf")
+    async def _ingest(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(5)
 
-    # Did it add documents to Pinecone/VectorStore?
-    mock_store.add_documents.assert_called_once()
+    jobs = [QueuedJob(id="1-0", payload=SAMPLE_JOB)]
+    queue = MagicMock(ack=AsyncMock(), fail=AsyncMock(), release=AsyncMock())
+    queue.dequeue = AsyncMock(side_effect=lambda *a, **k: jobs.pop() if jobs else None)
+    reporter = MagicMock(report_failure=AsyncMock())
 
-    # Verify the document content passed to vector store
-    # call_args[0][0] gets the first positional argument (the list of documents)
-    added_docs = mock_store.add_documents.call_args[0][0]
+    slot = asyncio.create_task(
+        run_slot(0, queue, MagicMock(ingest_pages=_ingest), reporter, asyncio.Event())
+    )
+    await asyncio.wait_for(started.wait(), timeout=1)
+    slot.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await slot
 
-    assert len(added_docs) == 1
-    assert added_docs[0].page_content == "Page 1 text"
-    assert added_docs[0].metadata["doc_id"] == "123"
+    queue.release.assert_awaited_once()
+    queue.fail.assert_not_awaited()
+    reporter.report_failure.assert_not_awaited()
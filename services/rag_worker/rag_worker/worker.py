@@ -1,7 +1,9 @@
-import json
-import time
+import signal
+import socket
+import asyncio
 import logging
 import os
+from typing import Any, Dict
 
 # Shared Providers
 from shared.config import config, setup_logging
@@ -9,18 +11,150 @@ from shared.providers.embeddings import EmbeddingFactory
 from shared.providers.vector_database import VectorDBFactory
 from shared.providers.redis import RedisFactory
 from shared.providers.llm import LLMFactory
+from shared.providers.neo4j_client import AsyncNeo4jClient
+from shared.providers.lexical_index import LexicalIndexBuilder
+from shared.providers.job_queue import JobQueueFactory
+from shared.interfaces import JobQueue, QueuedJob
 
+from rag_worker.interfaces import JobStatusReporter
 from rag_worker.providers.processors import ProcessorFactory
+from rag_worker.providers.extraction_cache import ExtractionCacheFactory
+from rag_worker.providers.executors import WorkerExecutors
 from rag_worker.services.ingestion import IngestionService
-from rag_worker.services.reporting import RedisJobStatusReporter
+from rag_worker.services.reporting import RedisGraphEventPublisher, RedisJobStatusReporter
+from rag_worker.services.manifest import RedisChunkManifest
 
 setup_logging()
 logger = logging.getLogger("RAG-Worker.Worker")
 
+
+async def process_job(
+    job: Dict[str, Any],
+    ingestion_service: IngestionService,
+    status_reporter: JobStatusReporter,
+    slot_id: int,
+):
+    """
+    Runs one job end to end (extract -> ingest) under the per-job timeout.
+    Raises on timeout so the queue can retry the job.
+    """
+    doc_id = job.get("doc_id")
+    file_path = job.get("file_path")
+    filename = os.path.basename(file_path) if file_path else "Unknown"
+
+    logger.info(f"[slot {slot_id}] Processing: {doc_id} ({file_path})")
+
+    processor = ProcessorFactory.get_processor(file_path)
+    if not processor:
+        logger.error(f"Unsupported file format: {file_path}")
+        await status_reporter.report_failure(doc_id, filename, "Unsupported file format.")
+        return
+
+    timeout = config.WORKER_JOB_TIMEOUT_SECONDS or None
+    try:
+        # Pages are parsed lazily (off the loop) while the splitter consumes them
+        await asyncio.wait_for(
+            ingestion_service.ingest_pages(doc_id, processor.iter_pages(file_path), filename=filename),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Job timed out after {timeout}s.")
+    logger.info(f"[slot {slot_id}] Completed processing for: {doc_id}")
+
+
+async def _heartbeat(queue: JobQueue, job: QueuedJob):
+    """Keeps a long-running job from being reclaimed by another worker."""
+    interval = max(1.0, config.JOB_QUEUE_VISIBILITY_TIMEOUT_SECONDS / 3)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await queue.touch(job)
+        except Exception as e:
+            logger.warning(f"Heartbeat failed for job {job.id}: {e}")
+
+
+async def _lexical_rebuild_loop(lexical_index: LexicalIndexBuilder):
+    """Merges the segments published since the last build, once per rebuild interval."""
+    executors = WorkerExecutors.get_instance()
+    while True:
+        await asyncio.sleep(lexical_index.rebuild_interval_seconds)
+        try:
+            await executors.run(executors.io, lexical_index.rebuild_if_stale)
+        except Exception as e:
+            logger.error(f"Lexical index rebuild failed: {e}")
+
+
+async def _handle_failure(queue: JobQueue, job: QueuedJob, status_reporter: JobStatusReporter, error: str):
+    dead = await queue.fail(job, error)
+    if dead:
+        file_path = job.payload.get("file_path")
+        filename = os.path.basename(file_path) if file_path else "Unknown"
+        await status_reporter.report_failure(job.payload.get("doc_id"), filename, error)
+    else:
+        logger.warning(f"Job {job.id} failed (attempt {job.attempts}), re-queued: {error}")
+
+
+async def run_slot(
+    slot_id: int,
+    queue: JobQueue,
+    ingestion_service: IngestionService,
+    status_reporter: JobStatusReporter,
+    stop_event: asyncio.Event,
+):
+    """
+    One job slot: takes and processes jobs until a stop is requested.
+    The current job always runs to completion (or timeout) before exiting.
+    """
+    consumer = f"{socket.gethostname()}-{os.getpid()}-{slot_id}"
+    while not stop_event.is_set():
+        try:
+            job = await queue.dequeue(consumer, timeout=1)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[slot {slot_id}] Failed to read from the job queue: {e}")
+            await asyncio.sleep(1)
+            continue
+        if job is None:
+            continue
+
+        heartbeat = asyncio.create_task(_heartbeat(queue, job))
+        try:
+            await process_job(job.payload, ingestion_service, status_reporter, slot_id)
+            await queue.ack(job)
+        except asyncio.CancelledError:
+            # Not a failure: hand the job back without using up one of its attempts
+            logger.warning(f"[slot {slot_id}] Job {job.id} cancelled (worker shutdown), released for another worker")
+            heartbeat.cancel()
+            await asyncio.shield(queue.release(job))
+            raise
+        except Exception as e:
+            logger.error(f"[slot {slot_id}] Job {job.id} failed: {e}")
+            try:
+                await _handle_failure(queue, job, status_reporter, str(e))
+            except Exception as queue_error:
+                logger.error(f"[slot {slot_id}] Could not record failure for job {job.id}: {queue_error}")
+        finally:
+            heartbeat.cancel()
+
+
+def _install_signal_handlers(stop_event: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: fall back to KeyboardInterrupt handling in the CLI
+            pass
+
+
 async def main():
     logger.info("Starting RAG Worker...")
 
-    redis_client = RedisFactory.get_client(config)
+    slots = max(1, config.WORKER_CONCURRENCY)
+    # Each slot holds a pooled connection while blocked on the queue
+    redis_client = RedisFactory.get_client(config, max_connections=slots + 10)
+    queue = JobQueueFactory.get_queue(redis_client, config)
 
     # Initialize Providers
     logger.info("Loading Embeddings...")
@@ -29,39 +163,69 @@ async def main():
 
     llm = LLMFactory.get_llm(config)
 
-    # Initialize Ingestion Service
+    # Initialize Ingestion Service (shared by all slots, so its LLM limits are global)
     status_reporter = RedisJobStatusReporter(redis_client)
-    ingestion_service = IngestionService(vector_store, status_reporter, llm)
+    extraction_cache = ExtractionCacheFactory.get_cache(config, redis_client)
+    manifest = RedisChunkManifest(redis_client) if config.INCREMENTAL_INGESTION else None
+    lexical_index = (
+        LexicalIndexBuilder(config.LEXICAL_INDEX_DIR, config.LEXICAL_INDEX_REBUILD_INTERVAL_SECONDS)
+        if config.LEXICAL_INDEX_ENABLED
+        else None
+    )
+    if lexical_index is None and config.RETRIEVAL_STRATEGY.lower() == "hybrid":
+        logger.error("RETRIEVAL_STRATEGY is 'hybrid' but LEXICAL_INDEX_ENABLED is false: no BM25 index will be built")
+    ingestion_service = IngestionService(
+        vector_store,
+        status_reporter,
+        llm,
+        embeddings,
+        extraction_cache,
+        manifest,
+        graph_events=RedisGraphEventPublisher(redis_client),
+        lexical_index=lexical_index,
+    )
+
+    # Entity index + degree backfill used by the RAG Service's bounded graph queries
+    await AsyncNeo4jClient.get_instance(config).setup_indexes()
+
+    stop_event = asyncio.Event()
+    _install_signal_handlers(stop_event)
 
-    logger.info("Waiting for jobs...")
+    logger.info(
+        f"Waiting for jobs ({config.JOB_QUEUE_BACKEND} queue) with {slots} concurrent slot(s)..."
+    )
+    tasks = [
+        asyncio.create_task(
+            run_slot(i, queue, ingestion_service, status_reporter, stop_event)
+        )
+        for i in range(slots)
+    ]
+    background = []
+    if lexical_index is not None and lexical_index.rebuild_interval_seconds > 0:
+        background.append(asyncio.create_task(_lexical_rebuild_loop(lexical_index)))
 
     try:
-        while True:
-            result = await redis_client.brpop(["rag_jobs"], timeout=1) # type: ignore
-            if result:
-                _, job_data_str = result  # type: ignore
-                job = json.loads(job_data_str)
-                doc_id = job.get("doc_id")
-                file_path = job.get("file_path")
-
-                logger.info(f"Processing: {doc_id} ({file_path})")
-
-                processor = ProcessorFactory.get_processor(file_path)
-                if not processor:
-                    logger.error(f"Unsupported file format: {file_path}")
-                    # Ideally, report failure here too, but skipping for now to match flow
-                    continue
-
-                raw_text = processor.process(file_path) or ""
-                logger.info(f"Extracted {len(raw_text)} characters from {doc_id}")
-
-                filename = os.path.basename(file_path) if file_path else "Unknown"
-                await ingestion_service.ingest(doc_id, raw_text, filename=filename)
-                
-                logger.info(f"Completed processing for: {doc_id}")
-    except Exception as e:
-        logger.error(f"Worker Loop encountered an error: {e}")
-        time.sleep(1) 
+        await stop_event.wait()
+        logger.info(
+            f"Shutdown requested. Draining in-flight jobs (up to {config.WORKER_DRAIN_TIMEOUT_SECONDS}s)..."
+        )
+        _, pending = await asyncio.wait(tasks, timeout=config.WORKER_DRAIN_TIMEOUT_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in background:
+            task.cancel()
+        if lexical_index is not None:
+            # Publish what the drained jobs committed
+            executors = WorkerExecutors.get_instance()
+            try:
+                await executors.run(executors.io, lexical_index.rebuild_if_stale)
+            except Exception as e:
+                logger.error(f"Final lexical index rebuild failed: {e}")
     finally:
+        for task in tasks + background:
+            task.cancel()
+        WorkerExecutors.get_instance().shutdown()
+        await AsyncNeo4jClient.close_instance()
         logger.info("Closing Redis connection...")
-        await RedisFactory.close()
\ No newline at end of file
+        await RedisFactory.close()
@@ -17,33 +17,97 @@ class Config(BaseSettings):
 
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Ingestion job queue. Options: "stream" (acked, retried, dead-lettered), "list" (legacy LPUSH/BRPOP)
+    JOB_QUEUE_BACKEND: str = "stream"
+    JOB_QUEUE_NAME: str = "rag_jobs"
+    # Unacked stream jobs idle this long are reclaimed by another worker
+    JOB_QUEUE_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    # Deliveries before a job is moved to the dead-letter queue
+    JOB_QUEUE_MAX_ATTEMPTS: int = 3
+
     CHAT_SERVICE_HOST: str = "localhost"
     CHAT_SERVICE_PORT: int = 50051
+    # 0 = unlimited concurrent conversations (bounded only by memory)
+    CHAT_MAX_CONCURRENT_RPCS: int = 0
 
     RAG_SERVICE_HOST: str = "localhost"
     RAG_SERVICE_PORT: int = 50052
 
     LLM_SERVICE_HOST: str = "localhost"
     LLM_SERVICE_PORT: int = 50053
+    # Max concurrent generations per LLM Service process (extra requests wait)
+    LLM_MAX_IN_FLIGHT: int = 64
     
     API_GATEWAY_HOST: str = "0.0.0.0"
     API_GATEWAY_PORT: int = 8000
 
+    # Optional replica lists ("host:port") load-balanced round-robin by the gateway.
+    # When empty, the single HOST/PORT pair above is used.
+    CHAT_SERVICE_ADDRESSES: List[str] = []
+    RAG_SERVICE_ADDRESSES: List[str] = []
+
+    # Long-lived gRPC channel tuning
+    GRPC_KEEPALIVE_TIME_MS: int = 30000
+    GRPC_KEEPALIVE_TIMEOUT_MS: int = 10000
+    GRPC_CHANNEL_READY_TIMEOUT: float = 5.0
+
     EMBEDDING_PROVIDER: str = "local"
     EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
     RAG_TOP_K: int = 5
+    # Drop vector hits below this relevance (0-1, provider-normalized; 0 disables)
+    RAG_MIN_SCORE: float = 0.0
+    # Adaptive k: also drop hits scoring below this fraction of the best hit (0 disables)
+    RAG_ADAPTIVE_K_RATIO: float = 0.0
+
+    # Query-embedding cache (in-process LRU size; 0 disables the LRU tier)
+    EMBEDDING_CACHE_SIZE: int = 4096
+    # Shared Redis tier (float32 bytes) so all replicas reuse query embeddings
+    EMBEDDING_CACHE_REDIS: bool = False
+    EMBEDDING_CACHE_TTL_SECONDS: int = 604800
+
+    # Semantic answer cache in front of the Chat pipeline (needs the chat_service
+    # "semantic-cache" extra; the Docker image installs it with SEMANTIC_CACHE=true)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    # Min cosine similarity between queries to reuse a cached answer
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL_SECONDS: int = 3600
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 5000
 
     # Retrieval Strategy Configuration
-    # Options: "ensemble", "dense", "mmr"
+    # Options: "ensemble", "dense", "mmr", "hybrid"
     RETRIEVAL_STRATEGY: str = "ensemble"
     # New: Weights for Ensemble [Dense, MMR]
     RETRIEVAL_WEIGHTS: List[float] = [0.6, 0.4]
+    # Weights for Hybrid [Dense, BM25]
+    HYBRID_WEIGHTS: List[float] = [0.5, 0.5]
+
+    # Query entity extraction for graph retrieval. Options: "dictionary" (in-memory
+    # node-id matcher, LLM fallback when nothing matches), "llm"
+    GRAPH_ENTITY_EXTRACTOR: str = "dictionary"
+    # Cached graph neighborhoods/paths per resolved entity set (0 disables). Entries are
+    # keyed on the graph version the worker bumps on every write; the TTL bounds staleness
+    # if an update notification is missed.
+    GRAPH_CONTEXT_CACHE_SIZE: int = 1024
+    GRAPH_CONTEXT_CACHE_TTL_SECONDS: int = 600
+    # Graph path search budgets: max hops between two entities, paths per entity pair,
+    # neighbors expanded per hop, relationship count above which a node is a hub and
+    # is not expanded through, and the per-query timeout. Results that hit a budget
+    # are flagged as truncated.
+    GRAPH_PATH_MAX_HOPS: int = 4
+    GRAPH_MAX_PATHS: int = 5
+    GRAPH_NEIGHBOR_LIMIT: int = 25
+    GRAPH_HUB_DEGREE: int = 200
+    GRAPH_QUERY_TIMEOUT_SECONDS: float = 2.0
+    # Max prompt tokens for the rendered graph context (0 = unlimited)
+    GRAPH_CONTEXT_TOKEN_BUDGET: int = 600
 
     # Options: "openai" or "local" (for LM Studio/Ollama)
     LLM_PROVIDER: str = "local"
     LLM_MODEL: str = "mistral-7b-instruct-v0.3"
     LLM_BASE_URL: str = "http://localhost:1234/v1"
     LLM_TEMPERATURE: float = 0.0
+    # Compiled chains kept per (strategy, system prompt); 0 disables caching
+    LLM_CHAIN_CACHE_SIZE: int = 128
 
     VECTOR_DB_PROVIDER: str = "pinecone"
     PINECONE_API_KEY: str = ""
@@ -52,6 +116,10 @@ class Config(BaseSettings):
     NEO4J_URI: str = "bolt://localhost:7687"
     NEO4J_USERNAME: str = "neo4j"
     NEO4J_PASSWORD: str = "password"
+    # Async driver pool: max connections, seconds to wait for a free one, records per fetch
+    NEO4J_MAX_POOL_SIZE: int = 100
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT_SECONDS: float = 5.0
+    NEO4J_FETCH_SIZE: int = 1000
 
     STT_PROVIDER: str = "local"  # "local" or "openai"
     STT_MODEL_SIZE: str = "small"
@@ -60,8 +128,50 @@ class Config(BaseSettings):
 
     RELOAD: bool = True if ENV == "development" else False
     UPLOAD_DIR: str = "./data/uploads"
+    # BM25 index over chunk text: built by the worker at ingest, memory-mapped by the
+    # RAG Service (the "hybrid" retrieval strategy refuses to start without it; shared volume)
+    LEXICAL_INDEX_ENABLED: bool = False
+    LEXICAL_INDEX_DIR: str = "./data/lexical_index"
+    # Worker merges newly ingested segments at most this often (0 = a full rebuild per job)
+    LEXICAL_INDEX_REBUILD_INTERVAL_SECONDS: float = 30.0
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
+    # PDF extraction processes; page ranges fan out over this pool (0 = parse in a worker thread)
+    PDF_EXTRACTION_WORKERS: int = 2
+    PDF_PAGES_PER_TASK: int = 25
+    # Chunks buffered between ingestion pipeline stages (backpressure bound)
+    INGEST_QUEUE_SIZE: int = 256
+    # New chunks buffered for graph extraction: how far embedding may run ahead of the
+    # (slower) LLM stage before it waits for it
+    GRAPH_QUEUE_SIZE: int = 1024
+    # New chunks per graph extraction/write flush during ingestion
+    GRAPH_FLUSH_CHUNKS: int = 40
+    # Re-syncs only embed new chunks and delete removed ones (per-document chunk manifest)
+    INCREMENTAL_INGESTION: bool = True
+
+    # Worker embedding stage: chunks per embed call, and batches embedded concurrently
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_WORKERS: int = 2
+
+    # Graph extraction: chunks packed per LLM call (1 = one call per chunk),
+    # max estimated chunk tokens per call, and concurrent LLM calls per worker
+    GRAPH_EXTRACTION_BATCH_SIZE: int = 4
+    GRAPH_EXTRACTION_TOKEN_BUDGET: int = 3000
+    GRAPH_EXTRACTION_CONCURRENCY: int = 5
+    # Extraction result cache. Options: "redis", "disk", "none"
+    GRAPH_EXTRACTION_CACHE: str = "redis"
+    GRAPH_EXTRACTION_CACHE_DIR: str = "./data/extraction_cache"
+    GRAPH_EXTRACTION_CACHE_TTL_SECONDS: int = 2592000
+
+    # Worker job slots (documents processed concurrently)
+    WORKER_CONCURRENCY: int = 2
+    # Per-job timeout; 0 disables it
+    WORKER_JOB_TIMEOUT_SECONDS: int = 3600
+    # Grace period for in-flight jobs on SIGTERM before they are cancelled
+    WORKER_DRAIN_TIMEOUT_SECONDS: int = 60
+    # Threads driving parse+split (0 = one per job slot) and blocking store/DB calls
+    WORKER_PARSE_THREADS: int = 0
+    WORKER_IO_THREADS: int = 4
 
 
 def setup_logging():
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Any, List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import UploadFile
 from shared.config import Config
 class LLMStrategy(ABC):
@@ -27,6 +28,52 @@ class RedisStrategy(ABC):
         """
         pass
     
+@dataclass
+class QueuedJob:
+    """A job handed to a worker by a JobQueue."""
+    id: str
+    payload: Dict[str, Any]
+    # Deliveries so far, including this one
+    attempts: int = 1
+    consumer: str = ""
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+class JobQueue(ABC):
+    """
+    Work queue between the RAG Service (producer) and RAG Workers (consumers).
+    Backends differ in delivery guarantees; workers must ack or fail every job they receive.
+    """
+    @abstractmethod
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        """Adds a job and returns its id."""
+        pass
+
+    @abstractmethod
+    async def dequeue(self, consumer: str, timeout: float) -> Optional[QueuedJob]:
+        """Blocks up to `timeout` seconds for the next job (None if there is none)."""
+        pass
+
+    @abstractmethod
+    async def ack(self, job: QueuedJob):
+        """Marks the job as done."""
+        pass
+
+    @abstractmethod
+    async def fail(self, job: QueuedJob, error: str) -> bool:
+        """
+        Schedules a retry, or dead-letters the job once it is out of attempts.
+        Returns True if the job was dead-lettered.
+        """
+        pass
+
+    async def touch(self, job: QueuedJob):
+        """Extends the job's visibility timeout (heartbeat for long jobs)."""
+        pass
+
+    async def release(self, job: QueuedJob):
+        """Hands an unfinished job back (worker shutdown) without using up an attempt."""
+        pass
+
 class EmbeddingStrategy(ABC):
     @abstractmethod
     def create_embedding_model(self, settings: Config) -> Any:
@@ -44,6 +91,14 @@ class VectorDBStrategy(ABC):
         """
         pass
 
+@dataclass
+class ScoredCandidate:
+    """A vector search hit with its stored vector (for re-ranking in-process)."""
+    document: Any
+    # Relevance in [0, 1], higher is more relevant
+    score: float
+    vector: List[float]
+
 class VectorStoreManager(ABC):
     """
     Interface for Vector Stores that support CRUD operations.
@@ -55,6 +110,14 @@ class VectorStoreManager(ABC):
         """Adds a list of Document objects to the store."""
         pass
 
+    @abstractmethod
+    def add_embeddings(self, documents: List[Any], embeddings: List[List[float]], ids: Optional[List[str]] = None):
+        """
+        Upserts documents whose vectors were computed by the caller
+        (lets ingestion control embedding batching/concurrency).
+        """
+        pass
+
     @abstractmethod
     def delete_document(self, doc_id: str) -> bool:
         """
@@ -63,11 +126,41 @@ class VectorStoreManager(ABC):
         """
         pass
 
+    @abstractmethod
+    def delete_ids(self, ids: List[str]) -> bool:
+        """
+        Deletes vectors by id (used by incremental ingestion to drop removed chunks).
+        Returns True if successful, False otherwise.
+        """
+        pass
+
     @abstractmethod
     def similarity_search(self, query: str, k: int) -> List[Any]:
         """Performs a similarity search."""
         pass
 
+    @abstractmethod
+    def similarity_search_with_scores(self, query: str, k: int) -> List[Tuple[Any, float]]:
+        """
+        Similarity search returning (Document, relevance) pairs, best first.
+        Relevance is normalized to [0, 1] (higher is more relevant) whatever the
+        provider's native distance, so thresholds work across providers.
+        """
+        pass
+
+    @abstractmethod
+    def embed_query(self, query: str) -> List[float]:
+        """Embeds a query with the store's embedding model."""
+        pass
+
+    @abstractmethod
+    def fetch_candidates(self, embedding: List[float], fetch_k: int) -> List[ScoredCandidate]:
+        """
+        Single round trip for the `fetch_k` nearest neighbours of `embedding`,
+        with their vectors, best first. Strategies re-rank these locally (MMR, fusion).
+        """
+        pass
+
     @abstractmethod
     def as_langchain_retriever(self, search_type: str, search_kwargs: dict) -> Any:
         """
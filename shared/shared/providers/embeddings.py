@@ -1,9 +1,16 @@
-from typing import Any, Dict, Type
+import hashlib
+import logging
+from array import array
+from typing import Any, Dict, List, Optional, Type
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 from langchain_huggingface import HuggingFaceEmbeddings
+from shared.cache import LRUCache
 from shared.config import Config, config as global_config
 from shared.interfaces import EmbeddingStrategy
 
+logger = logging.getLogger("Shared.Providers.Embeddings")
+
 _EMBEDDING_REGISTRY: Dict[str, Type[EmbeddingStrategy]] = {}
 
 def register_embedding_strategy(name: str):
@@ -27,18 +34,115 @@ class LocalEmbeddingStrategy(EmbeddingStrategy):
             model_name=settings.EMBEDDING_MODEL_NAME
         )
 
+class CachedEmbeddings(Embeddings):
+    """
+    Transparent query-embedding cache around any LangChain Embeddings model.
+    Tier 1: in-process LRU. Tier 2 (optional): Redis, vectors stored as float32 bytes
+    so every service replica shares the work.
+    Document embedding is passed straight through (ingestion has its own batching).
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        namespace: str,
+        lru_size: int,
+        redis_client: Optional[Any] = None,
+        ttl_seconds: Optional[int] = None,
+    ):
+        """
+        :param underlying: The real embedding model.
+        :param namespace: Key prefix; must change whenever the model changes.
+        :param redis_client: Optional *sync* Redis client (decode_responses=False).
+        """
+        self.underlying = underlying
+        self.namespace = namespace
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self._lru = LRUCache(maxsize=lru_size)
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+
+        cached = self._lru.get(key)
+        if cached is not None:
+            return list(cached)
+
+        vector = self._redis_get(key)
+        if vector is None:
+            vector = self.underlying.embed_query(text)
+            self._redis_set(key, vector)
+
+        self._lru.put(key, tuple(vector))
+        return list(vector)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    def cache_info(self) -> Dict[str, Any]:
+        return self._lru.stats()
+
+    def _redis_get(self, key: str) -> Optional[List[float]]:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed (Redis): {e}")
+            return None
+        if not raw:
+            return None
+        vector = array("f")
+        vector.frombytes(raw)
+        return vector.tolist()
+
+    def _redis_set(self, key: str, vector: List[float]):
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(key, array("f", vector).tobytes(), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed (Redis): {e}")
+
+def _model_id(model: Any) -> str:
+    """Name of the model that actually embeds (OpenAI ignores EMBEDDING_MODEL_NAME)."""
+    return getattr(model, "model", None) or getattr(model, "model_name", None) or type(model).__name__
+
 class EmbeddingFactory:
     """
     Factory to retrieve Embedding strategies.
     Decoupled from concrete implementations via the _EMBEDDING_REGISTRY.
+    Models are wrapped in CachedEmbeddings unless caching is disabled.
     """
     @staticmethod
     def get_embeddings(settings: Config = global_config) -> Any:
         provider = settings.EMBEDDING_PROVIDER.lower()
-        
+
         strategy_cls = _EMBEDDING_REGISTRY.get(provider)
         if not strategy_cls:
             raise ValueError(f"Unknown Embedding Provider: {provider}. Available: {list(_EMBEDDING_REGISTRY.keys())}")
-        
+
         strategy = strategy_cls()
-        return strategy.create_embedding_model(settings)
\ No newline at end of file
+        model = strategy.create_embedding_model(settings)
+
+        if settings.EMBEDDING_CACHE_SIZE <= 0 and not settings.EMBEDDING_CACHE_REDIS:
+            return model
+
+        redis_client = None
+        if settings.EMBEDDING_CACHE_REDIS:
+            # Sync client with raw bytes: embed_query is called from worker threads
+            import redis
+
+            redis_client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=1)
+
+        return CachedEmbeddings(
+            model,
+            namespace=f"emb:{provider}:{_model_id(model)}",
+            lru_size=settings.EMBEDDING_CACHE_SIZE,
+            redis_client=redis_client,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+        )
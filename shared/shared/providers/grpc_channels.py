@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Callable, List, Sequence, Tuple
+
+import grpc
+
+from shared.config import Config
+
+logger = logging.getLogger("Shared.Providers.GrpcChannels")
+
+
+def resolve_target(host: str, port: int) -> str:
+    """
+    Builds a dialable target, mapping the bind-all address to localhost
+    (fixes Docker networking issues when a service is configured with 0.0.0.0).
+    """
+    if host == "0.0.0.0":
+        host = "localhost"
+    return f"{host}:{port}"
+
+
+def build_channel_options(settings: Config) -> List[Tuple[str, Any]]:
+    """
+    Keepalive + load-balancing options shared by every long-lived channel.
+    Keepalive pings keep idle HTTP/2 connections warm through NATs/proxies
+    and detect dead peers before a request is sent on them.
+    """
+    return [
+        ("grpc.keepalive_time_ms", settings.GRPC_KEEPALIVE_TIME_MS),
+        ("grpc.keepalive_timeout_ms", settings.GRPC_KEEPALIVE_TIMEOUT_MS),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        # Spreads calls over every address a DNS name resolves to
+        ("grpc.lb_policy_name", "round_robin"),
+    ]
+
+
+class GrpcChannelPool:
+    """
+    Long-lived grpc.aio channels to one backend service.
+    Holds one channel (and one cached stub) per configured address and hands
+    the stubs out round-robin, so callers never pay connection setup per call.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        targets: Sequence[str],
+        stub_factory: Callable[[grpc.aio.Channel], Any],
+        options: List[Tuple[str, Any]],
+    ):
+        if not targets:
+            raise ValueError(f"No targets configured for channel pool '{name}'")
+
+        self.name = name
+        self.targets = list(targets)
+        self.channels = [
+            grpc.aio.insecure_channel(target, options=options)
+            for target in self.targets
+        ]
+        self._stubs = [stub_factory(channel) for channel in self.channels]
+        self._cycle = itertools.cycle(range(len(self._stubs)))
+
+        logger.info(f"Channel pool '{name}' created for targets: {self.targets}")
+
+    def get_stub(self) -> Any:
+        """Returns the stub of the next channel in round-robin order."""
+        return self._stubs[next(self._cycle)]
+
+    async def wait_ready(self, timeout: float):
+        """
+        Eagerly connects every channel so the first request doesn't pay the
+        TCP + HTTP/2 handshake. A backend that is down is logged, not fatal:
+        the channel keeps reconnecting in the background.
+        """
+
+        async def _wait(target: str, channel: grpc.aio.Channel):
+            try:
+                await asyncio.wait_for(channel.channel_ready(), timeout=timeout)
+                logger.info(f"Channel '{self.name}' ready: {target}")
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Channel '{self.name}' not ready after {timeout}s: {target}"
+                )
+
+        await asyncio.gather(
+            *(_wait(t, c) for t, c in zip(self.targets, self.channels))
+        )
+
+    async def close(self):
+        await asyncio.gather(
+            *(channel.close() for channel in self.channels), return_exceptions=True
+        )
+        logger.info(f"Channel pool '{self.name}' closed.")
@@ -0,0 +1,261 @@
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, Optional, Type
+
+from redis.exceptions import ResponseError
+from shared.config import Config, config as global_config
+from shared.interfaces import JobQueue, QueuedJob
+
+logger = logging.getLogger("Shared.Providers.JobQueue")
+
+# Dead-lettered jobs kept for inspection (approximate trim)
+DEAD_LETTER_MAXLEN = 10000
+
+_JOB_QUEUE_REGISTRY: Dict[str, Type[JobQueue]] = {}
+
+
+def register_job_queue(name: str):
+    """Decorator to register a JobQueue backend."""
+    def decorator(cls):
+        _JOB_QUEUE_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+@register_job_queue("list")
+class RedisListJobQueue(JobQueue):
+    """
+    Legacy LPUSH/BRPOP queue. A job popped by a worker that then crashes is lost;
+    explicit failures are re-queued until JOB_QUEUE_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, redis_client, settings: Config):
+        self.redis = redis_client
+        self.key = settings.JOB_QUEUE_NAME
+        # Own key per backend: the stream backend's dead letters are a stream, not a list
+        self.dead_letter_key = f"{settings.JOB_QUEUE_NAME}:dead"
+        self.max_attempts = max(1, settings.JOB_QUEUE_MAX_ATTEMPTS)
+
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        job_id = payload.get("job_id") or f"job_{uuid.uuid4().hex}"
+        await self.redis.lpush(self.key, json.dumps({**payload, "job_id": job_id}))
+        return job_id
+
+    async def dequeue(self, consumer: str, timeout: float) -> Optional[QueuedJob]:
+        result = await self.redis.brpop([self.key], timeout=max(1, int(timeout)))
+        if not result:
+            return None
+        _, raw = result
+        payload = json.loads(raw)
+        attempts = int(payload.pop("attempts", 0)) + 1
+        return QueuedJob(
+            id=payload.get("job_id", ""), payload=payload, attempts=attempts, consumer=consumer
+        )
+
+    async def ack(self, job: QueuedJob):
+        pass
+
+    async def release(self, job: QueuedJob):
+        # Front of the queue, with this delivery not counted
+        await self.redis.rpush(self.key, json.dumps({**job.payload, "attempts": job.attempts - 1}))
+
+    async def fail(self, job: QueuedJob, error: str) -> bool:
+        if job.attempts >= self.max_attempts:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.lpush(
+                    self.dead_letter_key,
+                    json.dumps({**job.payload, "attempts": job.attempts, "error": error}),
+                )
+                pipe.ltrim(self.dead_letter_key, 0, DEAD_LETTER_MAXLEN - 1)
+                await pipe.execute()
+            return True
+        # Back of the queue (BRPOP pops from the right)
+        await self.redis.lpush(self.key, json.dumps({**job.payload, "attempts": job.attempts}))
+        return False
+
+
+@register_job_queue("stream")
+class RedisStreamJobQueue(JobQueue):
+    """
+    Redis Streams queue with a consumer group (XADD / XREADGROUP / XACK / XAUTOCLAIM).
+    A job stays pending until acked; if its worker dies, the job is reclaimed by
+    another consumer once idle for the visibility timeout. Workers heartbeat long
+    jobs with touch(). Jobs out of attempts go to the dead-letter stream.
+    Finished entries are deleted (XDEL), so the stream only holds live jobs.
+    """
+
+    GROUP = "rag_workers"
+
+    def __init__(self, redis_client, settings: Config):
+        self.redis = redis_client
+        self.stream = f"{settings.JOB_QUEUE_NAME}:stream"
+        self.dead_letter_stream = f"{self.stream}:dead"
+        self.visibility_ms = max(1, settings.JOB_QUEUE_VISIBILITY_TIMEOUT_SECONDS) * 1000
+        self.max_attempts = max(1, settings.JOB_QUEUE_MAX_ATTEMPTS)
+        self._group_ready = False
+        # XAUTOCLAIM scans at most ~10 x COUNT pending entries per call: resume where it stopped
+        self._reclaim_cursor = "0-0"
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            # id="0": jobs enqueued before the first worker started are not skipped
+            await self.redis.xgroup_create(self.stream, self.GROUP, id="0", mkstream=True)
+            logger.info(f"Created consumer group '{self.GROUP}' on '{self.stream}'")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        return await self.redis.xadd(self.stream, {"payload": json.dumps(payload), "attempts": 0})
+
+    async def dequeue(self, consumer: str, timeout: float) -> Optional[QueuedJob]:
+        await self._ensure_group()
+
+        job = await self._reclaim(consumer)
+        if job is not None:
+            return job
+
+        result = await self.redis.xreadgroup(
+            self.GROUP,
+            consumer,
+            {self.stream: ">"},
+            count=1,
+            block=max(1, int(timeout * 1000)),  # block=0 would wait forever
+        )
+        if not result:
+            return None
+        _, messages = result[0]
+        if not messages:
+            return None
+        message_id, fields = messages[0]
+        return self._to_job(message_id, fields, consumer, deliveries=1)
+
+    async def _reclaim(self, consumer: str) -> Optional[QueuedJob]:
+        """Takes over one job whose consumer stopped heartbeating."""
+        while True:
+            result = await self.redis.xautoclaim(
+                self.stream,
+                self.GROUP,
+                consumer,
+                min_idle_time=self.visibility_ms,
+                start_id=self._reclaim_cursor,
+                count=1,
+            )
+            if not result:
+                return None
+            # "0-0" once the scan has wrapped around the whole pending list
+            self._reclaim_cursor = result[0]
+            messages = result[1]
+            if not messages:
+                return None
+
+            message_id, fields = messages[0]
+            if fields is None:
+                # Entry deleted while pending
+                await self.redis.xack(self.stream, self.GROUP, message_id)
+                continue
+
+            pending = await self.redis.xpending_range(
+                self.stream, self.GROUP, min=message_id, max=message_id, count=1
+            )
+            deliveries = pending[0]["times_delivered"] if pending else 1
+            job = self._to_job(message_id, fields, consumer, deliveries)
+            logger.warning(
+                f"Reclaimed stalled job {message_id} (attempt {job.attempts}/{self.max_attempts})"
+            )
+            if job.attempts > self.max_attempts:
+                await self._dead_letter(job, "Visibility timeout exceeded on every attempt.")
+                continue
+            return job
+
+    def _to_job(self, message_id: str, fields: Dict[str, Any], consumer: str, deliveries: int) -> QueuedJob:
+        previous = int(fields.get("attempts", 0))
+        return QueuedJob(
+            id=message_id,
+            payload=json.loads(fields["payload"]),
+            attempts=previous + deliveries,
+            consumer=consumer,
+            fields=fields,
+        )
+
+    async def ack(self, job: QueuedJob):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.GROUP, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+
+    async def touch(self, job: QueuedJob):
+        # JUSTID resets the idle time without bumping the delivery counter
+        await self.redis.xclaim(
+            self.stream, self.GROUP, job.consumer, min_idle_time=0, message_ids=[job.id], justid=True
+        )
+
+    async def release(self, job: QueuedJob):
+        """
+        Leaves the entry pending but marks it idle for the full visibility timeout,
+        so the next reclaim picks it up; RETRYCOUNT takes back this delivery.
+        """
+        deliveries = job.attempts - int(job.fields.get("attempts", 0))
+        await self.redis.xclaim(
+            self.stream,
+            self.GROUP,
+            job.consumer,
+            min_idle_time=0,
+            message_ids=[job.id],
+            idle=self.visibility_ms,
+            retrycount=max(0, deliveries - 1),
+            justid=True,
+        )
+
+    async def fail(self, job: QueuedJob, error: str) -> bool:
+        if job.attempts >= self.max_attempts:
+            await self._dead_letter(job, error)
+            return True
+
+        # Re-add with the attempt count carried over, then ack the old entry, atomically
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(self.stream, {"payload": json.dumps(job.payload), "attempts": job.attempts})
+            pipe.xack(self.stream, self.GROUP, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+        return False
+
+    async def _dead_letter(self, job: QueuedJob, error: str):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(
+                self.dead_letter_stream,
+                {
+                    "payload": json.dumps(job.payload),
+                    "attempts": job.attempts,
+                    "error": error,
+                    "source_id": job.id,
+                    "failed_at": int(time.time()),
+                },
+                maxlen=DEAD_LETTER_MAXLEN,
+                approximate=True,
+            )
+            pipe.xack(self.stream, self.GROUP, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+        logger.error(f"Dead-lettered job {job.id} after {job.attempts} attempt(s): {error}")
+
+
+class JobQueueFactory:
+    """
+    Factory to retrieve JobQueue backends.
+    Decoupled from concrete implementations via the _JOB_QUEUE_REGISTRY.
+    """
+    @staticmethod
+    def get_queue(redis_client, settings: Config = global_config) -> JobQueue:
+        backend = settings.JOB_QUEUE_BACKEND.lower()
+
+        queue_cls = _JOB_QUEUE_REGISTRY.get(backend)
+        if not queue_cls:
+            raise ValueError(f"Unknown Job Queue Backend: {backend}. Available: {list(_JOB_QUEUE_REGISTRY.keys())}")
+
+        return queue_cls(redis_client, settings)
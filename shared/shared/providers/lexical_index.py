@@ -0,0 +1,381 @@
+import fcntl
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger("Shared.Providers.LexicalIndex")
+
+# Words joined by . - / stay one token, so clause numbers ("4.2.1") and codes ("K-900") match exactly
+_TOKEN = re.compile(r"[a-z0-9]+(?:[./-][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+CURRENT_FILE = "CURRENT"
+SEGMENTS_DIR = "segments"
+BUILDS_DIR = "builds"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms; hyphen/slash compounds also emit their parts ("k-900" -> k-900, k, 900)."""
+    tokens: List[str] = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        tokens.append(token)
+        if "-" in token or "/" in token:
+            tokens.extend(part for part in re.split(r"[-/]", token) if part not in _STOPWORDS)
+    return tokens
+
+
+@lru_cache(maxsize=65536)
+def term_hash(term: str) -> int:
+    """Stable 64-bit term id: the index stores sorted hashes instead of a vocabulary to load."""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _segment_name(doc_id: str) -> str:
+    return hashlib.sha1(doc_id.encode("utf-8")).hexdigest()
+
+
+class SegmentWriter:
+    """
+    Collects one document's chunks (postings + stored text) while it streams
+    through ingestion. Nothing is visible until `commit()`, which atomically
+    replaces the document's previous segment.
+    """
+
+    def __init__(self, index_dir: str, doc_id: str):
+        self.doc_id = doc_id
+        segments = os.path.join(index_dir, SEGMENTS_DIR)
+        os.makedirs(segments, exist_ok=True)
+        self.path = os.path.join(segments, f"{_segment_name(doc_id)}.npz")
+        self._records_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        self._records = open(self._records_path, "wb")
+        self._offsets = array("Q", [0])
+        self._terms = array("Q")
+        self._chunks = array("I")
+        self._tfs = array("H")
+        self._lengths = array("I")
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, chunk_id: str, text: str, metadata: Dict[str, Any]):
+        tokens = tokenize(text)
+        chunk = len(self._lengths)
+        for term, tf in Counter(tokens).items():
+            self._terms.append(term_hash(term))
+            self._chunks.append(chunk)
+            self._tfs.append(min(tf, 65535))
+        self._lengths.append(len(tokens))
+        record = json.dumps({"id": chunk_id, "text": text, "metadata": metadata}).encode("utf-8")
+        self._records.write(record)
+        self._offsets.append(self._offsets[-1] + len(record))
+
+    def commit(self):
+        self._records.close()
+        tmp = f"{self.path}.{uuid.uuid4().hex}.tmp.npz"
+        try:
+            np.savez(
+                tmp,
+                doc_id=np.array(self.doc_id),
+                terms=np.frombuffer(self._terms, dtype=np.uint64),
+                chunks=np.frombuffer(self._chunks, dtype=np.uint32),
+                tfs=np.frombuffer(self._tfs, dtype=np.uint16),
+                lengths=np.frombuffer(self._lengths, dtype=np.uint32),
+                records=np.fromfile(self._records_path, dtype=np.uint8),
+                offsets=np.frombuffer(self._offsets, dtype=np.uint64),
+            )
+            os.replace(tmp, self.path)
+        finally:
+            for path in (tmp, self._records_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def abort(self):
+        self._records.close()
+        if os.path.exists(self._records_path):
+            os.remove(self._records_path)
+
+
+class LexicalIndexBuilder:
+    """
+    Maintains the on-disk BM25 index: one segment per document, merged into an
+    immutable build of flat (CSR) arrays that readers memory-map.
+
+        {index_dir}/segments/{sha1(doc_id)}.npz
+        {index_dir}/builds/{build_id}/  vocab, indptr, postings, tfs, norms, offsets (.npy), store.bin
+        {index_dir}/CURRENT             build id, swapped atomically on publish
+
+    Rebuilds only concatenate and sort segment arrays (no re-tokenization), are
+    serialized across processes with a file lock, and coalesce within a process.
+    With a rebuild interval, published segments only mark the index stale and a
+    periodic `rebuild_if_stale` merges everything committed since the last build.
+    """
+
+    # Builds kept on disk: the current one and its predecessor (still mapped by slow readers)
+    KEEP_BUILDS = 2
+
+    def __init__(self, index_dir: str, rebuild_interval_seconds: float = 0.0):
+        self.index_dir = index_dir
+        # 0 = rebuild on every publish
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        os.makedirs(os.path.join(index_dir, SEGMENTS_DIR), exist_ok=True)
+        self._tickets_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._tickets = 0
+        self._built = 0
+
+    def segment_writer(self, doc_id: str) -> SegmentWriter:
+        return SegmentWriter(self.index_dir, doc_id)
+
+    def publish(self, segment: SegmentWriter) -> Optional[str]:
+        """Commits a document's segment; rebuilds now, or marks the index stale (rebuild interval set)."""
+        segment.commit()
+        if self.rebuild_interval_seconds > 0:
+            with self._tickets_lock:
+                self._tickets += 1
+            return None
+        return self.rebuild()
+
+    def rebuild_if_stale(self) -> Optional[str]:
+        """Rebuilds only if segments were published since the last build."""
+        with self._tickets_lock:
+            stale = self._tickets > self._built
+        return self.rebuild() if stale else None
+
+    def remove_document(self, doc_id: str) -> Optional[str]:
+        path = os.path.join(self.index_dir, SEGMENTS_DIR, f"{_segment_name(doc_id)}.npz")
+        if not os.path.exists(path):
+            return None
+        os.remove(path)
+        return self.rebuild()
+
+    @contextmanager
+    def _file_lock(self):
+        with open(os.path.join(self.index_dir, "build.lock"), "w") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def rebuild(self) -> Optional[str]:
+        """
+        Merges every segment into a new build and publishes it.
+        Returns the build id, or None when a concurrent rebuild already covered this call.
+        """
+        with self._tickets_lock:
+            self._tickets += 1
+            ticket = self._tickets
+        with self._build_lock, self._file_lock():
+            if self._built >= ticket:
+                return None
+            with self._tickets_lock:
+                latest = self._tickets
+            started = time.perf_counter()
+            build_id, num_docs = self._build()
+            self._built = latest
+        logger.info(
+            f"Lexical index build {build_id} published: {num_docs} chunks "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return build_id
+
+    def _build(self) -> Tuple[str, int]:
+        segments_dir = os.path.join(self.index_dir, SEGMENTS_DIR)
+        terms, chunks, tfs, lengths, records, offsets = [], [], [], [], [], []
+        num_docs, num_bytes = 0, 0
+        for name in sorted(os.listdir(segments_dir)):
+            if not name.endswith(".npz") or ".tmp" in name:
+                continue
+            with np.load(os.path.join(segments_dir, name)) as segment:
+                terms.append(segment["terms"])
+                chunks.append(segment["chunks"].astype(np.int64) + num_docs)
+                tfs.append(segment["tfs"])
+                lengths.append(segment["lengths"])
+                records.append(segment["records"])
+                offsets.append(segment["offsets"][:-1].astype(np.int64) + num_bytes)
+                num_docs += len(segment["lengths"])
+                num_bytes += len(segment["records"])
+
+        terms_all = np.concatenate(terms) if terms else np.empty(0, dtype=np.uint64)
+        chunks_all = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+        tfs_all = np.concatenate(tfs) if tfs else np.empty(0, dtype=np.uint16)
+        lengths_all = np.concatenate(lengths).astype(np.float32) if lengths else np.empty(0, dtype=np.float32)
+
+        # Postings grouped by term (CSR), each list in chunk order
+        order = np.lexsort((chunks_all, terms_all))
+        terms_all = terms_all[order]
+        vocab, starts = np.unique(terms_all, return_index=True)
+        indptr = np.append(starts, len(terms_all)).astype(np.int64)
+
+        # BM25 length normalization is per chunk and query-independent: precompute it
+        avg_length = float(lengths_all.mean()) if num_docs else 0.0
+        norms = BM25_K1 * (1 - BM25_B + BM25_B * lengths_all / (avg_length or 1.0))
+
+        build_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        builds_dir = os.path.join(self.index_dir, BUILDS_DIR)
+        path = os.path.join(builds_dir, build_id)
+        os.makedirs(path)
+        np.save(os.path.join(path, "vocab.npy"), vocab)
+        np.save(os.path.join(path, "indptr.npy"), indptr)
+        np.save(os.path.join(path, "postings.npy"), chunks_all[order].astype(np.int32))
+        np.save(os.path.join(path, "tfs.npy"), tfs_all[order].astype(np.float32))
+        np.save(os.path.join(path, "norms.npy"), norms.astype(np.float32))
+        starts = np.concatenate(offsets) if offsets else np.empty(0, dtype=np.int64)
+        np.save(os.path.join(path, "offsets.npy"), np.append(starts, num_bytes).astype(np.int64))
+        with open(os.path.join(path, "store.bin"), "wb") as store:
+            for part in records:
+                part.tofile(store)
+        with open(os.path.join(path, "meta.json"), "w") as meta:
+            json.dump({"num_docs": num_docs, "avg_length": avg_length, "k1": BM25_K1, "b": BM25_B}, meta)
+
+        pointer = os.path.join(self.index_dir, f"{CURRENT_FILE}.{build_id}.tmp")
+        with open(pointer, "w") as handle:
+            handle.write(build_id)
+        os.replace(pointer, os.path.join(self.index_dir, CURRENT_FILE))
+
+        for old in sorted(os.listdir(builds_dir))[:-self.KEEP_BUILDS]:
+            shutil.rmtree(os.path.join(builds_dir, old), ignore_errors=True)
+        return build_id, num_docs
+
+
+class _Snapshot:
+    """One published build, memory-mapped (pages are loaded by the OS on first touch)."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as meta:
+            info = json.load(meta)
+        self.num_docs: int = info["num_docs"]
+        self.k1: float = info["k1"]
+
+        def _map(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.vocab = _map("vocab")
+        self.indptr = _map("indptr")
+        self.postings = _map("postings")
+        self.tfs = _map("tfs")
+        self.norms = _map("norms")
+        self.offsets = _map("offsets")
+        self.store = (
+            np.memmap(os.path.join(path, "store.bin"), dtype=np.uint8, mode="r")
+            if self.offsets[-1]
+            else np.empty(0, dtype=np.uint8)
+        )
+
+
+class LexicalIndexReader:
+    """
+    Read side of the BM25 index. Query cost is proportional to the postings of
+    the query terms plus one vectorized pass for top-k, not to the corpus text.
+    Picks up newly published builds (CURRENT) at most every RELOAD_INTERVAL_SECONDS.
+    """
+
+    RELOAD_INTERVAL_SECONDS = 2.0
+    # Below 1/SPARSE_RATIO postings per chunk, scores are accumulated without an array over the corpus
+    SPARSE_RATIO = 8
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._build_id: Optional[str] = None
+        self._checked = 0.0
+
+    @property
+    def build_id(self) -> Optional[str]:
+        return self._build_id
+
+    def _current(self) -> Optional[_Snapshot]:
+        now = time.monotonic()
+        if now - self._checked < self.RELOAD_INTERVAL_SECONDS:
+            return self._snapshot
+        with self._lock:
+            if now - self._checked < self.RELOAD_INTERVAL_SECONDS:
+                return self._snapshot
+            self._checked = now
+            try:
+                with open(os.path.join(self.index_dir, CURRENT_FILE)) as handle:
+                    build_id = handle.read().strip()
+            except FileNotFoundError:
+                return self._snapshot
+            if build_id != self._build_id:
+                try:
+                    self._snapshot = _Snapshot(os.path.join(self.index_dir, BUILDS_DIR, build_id))
+                    self._build_id = build_id
+                    logger.info(f"Lexical index build {build_id} loaded ({self._snapshot.num_docs} chunks)")
+                except (OSError, ValueError) as e:
+                    # Keep serving the previous build
+                    logger.error(f"Failed to load lexical index build {build_id}: {e}")
+            return self._snapshot
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Returns up to k (Document, BM25 score) pairs, best first."""
+        snapshot = self._current()
+        if snapshot is None or not snapshot.num_docs or k <= 0:
+            return []
+        hashes = np.array(sorted({term_hash(t) for t in tokenize(query)}), dtype=np.uint64)
+        if not len(hashes) or not len(snapshot.vocab):
+            return []
+        positions = np.searchsorted(snapshot.vocab, hashes)
+        in_range = positions < len(snapshot.vocab)
+        positions, hashes = positions[in_range], hashes[in_range]
+        positions = positions[snapshot.vocab[positions] == hashes]
+
+        n = snapshot.num_docs
+        docs_parts, score_parts = [], []
+        for position in positions:
+            start, end = int(snapshot.indptr[position]), int(snapshot.indptr[position + 1])
+            docs = snapshot.postings[start:end]
+            tf = snapshot.tfs[start:end]
+            df = end - start
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            docs_parts.append(docs)
+            score_parts.append(idf * tf * (snapshot.k1 + 1) / (tf + snapshot.norms[docs]))
+        if not docs_parts:
+            return []
+        docs = np.concatenate(docs_parts)
+        contributions = np.concatenate(score_parts)
+
+        # Accumulate per chunk: sparse for selective queries, one dense pass for common terms
+        if len(docs) * self.SPARSE_RATIO < n:
+            matched, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=contributions)
+        else:
+            scores = np.bincount(docs, weights=contributions, minlength=n)
+            matched = np.flatnonzero(scores)
+            scores = scores[matched]
+
+        if len(matched) > k:
+            top = np.argpartition(scores, -k)[-k:]
+            matched, scores = matched[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(self._document(snapshot, int(matched[i])), float(scores[i])) for i in order]
+
+    @staticmethod
+    def _document(snapshot: _Snapshot, index: int) -> Document:
+        start, end = int(snapshot.offsets[index]), int(snapshot.offsets[index + 1])
+        record = json.loads(bytes(snapshot.store[start:end]))
+        return Document(page_content=record["text"], metadata={**record["metadata"], "chunk_id": record["id"]})
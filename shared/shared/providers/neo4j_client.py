@@ -1,8 +1,8 @@
 # shared/shared/providers/neo4j_client.py
-from neo4j import GraphDatabase, Driver
-from shared.config import config
+from neo4j import AsyncDriver, AsyncGraphDatabase, GraphDatabase, Driver, READ_ACCESS, WRITE_ACCESS, unit_of_work
+from shared.config import Config, config
 import logging
-from typing import cast
+from typing import Iterable, Optional, Tuple, cast
 try:
     from typing import LiteralString
 except Exception:
@@ -10,6 +10,11 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+# Label the RAG worker adds to every graph node (next to its entity type), indexed on `id`.
+# Nodes also carry `degree`, their relationship count, kept current by the worker so
+# queries can skip hubs with a property check instead of counting relationships.
+ENTITY_LABEL = "Entity"
+
 
 class Neo4jClient:
     _instance = None
@@ -47,15 +52,35 @@ class Neo4jClient:
             )
             return result
 
-    def execute_read(self, query: str, parameters: dict = {}):
+    def execute_write_batch(self, statements: Iterable[Tuple[str, dict]]):
+        """
+        Executes several parameterized statements in a single write transaction
+        (one session, one commit), e.g. a batch of UNWIND merges.
+        """
+        statements = list(statements)
+        if not statements:
+            return
+
+        def _work(tx):
+            for query, parameters in statements:
+                tx.run(cast(LiteralString, query), parameters or {}).consume()
+
+        with self._driver.session() as session:
+            session.execute_write(_work)
+
+    def execute_read(self, query: str, parameters: dict = {}, timeout: Optional[float] = None):
         """
         Executes a read transaction.
+        :param timeout: Server-side transaction timeout in seconds; the server aborts
+                        the query (raising a Neo4jError) once it is exceeded.
         """
+
+        @unit_of_work(timeout=timeout)
+        def _work(tx):
+            return tx.run(cast(LiteralString, query), parameters or {}).data()
+
         with self._driver.session() as session:
-            result = session.execute_read(
-                lambda tx: tx.run(cast(LiteralString, query), parameters or {}).data()
-            )
-            return result
+            return session.execute_read(_work)
 
     def setup_indexes(self):
         """
@@ -71,3 +96,108 @@ class Neo4jClient:
             logger.info("Neo4j Full-Text Search Indexes configured.")
         except Exception as e:
             logger.warning(f"Index setup skipped or failed: {e}")
+
+
+class AsyncNeo4jClient:
+    """
+    Neo4j client on the driver's native async API (Singleton), for callers on
+    an event loop: no thread hops, and concurrency is bounded by the connection
+    pool rather than by executor threads.
+
+    Sessions are opened without bookmarks (no causal chaining between requests),
+    so reads are routed to any available reader in a cluster.
+    """
+
+    _instance: Optional["AsyncNeo4jClient"] = None
+
+    def __init__(self, settings: Config = config):
+        self._driver: AsyncDriver = AsyncGraphDatabase.driver(
+            settings.NEO4J_URI,
+            auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD),
+            max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+            connection_acquisition_timeout=settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT_SECONDS,
+        )
+        self.fetch_size = settings.NEO4J_FETCH_SIZE
+
+    @classmethod
+    def get_instance(cls, settings: Config = config) -> "AsyncNeo4jClient":
+        if cls._instance is None:
+            cls._instance = cls(settings)
+        return cls._instance
+
+    @classmethod
+    async def close_instance(cls):
+        if cls._instance is not None:
+            await cls._instance.close()
+            cls._instance = None
+
+    async def close(self):
+        await self._driver.close()
+
+    async def verify_connectivity(self):
+        try:
+            await self._driver.verify_connectivity()
+            logger.info("Connected to Neo4j successfully (async).")
+        except Exception as e:
+            logger.error(f"Failed to connect to Neo4j: {e}")
+            raise
+
+    def _session(self, access_mode: str):
+        return self._driver.session(
+            default_access_mode=access_mode, fetch_size=self.fetch_size, bookmarks=None
+        )
+
+    async def execute_read(self, query: str, parameters: Optional[dict] = None, timeout: Optional[float] = None):
+        """
+        Executes a read transaction (retried on transient errors).
+        :param timeout: Server-side transaction timeout in seconds.
+        """
+
+        @unit_of_work(timeout=timeout)
+        async def _work(tx):
+            result = await tx.run(cast(LiteralString, query), parameters or {})
+            return await result.data()
+
+        async with self._session(READ_ACCESS) as session:
+            return await session.execute_read(_work)
+
+    async def execute_write(self, query: str, parameters: Optional[dict] = None):
+        async def _work(tx):
+            result = await tx.run(cast(LiteralString, query), parameters or {})
+            return await result.data()
+
+        async with self._session(WRITE_ACCESS) as session:
+            return await session.execute_write(_work)
+
+    async def setup_indexes(self):
+        """
+        Creates the entity id index and backfills the label and degree on nodes
+        written before they existed (in batches, outside one big transaction).
+        """
+        index_query = f"CREATE INDEX entity_id IF NOT EXISTS FOR (n:{ENTITY_LABEL}) ON (n.id)"
+        backfill_query = f"""
+            MATCH (n) WHERE n.id IS NOT NULL AND (NOT n:{ENTITY_LABEL} OR n.degree IS NULL)
+            CALL {{ WITH n SET n:{ENTITY_LABEL}, n.degree = COUNT {{ (n)--() }} }} IN TRANSACTIONS OF 10000 ROWS
+        """
+        try:
+            async with self._session(WRITE_ACCESS) as session:
+                await (await session.run(cast(LiteralString, index_query))).consume()
+                # CALL ... IN TRANSACTIONS needs an auto-commit transaction
+                await (await session.run(cast(LiteralString, backfill_query))).consume()
+            logger.info("Neo4j entity index configured.")
+        except Exception as e:
+            logger.warning(f"Entity index setup skipped or failed: {e}")
+
+    async def execute_write_batch(self, statements: Iterable[Tuple[str, dict]]):
+        """Executes several parameterized statements in a single write transaction."""
+        statements = list(statements)
+        if not statements:
+            return
+
+        async def _work(tx):
+            for query, parameters in statements:
+                result = await tx.run(cast(LiteralString, query), parameters or {})
+                await result.consume()
+
+        async with self._session(WRITE_ACCESS) as session:
+            await session.execute_write(_work)
@@ -1,10 +1,13 @@
 import os
+import uuid
 import logging
-from typing import Any, Dict, Type
+import numpy as np
+from typing import Any, Dict, Optional, Tuple, Type
 from langchain_pinecone import PineconeVectorStore
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
 from shared.config import Config, config as global_config
-from shared.interfaces import VectorDBStrategy, VectorStoreManager
+from shared.interfaces import ScoredCandidate, VectorDBStrategy, VectorStoreManager
 from typing import List
 
 logger = logging.getLogger("Shared.Providers.VectorDatabase")
@@ -12,6 +15,9 @@ logger = logging.getLogger("Shared.Providers.VectorDatabase")
 # Registry
 _VECTOR_DB_REGISTRY: Dict[str, Type[VectorDBStrategy]] = {}
 
+# Metadata field holding the chunk text in Pinecone (LangChain's default)
+PINECONE_TEXT_KEY = "text"
+
 def register_vector_db_strategy(name: str):
     def decorator(cls):
         _VECTOR_DB_REGISTRY[name] = cls
@@ -19,15 +25,67 @@ def register_vector_db_strategy(name: str):
     return decorator
 
 class PineconeAdapter(VectorStoreManager):
-    def __init__(self, store: PineconeVectorStore):
+    # Vectors per upsert request (keeps requests under Pinecone's size limit)
+    UPSERT_BATCH_SIZE = 100
+    # Ids per delete request (Pinecone's limit)
+    DELETE_BATCH_SIZE = 1000
+
+    def __init__(self, store: PineconeVectorStore, text_key: str = PINECONE_TEXT_KEY, namespace: Optional[str] = None):
         self.store = store
+        # Same values the store was built with: raw index calls must match its layout
+        self.text_key = text_key
+        self.namespace = namespace
+        # LangChain's score -> [0, 1] mapping for the store's distance strategy (no public getter)
+        self.relevance = store._select_relevance_score_fn()
 
     def add_documents(self, documents: List[Any]):
         self.store.add_documents(documents)
 
+    def add_embeddings(self, documents: List[Any], embeddings: List[List[float]], ids: Optional[List[str]] = None):
+        ids = ids or [str(uuid.uuid4()) for _ in documents]
+        vectors = [
+            (vec_id, vector, {**doc.metadata, self.text_key: doc.page_content})
+            for vec_id, vector, doc in zip(ids, embeddings, documents)
+        ]
+        for i in range(0, len(vectors), self.UPSERT_BATCH_SIZE):
+            self.store.index.upsert(
+                vectors=vectors[i : i + self.UPSERT_BATCH_SIZE],
+                namespace=self.namespace,
+            )
+
     def similarity_search(self, query: str, k: int) -> List[Any]:
         return self.store.similarity_search(query, k=k)
 
+    def similarity_search_with_scores(self, query: str, k: int) -> List[Tuple[Any, float]]:
+        # LangChain maps the native metric to [0, 1] relevance for this store
+        return self.store.similarity_search_with_relevance_scores(query, k=k)
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.store.embeddings.embed_query(query)
+
+    def fetch_candidates(self, embedding: List[float], fetch_k: int) -> List[ScoredCandidate]:
+        results = self.store.index.query(
+            vector=embedding,
+            top_k=fetch_k,
+            include_values=True,
+            include_metadata=True,
+            namespace=self.namespace,
+        )
+        candidates = []
+        for match in results["matches"]:
+            metadata = dict(match["metadata"] or {})
+            text = metadata.pop(self.text_key, None)
+            if text is None:
+                continue
+            candidates.append(
+                ScoredCandidate(
+                    document=Document(id=match["id"], page_content=text, metadata=metadata),
+                    score=self.relevance(match["score"]),
+                    vector=match["values"],
+                )
+            )
+        return candidates
+
     def delete_document(self, doc_id: str) -> bool:
         try:
             self.store.delete(filter={"doc_id": doc_id})
@@ -35,6 +93,15 @@ class PineconeAdapter(VectorStoreManager):
         except Exception as e:
             logger.error(f"Pinecone delete failed for {doc_id}: {e}")
             return False
+
+    def delete_ids(self, ids: List[str]) -> bool:
+        try:
+            for i in range(0, len(ids), self.DELETE_BATCH_SIZE):
+                self.store.delete(ids=ids[i : i + self.DELETE_BATCH_SIZE])
+            return True
+        except Exception as e:
+            logger.error(f"Pinecone delete failed for {len(ids)} ids: {e}")
+            return False
     
     def as_langchain_retriever(self, search_type: str, search_kwargs: dict):
         return self.store.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
@@ -42,19 +109,68 @@ class PineconeAdapter(VectorStoreManager):
 class FAISSAdapter(VectorStoreManager):
     def __init__(self, store: FAISS):
         self.store = store
+        # Raw index searches must apply what the store applies (no public getters)
+        self.normalize_L2 = store._normalize_L2
+        self.relevance = store._select_relevance_score_fn()
 
     def add_documents(self, documents: List[Any]):
         self.store.add_documents(documents)
 
+    def add_embeddings(self, documents: List[Any], embeddings: List[List[float]], ids: Optional[List[str]] = None):
+        self.store.add_embeddings(
+            text_embeddings=list(zip([doc.page_content for doc in documents], embeddings)),
+            metadatas=[doc.metadata for doc in documents],
+            ids=ids,
+        )
+
     def similarity_search(self, query: str, k: int) -> List[Any]:
         return self.store.similarity_search(query, k=k)
 
+    def similarity_search_with_scores(self, query: str, k: int) -> List[Tuple[Any, float]]:
+        # LangChain maps the native metric to [0, 1] relevance for this store
+        return self.store.similarity_search_with_relevance_scores(query, k=k)
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.store.embeddings.embed_query(query)
+
+    def fetch_candidates(self, embedding: List[float], fetch_k: int) -> List[ScoredCandidate]:
+        query = np.array([embedding], dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if self.normalize_L2 and norm > 0:
+            # The stored vectors were normalized on insert
+            query /= norm
+        distances, indices = self.store.index.search(query, fetch_k)
+        candidates = []
+        for distance, i in zip(distances[0], indices[0]):
+            if i == -1:
+                # Fewer than fetch_k vectors in the index
+                continue
+            doc = self.store.docstore.search(self.store.index_to_docstore_id[i])
+            if not isinstance(doc, Document):
+                continue
+            candidates.append(
+                ScoredCandidate(
+                    document=doc,
+                    score=self.relevance(float(distance)),
+                    vector=self.store.index.reconstruct(int(i)).tolist(),
+                )
+            )
+        return candidates
+
     def delete_document(self, doc_id: str) -> bool:
         # FAISS Local often relies on internal IDs, not metadata.
         # We normalize the behavior: instead of crashing or needing hasattr,
         # we strictly return False to indicate "Not Supported/Failed" cleanly.
         logger.warning(f"Delete operation not supported/implemented for FAISS Local adapter (doc_id: {doc_id})")
         return False
+
+    def delete_ids(self, ids: List[str]) -> bool:
+        try:
+            return bool(self.store.delete(ids))
+        except ValueError as e:
+            # Raised when some ids are unknown to the docstore
+            logger.error(f"FAISS delete failed for {len(ids)} ids: {e}")
+            return False
     
     def as_langchain_retriever(self, search_type: str, search_kwargs: dict):
         return self.store.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
@@ -66,9 +182,10 @@ class PineconeStrategy(VectorDBStrategy):
         store = PineconeVectorStore(
             index_name=settings.PINECONE_INDEX_NAME,
             embedding=embeddings,
-            pinecone_api_key=settings.PINECONE_API_KEY
+            pinecone_api_key=settings.PINECONE_API_KEY,
+            text_key=PINECONE_TEXT_KEY,
         )
-        return PineconeAdapter(store)
+        return PineconeAdapter(store, text_key=PINECONE_TEXT_KEY)
 
 @register_vector_db_strategy("local")
 class FAISSStrategy(VectorDBStrategy):
@@ -0,0 +1,3 @@
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), no tokenizer needed."""
+    return len(text) // 4 + 1